@@ -3,6 +3,4 @@ from ultralytics import YOLOv10
 model = YOLOv10('yolov10n.yaml')
 model.model.model[-1].export = True
 model.model.model[-1].format = 'onnx'
-del model.model.model[-1].cv2
-del model.model.model[-1].cv3
-model.fuse()
\ No newline at end of file
+model.fuse()  # folds BatchNorm and removes the one2many head
@@ -1,7 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import contextlib
-from copy import copy
+from copy import copy, deepcopy
 from pathlib import Path
 
 import cv2
@@ -13,7 +13,7 @@ from PIL import Image
 from torchvision.transforms import ToTensor
 
 from ultralytics import RTDETR, YOLO
-from ultralytics.cfg import TASK2DATA
+from ultralytics.cfg import TASK2DATA, get_cfg
 from ultralytics.data.build import load_inference_source
 from ultralytics.utils import (
     ASSETS,
@@ -74,6 +74,61 @@ def test_model_profile():
     _ = model.predict(im, profile=True)
 
 
+def test_model_fuse_v10():
+    """Test YOLOv10 fuse() removes the one2many head without changing one2one predictions."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", verbose=False).eval()
+    im = torch.rand(1, 3, 64, 64)
+    y = model(im)["one2one"][0]
+    n = sum(x.numel() for x in model.parameters())
+    model.fuse(verbose=False)
+    y_fused = model(im)
+    assert list(y_fused) == ["one2one"] and model.model[-1].cv2 is None
+    assert sum(x.numel() for x in model.parameters()) < n
+    assert torch.allclose(y, y_fused["one2one"][0], atol=1e-4)
+    with pytest.raises(RuntimeError):  # the one2many head is needed for training
+        model.train()(im)
+
+
+def test_model_empty_init():
+    """Test models built on the meta device and loaded from a state_dict match normally built models."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.utils.torch_utils import empty_init, load_empty_state_dict
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", verbose=False).eval()
+    with empty_init():
+        fast = YOLOv10DetectionModel("yolov10n.yaml", verbose=False)
+    load_empty_state_dict(fast, model.state_dict()).eval()
+    im = torch.rand(1, 3, 64, 64)
+    assert torch.equal(fast.stride, model.stride)
+    assert torch.equal(fast(im)["one2one"][0], model(im)["one2one"][0])
+    with pytest.raises(RuntimeError):  # uninitialized weights must all be loaded
+        with empty_init():
+            fast = YOLOv10DetectionModel("yolov10n.yaml", verbose=False)
+        load_empty_state_dict(fast, {k: v for k, v in model.state_dict().items() if "model.0." not in k})
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_weights_sidecar():
+    """Test mmap=True loads drop training state and round-trip fused models through a safetensors sidecar."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel, attempt_load_weights, torch_safe_load
+
+    f = TMP / "sidecar.pt"
+    model = YOLOv10DetectionModel("yolov10n.yaml", verbose=False)
+    torch.save({"model": None, "ema": deepcopy(model).half(), "optimizer": {"state": {}}, "train_args": {}}, f)
+    ckpt, _ = torch_safe_load(f, mmap=True)
+    assert "optimizer" not in ckpt and "ema" not in ckpt and ckpt["model"] is not None
+
+    fused = attempt_load_weights(f, fuse=True, mmap=True)  # writes sidecar
+    assert f.with_suffix(".safetensors").is_file()
+    loaded = attempt_load_weights(f, fuse=True, mmap=True)  # loads sidecar
+    assert loaded.is_fused() and torch.equal(loaded.stride, fused.stride) and loaded.names == fused.names
+    im = torch.rand(1, 3, 64, 64)
+    assert torch.equal(loaded(im)["one2one"][0], fused(im)["one2one"][0])
+    assert YOLO(f.with_suffix(".safetensors")).task == "detect"
+
+
 @pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
 def test_predict_txt():
     """Test YOLO predictions with sources (file, dir, glob, recursive glob) specified in a text file."""
@@ -376,6 +431,367 @@ def test_data_utils():
     zip_directory(TMP / "coco8/images/val")  # zip
 
 
+def _local_dataset(name="assets8"):
+    """Write a small detection dataset built from the bundled ASSETS images to TMP and return its YAML path."""
+    root = TMP / name
+    for split in "train", "val":
+        (root / "images" / split).mkdir(parents=True, exist_ok=True)
+        (root / "labels" / split).mkdir(parents=True, exist_ok=True)
+        for i in range(4):
+            for f in ASSETS.glob("*.jpg"):
+                im = cv2.imread(str(f))
+                cv2.imwrite(str(root / "images" / split / f"{f.stem}_{i}.jpg"), im[: im.shape[0] - 40 * i])
+                (root / "labels" / split / f"{f.stem}_{i}.txt").write_text("0 0.5 0.5 0.2 0.4\n5 0.3 0.6 0.1 0.1\n")
+    file = TMP / f"{name}.yaml"
+    file.write_text(f"path: {root}\ntrain: images/train\nval: images/val\nnames: {dict(enumerate('abcdef'))}\n")
+    return file
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_materialize():
+    """Test writing a pre-resized dataset copy and loading it without resizing."""
+    from ultralytics.data import YOLODataset
+    from ultralytics.data.materialize import materialize_dataset
+    from ultralytics.data.utils import check_det_dataset
+
+    data = check_det_dataset(_local_dataset())
+    new_data = check_det_dataset(materialize_dataset(data["yaml_file"], imgsz=160, workers=2))
+    assert new_data["materialized"] == 160
+    dataset = YOLODataset(img_path=data["val"], imgsz=160, augment=False, data=data)
+    new_dataset = YOLODataset(img_path=new_data["val"], imgsz=160, augment=False, data=new_data)
+    assert len(dataset) == len(new_dataset)
+    for i in range(len(dataset)):
+        im, _, hw = dataset.load_image(i)
+        new_im, new_hw0, new_hw = new_dataset.load_image(i)
+        assert hw == new_hw == new_hw0 and max(new_hw) == 160
+        assert np.abs(im.astype(float) - new_im).mean() < 8  # JPEG re-encode tolerance
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_file_index():
+    """Test the cached directory file index matches a recursive glob and is invalidated by directory changes."""
+    import glob
+    import os
+
+    from ultralytics.data import YOLODataset
+    from ultralytics.data.utils import FILE_INDEX_SUFFIX, check_det_dataset, get_file_index
+
+    d = _local_dataset().parent / "assets8" / "images" / "train"
+    index = get_file_index(d)
+    assert sorted(index) == sorted(glob.glob(str(d / "**" / "*.*"), recursive=True))
+    assert all(index[f] == os.path.getsize(f) for f in index)
+    assert Path(f"{d}{FILE_INDEX_SUFFIX}").is_file()
+
+    f = d / "extra.jpg"
+    f.write_bytes(b"0")
+    t = os.stat(d).st_mtime_ns
+    os.utime(d, ns=(t, t + 1))  # ensure a new mtime on coarse timestamp filesystems
+    assert str(f) in get_file_index(d)
+    f.unlink()
+
+    data = check_det_dataset(_local_dataset())
+    dataset = YOLODataset(img_path=data["val"], data=data)
+    n = len(dataset.labels[0]["cls"])
+    with open(dataset.label_files[0], "a") as file:  # edited in place, the directory mtime is unchanged
+        file.write("1 0.5 0.5 0.1 0.1\n")
+    assert len(YOLODataset(img_path=data["val"], data=data).labels[0]["cls"]) == n + 1  # *.cache invalidated
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_data_pack():
+    """Test packing a dataset into tar shards and streaming them with mosaic and rank sharding."""
+    from ultralytics.data import build_dataloader, build_yolo_dataset
+    from ultralytics.data.shards import pack_dataset
+    from ultralytics.data.utils import check_det_dataset
+
+    data = check_det_dataset(pack_dataset(_local_dataset(), shard_size=3))
+    cfg = get_cfg(overrides=dict(imgsz=64))
+    dataset = build_yolo_dataset(cfg, data["train"], 4, data, mode="train")
+    for workers in 0, 2:
+        loader = build_dataloader(dataset, 4, workers, shuffle=True)
+        assert sum(len(b["im_file"]) for b in loader) == len(dataset) == 8
+    dataset.rank, dataset.world_size = 1, 3
+    assert len(dataset.rank_samples()) == len(dataset) == 3  # equal length on every rank
+
+    dataset = build_yolo_dataset(cfg, data["val"], 4, data, mode="val", rect=True)
+    files = [f for b in build_dataloader(dataset, 4, 2, shuffle=False) for f in b["im_file"]]
+    assert sorted(files) == sorted(dataset.im_files)  # every image exactly once
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_distillation():
+    """Test teacher distillation runs the teacher once per augmented sample, caching its outputs."""
+    from ultralytics import YOLOv10
+    from ultralytics.models.yolov10.distill import DistillationDataset, YOLOv10DistillationTrainer
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.data.utils import check_det_dataset
+
+    data = check_det_dataset(_local_dataset())
+    dataset = DistillationDataset(img_path=data["train"], imgsz=160, augment=True, hyp=get_cfg(), data=data, views=2)
+    for i in range(4):
+        samples = {}
+        for _ in range(6):
+            x = dataset[i]
+            y = samples.setdefault(x["distill_slot"], x)
+            assert torch.equal(x["img"], y["img"]) and torch.equal(x["bboxes"], y["bboxes"])  # reproducible per slot
+
+    teacher = TMP / "yolov10s-teacher.pt"
+    torch.save({"model": YOLOv10DetectionModel("yolov10s.yaml", nc=6, verbose=False).half(), "train_args": {}}, teacher)
+    model = YOLOv10("yolov10n.yaml")
+    model.train(data=data["yaml_file"], teacher=teacher, epochs=3, close_mosaic=1, imgsz=160, project=TMP / "runs")
+    trainer = model.trainer
+    assert trainer.loss_names[-3:] == ("box_kd", "cls_kd", "dfl_kd") and len(trainer.tloss) == 9
+    assert trainer.teacher_cache.filled.sum() == 2 * len(dataset)  # mosaic and closed mosaic samples, 1 view each
+
+    student = YOLO(trainer.best)  # CLI models, YOLOv10 weights without 'yolov10' in their name
+    student.train(data=data["yaml_file"], teacher=teacher, epochs=1, imgsz=160, project=TMP / "runs")
+    assert isinstance(student.trainer, YOLOv10DistillationTrainer)
+    with pytest.raises(ValueError):  # not ignored without distillation
+        YOLO("yolov8n.yaml").train(data=data["yaml_file"], teacher=teacher, epochs=1, imgsz=160, project=TMP / "runs")
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_prune():
+    """Test structured channel pruning keeps outputs at sparsity 0 and rebuilds pruned models from their YAML."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.utils.prune import ChannelPruner
+
+    model = YOLOv10DetectionModel("yolov10s.yaml", verbose=False).eval()
+    for m in model.modules():
+        if isinstance(m, torch.nn.BatchNorm2d):  # distinct channel importances
+            m.weight.data.uniform_(0, 1)
+    im = torch.rand(1, 3, 160, 160)
+    pruner = ChannelPruner(model)
+    assert torch.allclose(pruner.prune(0.0).eval()(im)["one2one"][0], model(im)["one2one"][0], atol=1e-5)
+    pruned = pruner.prune(0.5).eval()
+    assert sum(x.numel() for x in pruned.parameters()) < sum(x.numel() for x in model.parameters()) / 2
+    assert pruned(im)["one2one"][0].shape == model(im)["one2one"][0].shape
+    YOLOv10DetectionModel(pruned.yaml, verbose=False).load_state_dict(pruned.state_dict())
+
+    df = YOLO("yolov10n.yaml").prune(data=_local_dataset(), sparsity=[0.25, 0.5], imgsz=160, project=TMP / "runs")
+    assert df["Sparsity"].tolist() == [0.0, 0.25, 0.5] and df["Params (M)"].is_monotonic_decreasing
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_train_val_async():
+    """Test training with validation in a background thread, and its merged results.csv rows and best.pt."""
+    import pandas as pd
+
+    from ultralytics import YOLOv10
+
+    def spy_saves(trainer):
+        """Records whether each checkpoint saved while validation was pending was also linked to best.pt."""
+        save = trainer.ckpt_writer.save
+        trainer.ckpt_writer.save = lambda ckpt, *f: saves.append((bool(trainer.val_job), f)) or save(ckpt, *f)
+
+    saves = []
+    model = YOLOv10("yolov10n.yaml")
+    model.add_callback("on_pretrain_routine_end", spy_saves)
+    model.train(data=_local_dataset(), epochs=3, val_async=True, imgsz=160, device="cpu", project=TMP / "runs")
+    assert saves[0][0] and all(model.trainer.best not in files for pending, files in saves if pending)
+    results = pd.read_csv(model.trainer.csv)
+    assert list(results.iloc[:, 0]) == [1, 2, 3]  # one row per epoch, in order
+    assert not results.filter(like="metrics/").isna().any().any()
+    assert model.trainer.best.exists() and model.trainer.val_job is None
+
+
+def test_train_val_subset():
+    """Test stratified val subsets, and training validated on a subset except for the last val_dense epochs."""
+    from types import SimpleNamespace
+
+    from ultralytics import YOLOv10
+    from ultralytics.data.utils import stratified_subset
+
+    labels = [
+        {"cls": np.array([[0], [1]])},
+        {"cls": np.array([[1]])},
+        {"cls": np.zeros((0, 1))},
+        {"cls": np.array([[2]])},
+    ]
+    assert stratified_subset(labels * 2, 0.5) == stratified_subset(labels * 2, 0.5, seed=0)  # fixed selection
+    assert {k for i in stratified_subset(labels * 2, 0.1) for k in labels[i % 4]["cls"].flatten()} == {0, 1, 2}
+
+    model = YOLOv10("yolov10n.yaml")
+    model.train(data=_local_dataset(), epochs=3, val_fraction=0.5, val_dense=1, imgsz=160, project=TMP / "runs")
+    assert len(model.trainer.subset_validator.dataloader.dataset) < len(model.trainer.test_loader.dataset)
+    assert model.trainer.best.exists()
+
+    class Validator:
+        """Returns the given fitness values in turn."""
+
+        def __init__(self, fitness, keys):
+            self.fitness, self.keys, self.args = iter(fitness), keys, SimpleNamespace()
+
+        def __call__(self, trainer=None, model=None):
+            return {**dict.fromkeys(self.keys, 0.0), "fitness": next(self.fitness)}
+
+    def mock_validators(trainer):
+        """Subset fitness improves once, full fitness only decreases."""
+        trainer.subset_validator = Validator([1.0] + [0.5] * 10, list(trainer.metrics))
+        trainer.validator = Validator([0.9, 0.8, 0.7, 0.6], list(trainer.metrics))
+
+    model = YOLOv10("yolov10n.yaml")
+    model.add_callback("on_pretrain_routine_end", mock_validators)
+    model.train(data=_local_dataset(), epochs=10, patience=3, val_fraction=0.5, val_dense=0, imgsz=160, project=TMP)
+    assert model.trainer.epoch == 3 and model.trainer.stopper.best_epoch == 1  # skipped epochs count to patience
+
+
+def test_checkpoint_writer():
+    """Test background checkpoint saving with linked best and periodic checkpoints, and write error reporting."""
+    from ultralytics import YOLOv10
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.utils.torch_utils import CheckpointWriter, snapshot_module, snapshot_optimizer
+
+    model = YOLOv10("yolov10n.yaml")
+    model.train(data=_local_dataset(), epochs=2, save_period=1, imgsz=160, device="cpu", project=TMP / "runs")
+    wdir = model.trainer.wdir
+    assert sorted(f.name for f in wdir.iterdir()) == ["best.pt", "epoch1.pt", "last.pt"]  # no temporary files
+    assert torch.load(wdir / "epoch1.pt")["optimizer"] is not None  # not stripped with last.pt
+    assert torch.load(wdir / "best.pt")["optimizer"] is None
+
+    m = YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False)
+    optimizer = torch.optim.Adam(m.parameters())
+    sum(t.sum() for v in m(torch.rand(1, 3, 64, 64)).values() for t in v).backward()
+    optimizer.step()
+    y, state = deepcopy(m).half().state_dict(), deepcopy(optimizer.state_dict())
+    snapshot, optimizer_snapshot = snapshot_module(m), snapshot_optimizer(optimizer)
+    optimizer.step()  # updates the model and optimizer state in place
+    assert all(torch.equal(v.cpu(), y[k].cpu()) for k, v in snapshot.state_dict().items())
+    assert all(torch.equal(v["exp_avg"], state["state"][i]["exp_avg"]) for i, v in optimizer_snapshot["state"].items())
+    optimizer.load_state_dict(optimizer_snapshot)  # resumable
+
+    writer = CheckpointWriter()
+    writer.save({}, TMP / "missing" / "last.pt")
+    with pytest.raises(RuntimeError):  # parent directory does not exist
+        writer.wait()
+
+
+def test_qat():
+    """Test quantization-aware training and the INT8 conversion of its checkpoints on CPU."""
+    from ultralytics import YOLOv10
+    from ultralytics.nn.tasks import attempt_load_one_weight
+
+    model = YOLOv10("yolov10n.yaml")
+    model.train(data=_local_dataset(), qat=True, epochs=1, imgsz=160, device="cpu", project=TMP / "runs")
+    fake_quant = attempt_load_one_weight(model.trainer.last)[0].eval()
+    assert any(isinstance(m, torch.ao.quantization.FakeQuantizeBase) for m in fake_quant.modules())
+    int8 = deepcopy(fake_quant).fuse()
+    assert any(isinstance(m, torch.ao.nn.quantized.Conv2d) for m in int8.modules())
+    im = torch.rand(2, 3, 192, 192)
+    with torch.no_grad():
+        assert torch.allclose(int8(im)["one2one"][0], fake_quant(im)["one2one"][0], atol=1e-2)
+    YOLOv10(model.trainer.last).val(data=_local_dataset(), imgsz=192)  # INT8 validation on CPU
+
+
+@pytest.mark.skipif(not IS_TMP_WRITEABLE, reason="directory is not writeable")
+def test_quantize_static():
+    """Test post-training INT8 quantization of fused models, and quantize=int8 validation."""
+    from ultralytics import YOLOv10
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.utils.quantize import QuantUnit, quantize_static
+
+    data = _local_dataset()
+    model = YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).fuse(verbose=False).eval()
+    int8 = quantize_static(model, get_cfg(overrides={"data": data, "calib": 8, "imgsz": 160, "batch": 4}))
+    assert any(isinstance(m, torch.ao.nn.quantized.Conv2d) for m in int8.modules())
+    assert not any(isinstance(m, QuantUnit) for m in model.modules())  # float model is not modified
+    im = torch.rand(1, 3, 160, 160)
+    assert int8(im)["one2one"][0].shape == model(im)["one2one"][0].shape
+
+    f = TMP / "yolov10n-int8.pt"
+    torch.save({"model": YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).half(), "train_args": {}}, f)
+    YOLOv10(f).val(data=data, imgsz=160, batch=4, quantize="int8", calib=8)
+
+
+def test_model_ema():
+    """Test fused ModelEMA updates against the EMA formula, across casts and with updates every n steps."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+    from ultralytics.utils.torch_utils import ModelEMA
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False)
+    ema, ema2 = ModelEMA(model), ModelEMA(model, every=2)
+    y = {k: v.clone() for k, v in ema.ema.state_dict().items()}
+    y2 = model.model[0].conv.weight.clone()
+    for i in range(1, 5):
+        with torch.no_grad():
+            for p in model.parameters():
+                p.add_(torch.rand_like(p))
+        ema.update(model)
+        ema2.update(model)
+        d = ema.decay(i)
+        y = {k: d * v + (1 - d) * model.state_dict()[k] if v.dtype.is_floating_point else v for k, v in y.items()}
+        if i % 2 == 0:
+            d = ema.decay(i - 1) * ema.decay(i)  # decay of both steps
+            y2 = d * y2 + (1 - d) * model.model[0].conv.weight
+        if i == 2:
+            ema.ema.half().float()  # validation casts the EMA in place
+    assert all(torch.allclose(v, y[k], atol=1e-5) for k, v in ema.ema.state_dict().items())
+    assert torch.allclose(ema2.ema.model[0].conv.weight, y2, atol=1e-5)
+
+    ema.ema.half()  # FP16 validation during training with half=True
+    y = {k: v.float() for k, v in ema.ema.state_dict().items()}
+    ema.update(model)
+    d = ema.decay(ema.updates)
+    for k, v in ema.ema.state_dict().items():
+        if v.dtype.is_floating_point:
+            assert v.dtype == torch.half
+            assert torch.allclose(v.float(), d * y[k] + (1 - d) * model.state_dict()[k], rtol=1e-2, atol=1e-2)
+
+
+def test_attention():
+    """Test that chunked and fused attention match the explicit attention matrix."""
+    from ultralytics.nn.modules.block import Attention
+
+    m = Attention(128, num_heads=2).eval()
+    x = torch.rand(2, 128, 12, 16)
+    q, k, v = (torch.rand(2, 2, 192, 32) for _ in range(3))
+    y = ((q @ k.transpose(-2, -1)) * m.scale).softmax(dim=-1) @ v
+    assert torch.allclose(m.attend(q, k, v), y, atol=1e-5)
+    with torch.no_grad():
+        y = m(x)
+        m.chunk = 50  # 4 chunks of queries
+        assert torch.allclose(m(x), y, atol=1e-5)
+
+
+def test_predict_augment():
+    """Test batched test-time augmentation of YOLOv8 and NMS-free YOLOv10 models, and augment=True validation."""
+    from ultralytics import YOLOv10
+    from ultralytics.nn.tasks import DetectionModel, YOLOv10DetectionModel
+
+    im = torch.rand(2, 3, 160, 192)
+    model = DetectionModel("yolov8n.yaml", nc=6, verbose=False).eval()
+    y = model(im)[0]
+    n = 20 * 24 + 10 * 12  # P3 and P4 anchors of the unscaled view
+    assert torch.allclose(model(im, augment=True)[0][..., :n], y[..., :n], atol=1e-4)
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).eval().fuse(verbose=False)
+    y = model(im, augment=True)[0]
+    assert y.shape == (2, 300, 6) and (y[..., 4].diff(dim=1) <= 0).all()  # merged detections sorted by score
+
+    f = TMP / "yolov10n-augment.pt"
+    torch.save({"model": YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).half(), "train_args": {}}, f)
+    YOLOv10(f).val(data=_local_dataset(), imgsz=160, batch=4, augment=True)
+
+
+def test_compile():
+    """Test compile=True inference, compiled or eager fallback once per input shape, and compile=True validation."""
+    from ultralytics import YOLOv10
+    from ultralytics.nn.autobackend import AutoBackend
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).eval()
+    backend = AutoBackend(deepcopy(model), compile=True, verbose=False)
+    im = torch.rand(2, 3, 160, 160)
+    y = backend(im)
+    assert list(backend.compiled) == [(2, 3, 160, 160, torch.float32)]
+    assert torch.allclose(backend(im)["one2one"][0], y["one2one"][0]) and backend.compile_dt == 0.0
+    assert torch.allclose(y["one2one"][0], model.fuse(verbose=False)(im)["one2one"][0], atol=1e-3)
+
+    f = TMP / "yolov10n-compile.pt"
+    torch.save({"model": YOLOv10DetectionModel("yolov10n.yaml", nc=6, verbose=False).half(), "train_args": {}}, f)
+    YOLOv10(f).val(data=_local_dataset(), imgsz=160, batch=4, compile=True)
+
+
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 def test_data_converter():
     """Test dataset converters."""
@@ -431,6 +847,31 @@ def test_utils_init():
     get_git_branch()
 
 
+@pytest.mark.parametrize(
+    "stmt, budget",
+    [
+        ("import ultralytics", 0.5),
+        ("from ultralytics import YOLO", 6.0),
+        ("from ultralytics.cfg import entrypoint", 6.0),
+    ],
+)
+def test_import_time(stmt, budget):
+    """Test package import stays lazy, fails if heavy optional modules load at startup or import time regresses."""
+    import json
+    import subprocess
+    import sys
+
+    code = (
+        "import json, sys, time; t = time.perf_counter(); "
+        f"{stmt}; dt = time.perf_counter() - t; "
+        "heavy = ('pandas', 'matplotlib', 'IPython', 'huggingface_hub', 'lancedb', 'thop', 'seaborn'); "
+        "print(json.dumps({'dt': dt, 'loaded': [m for m in heavy if m in sys.modules]}))"
+    )
+    out = json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True).stdout)
+    assert not out["loaded"], f"'{stmt}' eagerly imports {out['loaded']}"
+    assert out["dt"] < budget, f"'{stmt}' took {out['dt']:.2f}s, exceeding the {budget}s startup budget"
+
+
 def test_utils_checks():
     """Test various utility checks."""
     checks.check_yolov5u_filename("yolov5n.pt")
@@ -620,6 +1061,77 @@ def test_classify_transforms_train(image, auto_augment, erasing, force_color_jit
     assert transformed_image.dtype == torch.float32
 
 
+def test_copy_paste():
+    """Tests CopyPaste pastes the full area of overlapping segments."""
+    from ultralytics.data.augment import CopyPaste
+    from ultralytics.utils.instance import Instances
+    from ultralytics.utils.ops import resample_segments
+
+    squares = [np.array([[x, x], [x + 20, x], [x + 20, x + 20], [x, x + 20]], dtype=np.float32) for x in (10, 20)]
+    segments = np.stack(resample_segments(squares, n=100))
+    boxes = np.concatenate((segments.min(1), segments.max(1)), 1)
+    im = np.zeros((64, 128, 3), dtype=np.uint8)
+    im[:, :64] = 255  # pasted left half shows up white in the right half
+    labels = CopyPaste(p=1.0)(
+        {
+            "img": im,
+            "cls": np.zeros((2, 1)),
+            "instances": Instances(boxes, segments, bbox_format="xyxy", normalized=False),
+        }
+    )
+
+    assert len(labels["cls"]) == len(labels["instances"]) == 4
+    assert (labels["img"][21:29, 128 - 29 : 128 - 21] == 255).all()  # overlap of both pasted squares is filled
+
+
+@pytest.mark.parametrize("augment", [True, False])
+def test_classify_batch_transforms(image, augment):
+    """Tests batched classification transforms on collated uint8 images."""
+    from ultralytics.data.augment import ClassifyBatchAugment
+
+    transform = ClassifyBatchAugment(size=64, mean=(0.5, 0.5, 0.5), std=(0.5, 0.5, 0.5), erasing=0.5, augment=augment)
+    im = torch.from_numpy(cv2.resize(image, (64, 64))[..., ::-1].transpose(2, 0, 1).copy())
+    ims = transform(im[None].repeat(4, 1, 1, 1))
+
+    assert ims.shape == (4, 3, 64, 64)
+    assert ims.dtype == torch.float32
+    assert -1.0 <= ims.min() and ims.max() <= 1.0
+
+
+def test_classify_random_resized_crop(image):
+    """Tests that random resized crops are taken from the original image before resizing."""
+    from ultralytics.data.augment import ClassifyRandomResizedCrop
+
+    im = np.zeros((480, 640, 3), dtype=np.uint8)
+    im[:, 1::2] = 255  # 1 pixel stripes, lost if the image is resized before cropping
+    crop = ClassifyRandomResizedCrop(size=64, scale=(0.0001, 0.0001), ratio=(1.0, 1.0))(im)  # 6x6 crops
+    assert crop.shape == (64, 64, 3) and crop.std() > 50
+    assert ClassifyRandomResizedCrop(size=64)(image).shape == (64, 64, 3)
+
+
+def test_classify_dataset_eval_cache():
+    """Tests evaluation crops match classify_transforms() and are cached on disk per imgsz and crop_fraction."""
+    import shutil
+
+    from ultralytics.data.augment import classify_transforms
+    from ultralytics.data.dataset import ClassificationDataset
+
+    root = TMP / "classify-cache" / "val"
+    (root / "bus").mkdir(parents=True, exist_ok=True)
+    shutil.copy(ASSETS / "bus.jpg", root / "bus")
+    crops = []
+    for crop_fraction in 1.0, 0.5, 1.0:
+        args = get_cfg(overrides={"imgsz": 64, "cache": "disk", "crop_fraction": crop_fraction})
+        dataset = ClassificationDataset(root, args, augment=False)
+        crops.append(dataset.load_image(0))
+        assert dataset.samples[0][2].exists()
+
+        im = cv2.imread(str(ASSETS / "bus.jpg"))
+        im = classify_transforms(64, crop_fraction=crop_fraction)(Image.fromarray(im[..., ::-1]))  # as predict()
+        assert np.abs(crops[-1][..., ::-1] / 255 - im.permute(1, 2, 0).numpy()).mean() < 0.002
+    assert not np.array_equal(crops[0], crops[1]) and np.array_equal(crops[0], crops[2])
+
+
 @pytest.mark.slow
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 def test_model_tune():
@@ -643,3 +1155,83 @@ def test_yolo_world():
     model = YOLO("yolov8s-world.pt")  # no YOLOv8n-world model yet
     model.set_classes(["tree", "window"])
     model(ASSETS / "bus.jpg", conf=0.01)
+
+
+def test_train_variants():
+    """Test training loss variants in lockstep on the batches of a shared dataloader."""
+    model = YOLO("yolov8_ciou.yaml")
+    model.train(data=_local_dataset(), epochs=2, variants=["yolov8_df_50.yaml"], imgsz=160, project=TMP / "runs")
+    (variant,) = model.trainer.variants
+    assert variant.save_dir.name == f"{model.trainer.save_dir.name}-yolov8_df_50"
+    assert variant.model.yaml["iou_loss"] == "InterpIoU" and variant.epoch == model.trainer.epoch
+    for trainer in model.trainer, variant:
+        assert trainer.best.exists() and len(trainer.csv.read_text().splitlines()) == 3  # header and 2 epochs
+
+
+@pytest.mark.slow
+def test_tune_asha():
+    """Test parallel hyperparameter tuning with ASHA trials paused at a rung and resumed when promoted."""
+    YOLO("yolov8n.yaml").tune(
+        data=_local_dataset(), epochs=3, iterations=3, parallel=2, rungs=2, eta=2, imgsz=160, plots=False, project=TMP
+    )
+    rows = np.loadtxt(TMP / "tune" / "tune_results.csv", ndmin=2, delimiter=",", skiprows=1)
+    assert len(rows) >= 4  # 3 trials at 2 epochs and at least 1 promoted to 3 epochs
+    assert max(len(f.read_text().splitlines()) for f in TMP.glob("train*/results.csv")) == 4  # header and 3 epochs
+
+
+def test_autobatch_cpu():
+    """Test CPU AutoBatch, fitting batch sizes to the peak RSS of training steps within the free memory."""
+    from ultralytics.utils.autobatch import check_train_batch_size, cpu_memory, fit_batch_size
+
+    b, p = fit_batch_size([1, 2, 4, 8], [2.0, 3.0, 5.0, 9.0], 17.5)  # 1G per image and 1G intercept
+    assert b == 16 and p == pytest.approx([1.0, 1.0])
+    assert fit_batch_size([1, 2, 4, 8], [2.0, 3.0, None, None], 17.0)[0] == 2  # prior safe point of failures
+    total, free = cpu_memory()
+    assert 0 < free <= total
+
+    from pathlib import Path
+    from unittest.mock import patch
+
+    cgroup = TMP / "cgroup"  # v2 with 1G limit, 0.75G used of which 0.5G is reclaimable page cache
+    cgroup.mkdir(parents=True, exist_ok=True)
+    (cgroup / "memory.max").write_text(f"{2**30}\n")
+    (cgroup / "memory.current").write_text(f"{3 * 2**28}\n")
+    (cgroup / "memory.stat").write_text(f"anon {2**28}\ninactive_file {2**29}\n")
+    with patch("ultralytics.utils.autobatch.Path", lambda d: cgroup if d == "/sys/fs/cgroup" else Path(d)):
+        assert cpu_memory() == (2**30, min(free, 3 * 2**28))
+    assert 1 <= check_train_batch_size(YOLO("yolov8n.yaml").model, imgsz=64, amp=False) <= 1024
+
+
+def test_checkpoint():
+    """Test activation checkpointing policies give the gradients and BatchNorm statistics of a regular step."""
+    from ultralytics.nn.tasks import YOLOv10DetectionModel
+
+    model = YOLOv10DetectionModel("yolov10n.yaml", verbose=False).train()
+    counts = [deepcopy(model).set_checkpoint(p) for p in (True, "backbone", 2, False)]
+    assert counts == [12, 7, 6, 0]
+    with pytest.raises(ValueError):
+        model.set_checkpoint("neck")
+    checkpointed = deepcopy(model)
+    checkpointed.set_checkpoint(True)
+    x = torch.rand(2, 3, 64, 64)
+    for m in model, checkpointed:
+        sum(t.sum() for v in m(x).values() for t in v).backward()
+    for a, b in zip(model.parameters(), checkpointed.parameters()):
+        assert (a.grad is None and b.grad is None) or torch.allclose(a.grad, b.grad)
+    for a, b in zip(model.buffers(), checkpointed.buffers()):
+        assert torch.equal(a, b)  # running statistics updated once
+
+
+def test_bf16():
+    """Test bfloat16 autocast training with amp=bf16, and validation and prediction with half=bf16 on CPU."""
+    from ultralytics import YOLOv10
+
+    model = YOLOv10("yolov10n.yaml")
+    model.train(data=_local_dataset(), amp="bf16", epochs=1, imgsz=160, device="cpu", project=TMP / "runs")
+    assert not model.trainer.amp and model.trainer.bf16
+    assert all(p.dtype == torch.float32 for p in model.model.parameters())
+    metrics = model.val(data=_local_dataset(), half="bf16", imgsz=160, device="cpu", project=TMP / "runs")
+    assert metrics.box.map >= 0
+    results = model.predict(ASSETS / "bus.jpg", half="bf16", imgsz=160, device="cpu", conf=0.0)
+    assert model.predictor.model.bf16 and not model.predictor.model.fp16
+    assert results[0].boxes.data.dtype == torch.float32
@@ -2,13 +2,23 @@
 
 __version__ = "8.1.34"
 
-from ultralytics.data.explorer.explorer import Explorer
-from ultralytics.models import RTDETR, SAM, YOLO, YOLOWorld, YOLOv10
-from ultralytics.models.fastsam import FastSAM
-from ultralytics.models.nas import NAS
-from ultralytics.utils import ASSETS, SETTINGS as settings
-from ultralytics.utils.checks import check_yolo as checks
-from ultralytics.utils.downloads import download
+import importlib
+
+# Public attributes are imported on first access, so 'import ultralytics' and the CLI only load what they use
+_LAZY_IMPORTS = {
+    "ASSETS": ("ultralytics.utils", "ASSETS"),
+    "YOLO": ("ultralytics.models", "YOLO"),
+    "YOLOWorld": ("ultralytics.models", "YOLOWorld"),
+    "NAS": ("ultralytics.models.nas", "NAS"),
+    "SAM": ("ultralytics.models", "SAM"),
+    "FastSAM": ("ultralytics.models.fastsam", "FastSAM"),
+    "RTDETR": ("ultralytics.models", "RTDETR"),
+    "checks": ("ultralytics.utils.checks", "check_yolo"),
+    "download": ("ultralytics.utils.downloads", "download"),
+    "settings": ("ultralytics.utils", "SETTINGS"),
+    "Explorer": ("ultralytics.data.explorer.explorer", "Explorer"),
+    "YOLOv10": ("ultralytics.models", "YOLOv10"),
+}
 
 __all__ = (
     "__version__",
@@ -23,5 +33,19 @@ __all__ = (
     "download",
     "settings",
     "Explorer",
-    "YOLOv10"
+    "YOLOv10",
 )
+
+
+def __getattr__(name):
+    """Imports public attributes like `YOLO` and `Explorer` on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _LAZY_IMPORTS[name]
+    value = globals()[name] = getattr(importlib.import_module(module), attr)  # cache for later accesses
+    return value
+
+
+def __dir__():
+    """Lists public attributes including the ones that are not imported yet."""
+    return sorted({*globals(), *__all__})
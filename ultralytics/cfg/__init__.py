@@ -32,7 +32,7 @@ from ultralytics.utils import (
 )
 
 # Define valid tasks and modes
-MODES = {"train", "val", "predict", "export", "track", "benchmark"}
+MODES = {"train", "val", "predict", "export", "track", "benchmark", "prune"}
 TASKS = {"detect", "segment", "classify", "pose", "obb"}
 TASK2DATA = {
     "detect": "coco8.yaml",
@@ -81,6 +81,15 @@ CLI_HELP_MSG = f"""
     6. Explore your datasets using semantic search and SQL with a simple GUI powered by Ultralytics Explorer API
         yolo explorer
 
+    7. Write a pre-resized copy of a dataset for faster fixed-imgsz training
+        yolo data materialize data=coco128.yaml imgsz=640
+
+    8. Pack a dataset into tar shards that are streamed sequentially during training
+        yolo data pack data=coco128.yaml shard_size=1000
+
+    9. Prune 25% and 50% of the channels of a YOLOv10n model, fine-tune each for 10 epochs and report accuracy and speed
+        yolo prune model=yolov10n.pt data=coco128.yaml sparsity=[0.25,0.5] importance=taylor epochs=10
+
     5. Run special commands:
         yolo help
         yolo checks
@@ -95,9 +104,10 @@ CLI_HELP_MSG = f"""
     """
 
 # Define keys for arg type checks
-CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "degrees", "shear", "time"}
+CFG_FLOAT_KEYS = {"warmup_epochs", "box", "cls", "dfl", "distill", "degrees", "shear", "time"}
 CFG_FRACTION_KEYS = {
     "dropout",
+    "val_fraction",
     "iou",
     "lr0",
     "lrf",
@@ -124,11 +134,15 @@ CFG_FRACTION_KEYS = {
 }  # fraction floats 0.0 - 1.0
 CFG_INT_KEYS = {
     "epochs",
+    "val_dense",
+    "stop_epoch",
     "patience",
     "batch",
     "workers",
     "seed",
     "close_mosaic",
+    "distill_views",
+    "calib",
     "mask_ratio",
     "max_det",
     "vid_stride",
@@ -147,10 +161,13 @@ CFG_BOOL_KEYS = {
     "cos_lr",
     "overlap_mask",
     "val",
+    "val_async",
     "save_json",
     "save_hybrid",
     "half",
     "dnn",
+    "mmap",
+    "compile",
     "plots",
     "show",
     "save_txt",
@@ -172,6 +189,7 @@ CFG_BOOL_KEYS = {
     "nms",
     "profile",
     "multi_scale",
+    "qat",
 }
 
 
@@ -255,7 +273,7 @@ def check_cfg(cfg, hard=True):
                         f"'{k}={v}' is of invalid type {type(v).__name__}. " f"'{k}' must be an int (i.e. '{k}=8')"
                     )
                 cfg[k] = int(v)
-            elif k in CFG_BOOL_KEYS and not isinstance(v, bool):
+            elif k in CFG_BOOL_KEYS and not isinstance(v, bool) and not (k == "half" and v == "bf16"):
                 if hard:
                     raise TypeError(
                         f"'{k}={v}' is of invalid type {type(v).__name__}. "
@@ -409,6 +427,35 @@ def handle_yolo_settings(args: List[str]) -> None:
         LOGGER.warning(f"WARNING ⚠️ settings error: '{e}'. Please see {url} for help.")
 
 
+def handle_yolo_data(args: List[str]) -> None:
+    """
+    Handle YOLO dataset command-line interface (CLI) commands.
+
+    This function processes dataset tool commands such as materialize and pack, passing the remaining 'key=value'
+    arguments to the corresponding function in `ultralytics.data`.
+
+    Args:
+        args (List[str]): A list of command line arguments for the dataset tools.
+
+    Example:
+        ```bash
+        yolo data materialize data=coco128.yaml imgsz=640 workers=8
+        yolo data pack data=coco128.yaml shard_size=1000
+        ```
+    """
+    kwargs = dict(parse_key_value_pair(a) for a in merge_equals_args(args[1:]))
+    if args and args[0] == "materialize":
+        from ultralytics.data.materialize import materialize_dataset
+
+        materialize_dataset(**kwargs)
+    elif args and args[0] == "pack":
+        from ultralytics.data.shards import pack_dataset
+
+        pack_dataset(**kwargs)
+    else:
+        LOGGER.warning("WARNING ⚠️ 'yolo data' requires a command, i.e. 'yolo data materialize data=coco128.yaml'.")
+
+
 def handle_explorer():
     """Open the Ultralytics Explorer GUI."""
     checks.check_requirements("streamlit")
@@ -472,6 +519,7 @@ def entrypoint(debug=""):
         "login": lambda: handle_yolo_hub(args),
         "copy-cfg": copy_default_cfg,
         "explorer": lambda: handle_explorer(),
+        "data": lambda: handle_yolo_data(args[1:]),
     }
     full_args_dict = {**DEFAULT_CFG_DICT, **{k: None for k in TASKS}, **{k: None for k in MODES}, **special}
 
@@ -541,6 +589,12 @@ def entrypoint(debug=""):
         model = "yolov8n.pt"
         LOGGER.warning(f"WARNING ⚠️ 'model' argument is missing. Using default 'model={model}'.")
     overrides["model"] = model
+    if overrides.get("mmap") and mode in {"predict", "val"} and model.endswith(".pt"):
+        from ultralytics.nn.tasks import attempt_load_weights
+
+        attempt_load_weights(model, fuse=True, mmap=True)  # write or refresh the *.safetensors sidecar
+        if Path(model).with_suffix(".safetensors").is_file():
+            model = str(Path(model).with_suffix(".safetensors"))  # memory-mapped inference weights
     # stem = Path(model).stem.lower()
     stem = model.lower()
     if "rtdetr" in stem:  # guess architecture
@@ -588,7 +642,7 @@ def entrypoint(debug=""):
     if mode in ("predict", "track") and "source" not in overrides:
         overrides["source"] = DEFAULT_CFG.source or ASSETS
         LOGGER.warning(f"WARNING ⚠️ 'source' argument is missing. Using default 'source={overrides['source']}'.")
-    elif mode in ("train", "val"):
+    elif mode in ("train", "val", "prune"):
         if "data" not in overrides and "resume" not in overrides:
             overrides["data"] = DEFAULT_CFG.data or TASK2DATA.get(task or DEFAULT_CFG.task, DEFAULT_CFG.data)
             LOGGER.warning(f"WARNING ⚠️ 'data' argument is missing. Using default 'data={overrides['data']}'.")
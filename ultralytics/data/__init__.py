@@ -3,12 +3,14 @@
 from .base import BaseDataset
 from .build import build_dataloader, build_yolo_dataset, load_inference_source
 from .dataset import ClassificationDataset, SemanticDataset, YOLODataset
+from .shards import ShardedYOLODataset
 
 __all__ = (
     "BaseDataset",
     "ClassificationDataset",
     "SemanticDataset",
     "YOLODataset",
+    "ShardedYOLODataset",
     "build_yolo_dataset",
     "build_dataloader",
     "load_inference_source",
@@ -792,7 +792,7 @@ class CopyPaste:
         if self.p and len(instances.segments):
             n = len(instances)
             _, w, _ = im.shape  # height, width, channels
-            im_new = np.zeros(im.shape, np.uint8)
+            im_new = np.zeros(im.shape[:2], np.uint8)
 
             # Calculate ioa first then select indexes randomly
             ins_flip = deepcopy(instances)
@@ -801,14 +801,24 @@ class CopyPaste:
             ioa = bbox_ioa(ins_flip.bboxes, instances.bboxes)  # intersection over area, (N, M)
             indexes = np.nonzero((ioa < 0.30).all(1))[0]  # (N, )
             n = len(indexes)
-            for j in random.sample(list(indexes), k=round(self.p * n)):
-                cls = np.concatenate((cls, cls[[j]]), axis=0)
-                instances = Instances.concatenate((instances, ins_flip[[j]]), axis=0)
-                cv2.drawContours(im_new, instances.segments[[j]].astype(np.int32), -1, (1, 1, 1), cv2.FILLED)
-
-            result = cv2.flip(im, 1)  # augment segments (flip left-right)
-            i = cv2.flip(im_new, 1).astype(bool)
-            im[i] = result[i]
+            j = random.sample(list(indexes), k=round(self.p * n))
+            if j:
+                cls = np.concatenate((cls, cls[j]), axis=0)
+                segments = instances.segments[j].astype(np.int32)
+                instances = Instances.concatenate((instances, ins_flip[j]), axis=0)
+
+                # Filled contours drawn in one call are combined even-odd, so overlapping segments are drawn one by one
+                ioa = bbox_ioa(instances.bboxes[j], instances.bboxes[j])
+                np.fill_diagonal(ioa, 0.0)
+                overlap = (ioa > 0).any(1)
+                if not overlap.all():
+                    cv2.drawContours(im_new, segments[~overlap], -1, 1, cv2.FILLED)
+                for segment in segments[overlap]:
+                    cv2.drawContours(im_new, segment[None], -1, 1, cv2.FILLED)
+
+                result = cv2.flip(im, 1)  # augment segments (flip left-right)
+                i = cv2.flip(im_new, 1).astype(bool)
+                im[i] = result[i]
 
         labels["img"] = im
         labels["cls"] = cls
@@ -1057,6 +1067,41 @@ def classify_transforms(
 
 
 # Classification augmentations train ---------------------------------------------------------------------------------------
+def classify_auto_augment(auto_augment, interpolation: T.InterpolationMode = T.InterpolationMode.BILINEAR):
+    """
+    Returns the torchvision auto augmentation policy transform for classification training.
+
+    Args:
+        auto_augment (str): auto augmentation policy. can be 'randaugment', 'augmix' or 'autoaugment'.
+        interpolation (T.InterpolationMode): interpolation mode. default is T.InterpolationMode.BILINEAR.
+
+    Returns:
+        (list): A list with the policy transform, empty if it is not supported by the installed torchvision.
+    """
+    assert isinstance(auto_augment, str)
+    if auto_augment == "randaugment":
+        if TORCHVISION_0_11:
+            return [T.RandAugment(interpolation=interpolation)]
+        LOGGER.warning('"auto_augment=randaugment" requires torchvision >= 0.11.0. Disabling it.')
+
+    elif auto_augment == "augmix":
+        if TORCHVISION_0_13:
+            return [T.AugMix(interpolation=interpolation)]
+        LOGGER.warning('"auto_augment=augmix" requires torchvision >= 0.13.0. Disabling it.')
+
+    elif auto_augment == "autoaugment":
+        if TORCHVISION_0_10:
+            return [T.AutoAugment(interpolation=interpolation)]
+        LOGGER.warning('"auto_augment=autoaugment" requires torchvision >= 0.10.0. Disabling it.')
+
+    else:
+        raise ValueError(
+            f'Invalid auto_augment policy: {auto_augment}. Should be one of "randaugment", '
+            f'"augmix", "autoaugment" or None'
+        )
+    return []
+
+
 def classify_augmentations(
     size=224,
     mean=DEFAULT_MEAN,
@@ -1109,34 +1154,10 @@ def classify_augmentations(
     secondary_tfl = []
     disable_color_jitter = False
     if auto_augment:
-        assert isinstance(auto_augment, str)
         # color jitter is typically disabled if AA/RA on,
         # this allows override without breaking old hparm cfgs
         disable_color_jitter = not force_color_jitter
-
-        if auto_augment == "randaugment":
-            if TORCHVISION_0_11:
-                secondary_tfl += [T.RandAugment(interpolation=interpolation)]
-            else:
-                LOGGER.warning('"auto_augment=randaugment" requires torchvision >= 0.11.0. Disabling it.')
-
-        elif auto_augment == "augmix":
-            if TORCHVISION_0_13:
-                secondary_tfl += [T.AugMix(interpolation=interpolation)]
-            else:
-                LOGGER.warning('"auto_augment=augmix" requires torchvision >= 0.13.0. Disabling it.')
-
-        elif auto_augment == "autoaugment":
-            if TORCHVISION_0_10:
-                secondary_tfl += [T.AutoAugment(interpolation=interpolation)]
-            else:
-                LOGGER.warning('"auto_augment=autoaugment" requires torchvision >= 0.10.0. Disabling it.')
-
-        else:
-            raise ValueError(
-                f'Invalid auto_augment policy: {auto_augment}. Should be one of "randaugment", '
-                f'"augmix", "autoaugment" or None'
-            )
+        secondary_tfl += classify_auto_augment(auto_augment, interpolation)
 
     if not disable_color_jitter:
         secondary_tfl += [T.ColorJitter(brightness=hsv_v, contrast=hsv_v, saturation=hsv_s, hue=hsv_h)]
@@ -1150,6 +1171,169 @@ def classify_augmentations(
     return T.Compose(primary_tfl + secondary_tfl + final_tfl)
 
 
+class ClassifyRandomResizedCrop:
+    """
+    T.RandomResizedCrop for numpy images, cropping the original image before resizing it with OpenCV.
+
+    Crops are sampled like T.RandomResizedCrop and taken at the resolution of the original image, so small crops keep
+    their detail. Used by ClassificationDataset in the dataloader workers, before the batched ClassifyBatchAugment.
+
+    Attributes:
+        size (int): Output image size.
+        scale (tuple): Range of the crop area as a fraction of the image area.
+        ratio (tuple): Range of the crop aspect ratio (width / height).
+    """
+
+    def __init__(self, size=224, scale=None, ratio=None):
+        """Initializes the crop with the output size, and the scale and ratio ranges of T.RandomResizedCrop."""
+        self.size = size
+        self.scale = tuple(scale or (0.08, 1.0))  # default imagenet scale range
+        self.ratio = tuple(ratio or (3.0 / 4.0, 4.0 / 3.0))  # default imagenet ratio range
+
+    def __call__(self, im):
+        """
+        Crops a random region of the image and resizes it to a square.
+
+        Args:
+            im (numpy.ndarray): The input image as a numpy array of shape HWC.
+
+        Returns:
+            (numpy.ndarray): The cropped image of shape (size, size, C).
+        """
+        top, left, h, w = T.RandomResizedCrop.get_params(torch.from_numpy(im).permute(2, 0, 1), self.scale, self.ratio)
+        interp = cv2.INTER_AREA if min(h, w) > self.size else cv2.INTER_LINEAR  # antialias like T.Resize
+        return cv2.resize(im[top : top + h, left : left + w], (self.size, self.size), interpolation=interp)
+
+
+class ClassifyBatchAugment:
+    """
+    Batched classification transforms for collated uint8 RGB image tensors, run in the main process on any device.
+
+    Training batches hold random resized crops that ClassificationDataset took from the original images in the
+    dataloader workers, see ClassifyRandomResizedCrop. Flips, color jitter, normalization and random erasing are
+    applied here with per-image random parameters. Evaluation batches are already resized and center cropped and are
+    only normalized.
+
+    Attributes:
+        size (int): Output image size.
+        augment (bool): Whether to apply the random training transforms.
+
+    Example:
+        ```python
+        tf = ClassifyBatchAugment(size=224, hflip=0.5, erasing=0.4)
+        im = tf(batch['img'].to(device))  # (B, 3, 224, 224) float
+        ```
+    """
+
+    def __init__(
+        self,
+        size=224,
+        mean=DEFAULT_MEAN,
+        std=DEFAULT_STD,
+        hflip=0.5,
+        vflip=0.0,
+        hsv_h=0.015,  # image HSV-Hue augmentation (fraction)
+        hsv_s=0.4,  # image HSV-Saturation augmentation (fraction)
+        hsv_v=0.4,  # image HSV-Value augmentation (fraction)
+        color_jitter=True,
+        erasing=0.0,
+        augment=True,
+    ):
+        """
+        Initializes the batched transforms with the same arguments as classify_augmentations().
+
+        Args:
+            size (int): image size
+            mean (tuple): mean values of RGB channels
+            std (tuple): std values of RGB channels
+            hflip (float): probability of horizontal flip
+            vflip (float): probability of vertical flip
+            hsv_h (float): image HSV-Hue augmentation (fraction)
+            hsv_s (float): image HSV-Saturation augmentation (fraction)
+            hsv_v (float): image HSV-Value augmentation (fraction)
+            color_jitter (bool): apply color jitter, typically disabled if auto augment is enabled
+            erasing (float): probability of random erasing
+            augment (bool): apply the random training transforms, otherwise only normalize
+        """
+        self.size = size
+        self.mean = torch.tensor(mean).view(1, 3, 1, 1) * 255
+        self.std = torch.tensor(std).view(1, 3, 1, 1) * 255
+        self.hflip, self.vflip = hflip, vflip
+        self.hsv_h, self.hsv_s, self.hsv_v = hsv_h, hsv_s, hsv_v
+        self.color_jitter = color_jitter and any((hsv_h, hsv_s, hsv_v))
+        self.erasing = erasing
+        self.augment = augment
+
+    def __call__(self, im):
+        """
+        Transforms a batch of images.
+
+        Args:
+            im (torch.Tensor): uint8 RGB images of shape (B, 3, size, size).
+
+        Returns:
+            (torch.Tensor): Normalized float images of shape (B, 3, size, size).
+        """
+        im = im.float()
+        if self.augment:
+            if self.hflip > 0.0:
+                im = self.random_flip(im, self.hflip, dim=3)
+            if self.vflip > 0.0:
+                im = self.random_flip(im, self.vflip, dim=2)
+            if self.color_jitter:
+                im = self.random_color_jitter(im)
+        im = (im - self.mean.to(im.device)) / self.std.to(im.device)
+        if self.augment and self.erasing > 0.0:
+            im = self.random_erasing(im)
+        return im
+
+    @staticmethod
+    def random_flip(im, p, dim):
+        """Flips each image along dimension 'dim' with probability p."""
+        m = torch.rand(len(im), 1, 1, 1, device=im.device) < p
+        return torch.where(m, im.flip(dim), im)
+
+    def random_color_jitter(self, im):
+        """Applies T.ColorJitter brightness, contrast, saturation and hue with per-image factors, in that order."""
+        n, dev = len(im), im.device
+
+        def factor(v):
+            """Returns per-image factors sampled from [max(0, 1 - v), 1 + v]."""
+            return torch.empty(n, 1, 1, 1, device=dev).uniform_(max(0.0, 1 - v), 1 + v)
+
+        gray = im.new_tensor([0.299, 0.587, 0.114]).view(1, 1, 3)  # luma weights
+        if self.hsv_v:
+            im.mul_(factor(self.hsv_v)).clamp_(0, 255)  # brightness
+            f = factor(self.hsv_v)
+            mean = (gray @ im.flatten(2)).mean(2, keepdim=True).unsqueeze(3)
+            im.mul_(f).add_(mean * (1 - f)).clamp_(0, 255)  # contrast
+        if self.hsv_s:
+            f = factor(self.hsv_s)
+            im.mul_(f).add_((gray @ im.flatten(2)).view(n, 1, *im.shape[2:]) * (1 - f)).clamp_(0, 255)  # saturation
+        if self.hsv_h:  # hue, rotation of the chroma plane in YIQ space
+            a = torch.empty(n, device=dev).uniform_(-self.hsv_h, self.hsv_h) * 2 * math.pi
+            cos, sin, zero, one = a.cos(), a.sin(), torch.zeros_like(a), torch.ones_like(a)
+            rot = torch.stack((one, zero, zero, zero, cos, -sin, zero, sin, cos), 1).view(n, 3, 3)
+            yiq = im.new_tensor([[0.299, 0.587, 0.114], [0.596, -0.274, -0.322], [0.211, -0.523, 0.312]])
+            m = torch.linalg.inv(yiq) @ rot @ yiq
+            im = torch.bmm(m, im.flatten(2)).view(im.shape).clamp_(0, 255)
+        return im
+
+    def random_erasing(self, im):
+        """Erases a random rectangle of each image with probability `erasing`, like T.RandomErasing with value=0."""
+        n, _, h, w = im.shape
+        dev = im.device
+        a = h * w * torch.empty(n, device=dev).uniform_(0.02, 0.33)
+        r = torch.empty(n, device=dev).uniform_(math.log(0.3), math.log(3.3)).exp()
+        eh, ew = (a * r).sqrt().round().clamp(1, h - 1), (a / r).sqrt().round().clamp(1, w - 1)
+        y0, x0 = (torch.rand(n, device=dev) * (h - eh + 1)).floor(), (torch.rand(n, device=dev) * (w - ew + 1)).floor()
+        ys, xs = torch.arange(h, device=dev), torch.arange(w, device=dev)
+        my = (ys >= y0[:, None]) & (ys < (y0 + eh)[:, None])
+        mx = (xs >= x0[:, None]) & (xs < (x0 + ew)[:, None])
+        m = (my[:, :, None] & mx[:, None, :]) & (torch.rand(n, 1, 1, device=dev) < self.erasing)
+        return im.masked_fill(m[:, None], 0.0)
+
+
 # NOTE: keep this class for backward compatibility
 class ClassifyLetterBox:
     """
@@ -1,10 +1,9 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-import glob
 import math
 import os
 import random
-from copy import deepcopy
+from copy import copy, deepcopy
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
 from typing import Optional
@@ -15,7 +14,7 @@ import psutil
 from torch.utils.data import Dataset
 
 from ultralytics.utils import DEFAULT_CFG, LOCAL_RANK, LOGGER, NUM_THREADS, TQDM
-from .utils import HELP_URL, IMG_FORMATS
+from .utils import HELP_URL, IMG_FORMATS, get_file_index
 
 
 class BaseDataset(Dataset):
@@ -36,6 +35,7 @@ class BaseDataset(Dataset):
         single_cls (bool, optional): If True, single class training is used. Defaults to False.
         classes (list): List of included classes. Default is None.
         fraction (float): Fraction of dataset to utilize. Default is 1.0 (use all data).
+        materialized (int, optional): Long side the images were pre-resized to by `yolo data materialize`.
 
     Attributes:
         im_files (list): List of image file paths.
@@ -61,6 +61,7 @@ class BaseDataset(Dataset):
         single_cls=False,
         classes=None,
         fraction=1.0,
+        materialized=None,
     ):
         """Initialize BaseDataset with given configuration and options."""
         super().__init__()
@@ -70,6 +71,12 @@ class BaseDataset(Dataset):
         self.single_cls = single_cls
         self.prefix = prefix
         self.fraction = fraction
+        self.materialized = materialized
+        if materialized and materialized != imgsz:
+            LOGGER.warning(
+                f"{self.prefix}WARNING ⚠️ images were materialized at imgsz={materialized} but imgsz={imgsz} was "
+                f"requested and will be resized on load. Run 'yolo data materialize imgsz={imgsz}' to avoid this."
+            )
         self.im_files = self.get_img_files(self.img_path)
         self.labels = self.get_labels()
         self.update_labels(include_class=classes)  # single_cls and include_class
@@ -104,7 +111,7 @@ class BaseDataset(Dataset):
             for p in img_path if isinstance(img_path, list) else [img_path]:
                 p = Path(p)  # os-agnostic
                 if p.is_dir():  # dir
-                    f += glob.glob(str(p / "**" / "*.*"), recursive=True)
+                    f += list(get_file_index(p))  # cached recursive listing, like glob.glob(str(p / "**" / "*.*"))
                     # F = list(p.rglob('*.*'))  # pathlib
                 elif p.is_file():  # file
                     with open(p) as t:
@@ -163,7 +170,7 @@ class BaseDataset(Dataset):
             h0, w0 = im.shape[:2]  # orig hw
             if rect_mode:  # resize long side to imgsz while maintaining aspect ratio
                 r = self.imgsz / max(h0, w0)  # ratio
-                if r != 1:  # if sizes are not equal
+                if r != 1 and self.materialized != self.imgsz:  # if sizes are not equal and not pre-resized
                     w, h = (min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz))
                     im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
             elif not (h0 == w0 == self.imgsz):  # resize by stretching image to square imgsz
@@ -228,7 +235,7 @@ class BaseDataset(Dataset):
         bi = np.floor(np.arange(self.ni) / self.batch_size).astype(int)  # batch index
         nb = bi[-1] + 1  # number of batches
 
-        s = np.array([x.pop("shape") for x in self.labels])  # hw
+        s = np.array([x["shape"] for x in self.labels])  # hw, kept to set the shapes of subset()
         ar = s[:, 0] / s[:, 1]  # aspect ratio
         irect = ar.argsort()
         self.im_files = [self.im_files[i] for i in irect]
@@ -248,6 +255,27 @@ class BaseDataset(Dataset):
         self.batch_shapes = np.ceil(np.array(shapes) * self.imgsz / self.stride + self.pad).astype(int) * self.stride
         self.batch = bi  # batch index of image
 
+    def subset(self, indices):
+        """
+        Returns a copy of the dataset restricted to the images at `indices`, i.e. a validation subset.
+
+        Labels, transforms and cached images are shared with the dataset, rectangular batch shapes are set again.
+
+        Args:
+            indices (list): Indices of the images to keep.
+
+        Returns:
+            (BaseDataset): The dataset subset.
+        """
+        dataset = copy(self)
+        for k in "im_files", "labels", "ims", "im_hw0", "im_hw", "npy_files":
+            setattr(dataset, k, [getattr(self, k)[i] for i in indices])
+        dataset.ni = len(dataset.labels)
+        dataset.buffer = []
+        if dataset.rect:
+            dataset.set_rectangle()
+        return dataset
+
     def __getitem__(self, index):
         """Returns transformed label information for given index."""
         return self.transforms(self.get_image_and_label(index))
@@ -1,13 +1,15 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import os
+import queue
 import random
+import threading
 from pathlib import Path
 
 import numpy as np
 import torch
 from PIL import Image
-from torch.utils.data import dataloader, distributed
+from torch.utils.data import IterableDataset, dataloader, distributed
 
 from ultralytics.data.loaders import (
     LOADERS,
@@ -23,6 +25,7 @@ from ultralytics.data.utils import IMG_FORMATS, VID_FORMATS
 from ultralytics.utils import RANK, colorstr
 from ultralytics.utils.checks import check_file
 from .dataset import YOLODataset
+from .shards import SHARD_INDEX_SUFFIX, ShardedYOLODataset
 from .utils import PIN_MEMORY
 
 
@@ -57,6 +60,120 @@ class InfiniteDataLoader(dataloader.DataLoader):
         self.iterator = self._get_iterator()
 
 
+class StreamDataLoader(dataloader.DataLoader):
+    """
+    Dataloader for iterable-style streaming datasets, i.e. ShardedYOLODataset.
+
+    Workers are restarted every epoch, so dataset changes such as closing mosaic reach them without a reset.
+    """
+
+    def reset(self):
+        """Reset iterator, a no-op as workers pick up dataset changes at the start of every epoch."""
+
+
+class LockstepLoader:
+    """
+    Shares the batches of one training dataloader between several trainers, which train in lockstep on them.
+
+    A producer thread runs an epoch of the dataloader once every open view has started iterating that epoch, and puts
+    every batch into the bounded queue of each open view, so images are loaded and augmented once for all trainers.
+    Views yield shallow copies of the batch dicts, trainers must not modify the batch tensors in place.
+
+    Attributes:
+        loader (InfiniteDataLoader | StreamDataLoader): The shared dataloader.
+        views (list): A LockstepView per trainer, used as its train_loader.
+        epoch (int): Number of epochs started by the producer.
+        pending_reset (bool): Whether a view requested a dataloader reset before the next epoch.
+        error (Exception | None): Dataloader error, re-raised by the views.
+    """
+
+    def __init__(self, loader, n, prefetch=2):
+        """Initializes the LockstepLoader with `n` views of `loader`, each buffering up to `prefetch` batches."""
+        self.loader = loader
+        self.views = [LockstepView(self, prefetch) for _ in range(n)]
+        self.lock = threading.Condition()
+        self.epoch, self.pending_reset, self.error = 0, False, None
+        threading.Thread(target=self._produce, name="lockstep", daemon=True).start()
+
+    def _produce(self):
+        """Runs dataloader epochs and feeds their batches to the open views, until all views are closed."""
+        try:
+            while True:
+                with self.lock:
+                    self.lock.wait_for(lambda: all(v.closed or v.epoch > self.epoch for v in self.views))
+                    views = [v for v in self.views if not v.closed]
+                    if not views:
+                        return
+                    if self.pending_reset:  # i.e. after closing mosaic
+                        self.loader.reset()
+                        self.pending_reset = False
+                    self.epoch += 1
+                for batch in self.loader:
+                    for v in views:
+                        v.put(batch)
+                for v in views:
+                    v.put(None)  # end of epoch
+        except Exception as e:
+            self.error = e
+            for v in self.views:
+                v.put(None)
+
+
+class LockstepView:
+    """
+    A trainer's view of a LockstepLoader, iterated like its dataloader.
+
+    Attributes:
+        parent (LockstepLoader): The loader feeding this view.
+        queue (queue.Queue): Batches of the current epoch, terminated by None.
+        epoch (int): Number of epochs started by the trainer.
+        closed (bool): Whether the trainer stopped training, its batches are then dropped.
+    """
+
+    def __init__(self, parent, prefetch=2):
+        """Initializes the view of `parent` with a queue of `prefetch` batches."""
+        self.parent = parent
+        self.queue = queue.Queue(prefetch)
+        self.epoch, self.closed = 0, False
+
+    def __len__(self):
+        """Returns the number of batches per epoch of the shared dataloader."""
+        return len(self.parent.loader)
+
+    def __getattr__(self, name):
+        """Returns attributes of the shared dataloader, i.e. 'dataset' and 'num_workers'."""
+        return getattr(self.parent.loader, name)
+
+    def __iter__(self):
+        """Yields the batches of the next epoch, once all open views have started it."""
+        with self.parent.lock:
+            self.epoch += 1
+            self.parent.lock.notify_all()
+        while (batch := self.queue.get()) is not None:
+            yield dict(batch)
+        if self.parent.error is not None:
+            raise self.parent.error
+
+    def put(self, batch):
+        """Queues a batch, or the end of epoch if None, waiting for the trainer unless the view is closed."""
+        while not self.closed:
+            try:
+                return self.queue.put(batch, timeout=1)
+            except queue.Full:
+                pass
+
+    def reset(self):
+        """Resets the shared dataloader before the next epoch, after dataset changes such as closing mosaic."""
+        with self.parent.lock:
+            self.parent.pending_reset = True
+
+    def close(self):
+        """Closes the view once its trainer stops, so the other views continue without it."""
+        with self.parent.lock:
+            self.closed = True
+            self.parent.lock.notify_all()
+
+
 class _RepeatSampler:
     """
     Sampler that repeats forever.
@@ -83,8 +200,9 @@ def seed_worker(worker_id):  # noqa
 
 
 def build_yolo_dataset(cfg, img_path, batch, data, mode="train", rect=False, stride=32):
-    """Build YOLO Dataset."""
-    return YOLODataset(
+    """Build YOLO Dataset, streamed from tar shards if img_path is a shard index written by `yolo data pack`."""
+    dataset = ShardedYOLODataset if str(img_path).endswith(SHARD_INDEX_SUFFIX) else YOLODataset
+    return dataset(
         img_path=img_path,
         imgsz=cfg.imgsz,
         batch_size=batch,
@@ -104,10 +222,21 @@ def build_yolo_dataset(cfg, img_path, batch, data, mode="train", rect=False, str
 
 
 def build_dataloader(dataset, batch, workers, shuffle=True, rank=-1):
-    """Return an InfiniteDataLoader or DataLoader for training or validation set."""
+    """Return an InfiniteDataLoader or StreamDataLoader for training or validation set."""
     batch = min(batch, len(dataset))
     nd = torch.cuda.device_count()  # number of CUDA devices
     nw = min([os.cpu_count() // max(nd, 1), workers])  # number of workers
+    if isinstance(dataset, IterableDataset):  # streaming dataset shards itself across ranks and workers
+        dataset.shuffle = shuffle
+        dataset.rank, dataset.world_size = (0, 1) if rank == -1 else (rank, torch.distributed.get_world_size())
+        return StreamDataLoader(
+            dataset=dataset,
+            batch_size=batch,
+            num_workers=nw,
+            pin_memory=PIN_MEMORY,
+            collate_fn=getattr(dataset, "collate_fn", None),
+            worker_init_fn=seed_worker,
+        )
     sampler = None if rank == -1 else distributed.DistributedSampler(dataset, shuffle=shuffle)
     generator = torch.Generator()
     generator.manual_seed(6148914691236517205 + RANK)
@@ -1,5 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 import contextlib
+import math
+import os
 from itertools import repeat
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
@@ -8,13 +10,23 @@ import cv2
 import numpy as np
 import torch
 import torchvision
-from PIL import Image
+import torchvision.transforms as T
 
 from ultralytics.utils import LOCAL_RANK, NUM_THREADS, TQDM, colorstr, is_dir_writeable
 from ultralytics.utils.ops import resample_segments
-from .augment import Compose, Format, Instances, LetterBox, classify_augmentations, classify_transforms, v8_transforms
+from .augment import (
+    ClassifyBatchAugment,
+    ClassifyRandomResizedCrop,
+    Compose,
+    Format,
+    Instances,
+    LetterBox,
+    classify_auto_augment,
+    classify_transforms,
+    v8_transforms,
+)
 from .base import BaseDataset
-from .utils import HELP_URL, LOGGER, get_hash, img2label_paths, verify_image, verify_image_label
+from .utils import HELP_URL, LOGGER, get_file_index, get_hash, img2label_paths, verify_image, verify_image_label
 
 # Ultralytics dataset *.cache version, >= 1.0.0 for YOLOv8
 DATASET_CACHE_VERSION = "1.0.3"
@@ -39,7 +51,7 @@ class YOLODataset(BaseDataset):
         self.use_obb = task == "obb"
         self.data = data
         assert not (self.use_segments and self.use_keypoints), "Can not use both segments and keypoints."
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, materialized=(data or {}).get("materialized"), **kwargs)
 
     def cache_labels(self, path=Path("./labels.cache")):
         """
@@ -102,7 +114,7 @@ class YOLODataset(BaseDataset):
             LOGGER.info("\n".join(msgs))
         if nf == 0:
             LOGGER.warning(f"{self.prefix}WARNING ⚠️ No labels found in {path}. {HELP_URL}")
-        x["hash"] = get_hash(self.label_files + self.im_files)
+        x["hash"] = get_hash(self.label_files + self.im_files, self.file_sizes)
         x["results"] = nf, nm, ne, nc, len(self.im_files)
         x["msgs"] = msgs  # warnings
         save_dataset_cache_file(self.prefix, path, x)
@@ -111,11 +123,12 @@ class YOLODataset(BaseDataset):
     def get_labels(self):
         """Returns dictionary of labels for YOLO training."""
         self.label_files = img2label_paths(self.im_files)
+        self.file_sizes = self.get_file_sizes()
         cache_path = Path(self.label_files[0]).parent.with_suffix(".cache")
         try:
             cache, exists = load_dataset_cache_file(cache_path), True  # attempt to load a *.cache file
             assert cache["version"] == DATASET_CACHE_VERSION  # matches current version
-            assert cache["hash"] == get_hash(self.label_files + self.im_files)  # identical hash
+            assert cache["hash"] == get_hash(self.label_files + self.im_files, self.file_sizes)  # identical hash
         except (FileNotFoundError, AssertionError, AttributeError):
             cache, exists = self.cache_labels(cache_path), False  # run cache ops
 
@@ -149,6 +162,20 @@ class YOLODataset(BaseDataset):
             LOGGER.warning(f"WARNING ⚠️ No labels found in {cache_path}, training may not work correctly. {HELP_URL}")
         return labels
 
+    def get_file_sizes(self):
+        """
+        Returns {file: size} from the cached file indexes of the image directories.
+
+        Label files are not indexed, as they are edited in place without changing their directory mtime, get_hash()
+        stats them instead so edited labels invalidate the *.cache file.
+        """
+        sizes = {}
+        for p in self.img_path if isinstance(self.img_path, list) else [self.img_path]:
+            p = str(Path(p))
+            if os.path.isdir(p):
+                sizes.update(get_file_index(p))
+        return sizes
+
     def build_transforms(self, hyp=None):
         """Builds and appends transforms to the list."""
         if self.augment:
@@ -231,16 +258,21 @@ class ClassificationDataset(torchvision.datasets.ImageFolder):
     augmentation, caching, and verification. It's designed to efficiently handle large datasets for training deep
     learning models, with optional image transformations and caching mechanisms to speed up training.
 
-    This class allows for augmentations using both torchvision and Albumentations libraries, and supports caching images
-    in RAM or on disk to reduce IO overhead during training. Additionally, it implements a robust verification process
-    to ensure data integrity and consistency.
+    Dataloader workers only decode images, take random resized crops of the original training images or resize and
+    center crop evaluation images to fixed size uint8 arrays. Decoded training images and pre-processed evaluation
+    images are cached in RAM or on disk when enabled. Flips, color jitter, normalization and erasing run batched on the
+    collated tensors in the main process through `batch_transforms`, see ClassificationTrainer.preprocess_batch().
+    Additionally, it implements a robust verification process to ensure data integrity and consistency.
 
     Attributes:
         cache_ram (bool): Indicates if caching in RAM is enabled.
         cache_disk (bool): Indicates if caching on disk is enabled.
-        samples (list): A list of tuples, each containing the path to an image, its class index, path to its .npy cache
-                        file (if caching on disk), and optionally the loaded image array (if caching in RAM).
-        torch_transforms (callable): PyTorch transforms to be applied to the images.
+        samples (list): A list of lists, each containing the path to an image, its class index, path to its .npz cache
+                        file (if caching on disk), and optionally the cached image (if caching in RAM).
+        random_resized_crop (ClassifyRandomResizedCrop): Random resized crop of the original images, for training.
+        auto_augment (callable): Per-image auto augmentation policy applied in the workers, if enabled for training.
+        batch_transforms (ClassifyBatchAugment): Batched transforms to apply to collated uint8 images.
+        torch_transforms (callable): PyTorch inference transforms, attached to trained models for prediction.
     """
 
     def __init__(self, root, args, augment=False, prefix=""):
@@ -261,42 +293,77 @@ class ClassificationDataset(torchvision.datasets.ImageFolder):
         if augment and args.fraction < 1.0:  # reduce training fraction
             self.samples = self.samples[: round(len(self.samples) * args.fraction)]
         self.prefix = colorstr(f"{prefix}: ") if prefix else ""
+        self.imgsz = args.imgsz
+        self.augment = augment
+        self.crop_fraction = args.crop_fraction
         self.cache_ram = args.cache is True or args.cache == "ram"  # cache images into RAM
-        self.cache_disk = args.cache == "disk"  # cache images on hard drive as uncompressed *.npy files
+        self.cache_disk = args.cache == "disk"  # cache decoded or pre-processed images on hard drive as *.npy files
         self.samples = self.verify_images()  # filter out bad images
-        self.samples = [list(x) + [Path(x[0]).with_suffix(".npy"), None] for x in self.samples]  # file, index, npy, im
-        scale = (1.0 - args.scale, 1.0)  # (0.08, 1.0)
-        self.torch_transforms = (
-            classify_augmentations(
-                size=args.imgsz,
-                scale=scale,
-                hflip=args.fliplr,
-                vflip=args.flipud,
-                erasing=args.erasing,
-                auto_augment=args.auto_augment,
-                hsv_h=args.hsv_h,
-                hsv_s=args.hsv_s,
-                hsv_v=args.hsv_v,
-            )
-            if augment
-            else classify_transforms(size=args.imgsz, crop_fraction=args.crop_fraction)
+        suffix = ".npy" if augment else f".crop{self.imgsz}-{self.crop_fraction}.npy"  # matches the pre-processing
+        self.samples = [list(x) + [Path(x[0]).with_suffix(suffix), None] for x in self.samples]  # file, index, npy, im
+        self.torch_transforms = classify_transforms(size=args.imgsz, crop_fraction=args.crop_fraction)  # inference
+        self.random_resized_crop = ClassifyRandomResizedCrop(size=args.imgsz, scale=(1.0 - args.scale, 1.0))
+        aa = classify_auto_augment(args.auto_augment) if augment and args.auto_augment else []
+        self.auto_augment = T.Compose(aa) if aa else None  # per-image policies run in the workers
+        self.batch_transforms = ClassifyBatchAugment(
+            size=args.imgsz,
+            hflip=args.fliplr,
+            vflip=args.flipud,
+            hsv_h=args.hsv_h,
+            hsv_s=args.hsv_s,
+            hsv_v=args.hsv_v,
+            color_jitter=self.auto_augment is None,
+            erasing=args.erasing,
+            augment=augment,
         )
 
     def __getitem__(self, i):
-        """Returns subset of data and targets corresponding to given indices."""
-        f, j, fn, im = self.samples[i]  # filename, index, filename.with_suffix('.npy'), image
-        if self.cache_ram and im is None:
-            im = self.samples[i][3] = cv2.imread(f)
-        elif self.cache_disk:
-            if not fn.exists():  # load npy
-                np.save(fn.as_posix(), cv2.imread(f), allow_pickle=False)
+        """Returns the uint8 RGB image tensor and class index of sample i, see `batch_transforms`."""
+        j = self.samples[i][1]  # class index
+        im = self.load_image(i)
+        if self.augment:
+            im = self.random_resized_crop(im)  # of the original image, before resizing
+        im = torch.from_numpy(np.ascontiguousarray(im[..., ::-1].transpose(2, 0, 1)))  # HWC BGR to CHW RGB uint8
+        if self.auto_augment:
+            im = self.auto_augment(im)
+        return {"img": im, "cls": j}
+
+    def load_image(self, i):
+        """Returns the decoded (training) or pre-processed (evaluation) uint8 BGR image of sample i, using caches."""
+        f, _, fn, im = self.samples[i]  # filename, index, filename.with_suffix('.npy'), image
+        if im is not None:
+            return im
+        if self.cache_disk and fn.exists():
             im = np.load(fn)
-        else:  # read image
+        else:
             im = cv2.imread(f)  # BGR
-        # Convert NumPy array to PIL image
-        im = Image.fromarray(cv2.cvtColor(im, cv2.COLOR_BGR2RGB))
-        sample = self.torch_transforms(im)
-        return {"img": sample, "cls": j}
+            if im is None:
+                raise FileNotFoundError(f"Image Not Found {f}")
+            if not self.augment:  # training images are cropped from the original in __getitem__()
+                im = self.preprocess_image(im)
+            if self.cache_disk:
+                np.save(fn.as_posix(), im, allow_pickle=False)
+        if self.cache_ram:
+            self.samples[i][3] = im
+        return im
+
+    def preprocess_image(self, im):
+        """
+        Resizes a decoded evaluation image on the shortest edge and center crops it to imgsz.
+
+        Uses the torchvision bilinear resize and center crop of classify_transforms(), antialiased like its PIL resize
+        at prediction, so that images are validated on the pixels that predict() sees.
+
+        Args:
+            im (np.ndarray): Decoded BGR image.
+
+        Returns:
+            (np.ndarray): Pre-processed uint8 BGR image of shape (imgsz, imgsz, 3).
+        """
+        s = math.floor(self.imgsz / self.crop_fraction)  # shortest edge
+        im = torch.from_numpy(im).permute(2, 0, 1)  # HWC to CHW, channels are resized independently
+        im = T.functional.resize(im, s, interpolation=T.InterpolationMode.BILINEAR, antialias=True)
+        return np.ascontiguousarray(T.functional.center_crop(im, self.imgsz).permute(1, 2, 0).numpy())
 
     def __len__(self) -> int:
         """Return the total number of samples in the dataset."""
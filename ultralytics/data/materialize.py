@@ -0,0 +1,138 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Materialize a pre-resized copy of a detection dataset for fixed-imgsz training.
+
+Usage:
+    $ yolo data materialize data=coco128.yaml imgsz=640 workers=8
+"""
+
+import math
+import os
+import shutil
+from multiprocessing import Pool
+from pathlib import Path
+
+import cv2
+
+from ultralytics.utils import LOGGER, NUM_THREADS, TQDM, colorstr, yaml_save
+from .utils import check_det_dataset, img2label_paths
+
+WRITE_FORMATS = {"bmp", "jpeg", "jpg", "png", "tif", "tiff", "webp"}  # suffixes cv2.imwrite() can encode
+
+
+def materialize_image(args):
+    """
+    Resize one image so that its long side equals `imgsz` and save it together with its label file.
+
+    The resize replicates `BaseDataset.load_image()` in rect mode exactly, so loading a materialized image returns the
+    same array the loader would otherwise compute on-the-fly from the full resolution original.
+
+    Args:
+        args (tuple): (im_file, new_im_file, imgsz, quality) for the source image, its destination, the target long
+            side in pixels and the JPEG quality used when re-encoding.
+
+    Returns:
+        (tuple): Destination image path and the number of bytes written.
+    """
+    im_file, new_file, imgsz, quality = args
+    new_file = Path(new_file)
+    new_file.parent.mkdir(parents=True, exist_ok=True)
+    im = cv2.imread(im_file)  # BGR
+    if im is None:
+        raise FileNotFoundError(f"Image Not Found {im_file}")
+    h0, w0 = im.shape[:2]  # orig hw
+    r = imgsz / max(h0, w0)  # ratio
+    if r == 1 and new_file.suffix == Path(im_file).suffix:
+        shutil.copyfile(im_file, new_file)  # already at target size, no re-encode needed
+    else:
+        if r != 1:
+            w, h = (min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz))
+            im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+        cv2.imwrite(str(new_file), im, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+
+    # Labels are normalized xywh/xy so they are copied unchanged
+    lb_file, new_lb_file = img2label_paths([im_file, str(new_file)])
+    if os.path.isfile(lb_file):
+        Path(new_lb_file).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(lb_file, new_lb_file)
+    return str(new_file), new_file.stat().st_size
+
+
+def materialize_dataset(data="coco8.yaml", imgsz=640, save_dir=None, workers=NUM_THREADS, quality=95, task="detect"):
+    """
+    Write a copy of a dataset with every image pre-resized to a fixed long side, plus label caches and a dataset YAML.
+
+    Training on the materialized copy at the same `imgsz` skips the per-sample full resolution decode and resize in
+    `BaseDataset.load_image()`. Images are resized across `workers` processes. The derived YAML carries a
+    `materialized: imgsz` key that `YOLODataset` uses to recognize the copy.
+
+    Args:
+        data (str | Path): Path to the source dataset YAML.
+        imgsz (int): Target long side in pixels, must match the training/validation `imgsz`. Default is 640.
+        save_dir (str | Path, optional): Output dataset root. Defaults to '<dataset root>-<imgsz>'.
+        workers (int): Number of processes used to resize images. Default is NUM_THREADS.
+        quality (int): JPEG quality for re-encoded images. Default is 95.
+        task (str): Dataset task used to build the label caches, i.e. 'detect', 'segment', 'pose' or 'obb'.
+
+    Returns:
+        (Path): Path to the derived dataset YAML.
+
+    Example:
+        ```python
+        from ultralytics.data.materialize import materialize_dataset
+
+        yaml_file = materialize_dataset('coco8.yaml', imgsz=640)
+        ```
+    """
+    from ultralytics.data import YOLODataset
+
+    data = check_det_dataset(data)
+    imgsz = int(imgsz)
+    root = Path(data["path"])
+    save_dir = Path(save_dir or f"{root}-{imgsz}").resolve()
+    prefix = colorstr("materialize: ")
+    LOGGER.info(f"{prefix}Writing {root} resized to imgsz={imgsz} to {save_dir}...")
+
+    new_data = {k: v for k, v in data.items() if k not in {"path", "yaml_file", "download", "train", "val", "test"}}
+    new_data["path"] = str(save_dir)
+    new_data["materialized"] = imgsz
+    splits = {}
+    for split in "train", "val", "test":
+        if not data.get(split):
+            continue
+        dataset = YOLODataset(img_path=data[split], imgsz=imgsz, augment=False, data=data, task=task, prefix=prefix)
+        new_files = []
+        for f in dataset.im_files:
+            p = Path(f)
+            try:
+                new = save_dir / p.relative_to(root)
+            except ValueError:  # image outside of dataset root
+                new = save_dir / "images" / split / p.name
+            new_files.append(new if p.suffix[1:].lower() in WRITE_FORMATS else new.with_suffix(".png"))
+
+        b, mb = 0, 1 << 20  # bytes written, bytes per megabyte
+        with Pool(max(workers, 1)) as pool:
+            args = ((f, str(n), imgsz, quality) for f, n in zip(dataset.im_files, new_files))
+            pbar = TQDM(pool.imap_unordered(materialize_image, args, chunksize=16), total=len(new_files))
+            for _, nb in pbar:
+                b += nb
+                pbar.desc = f"{prefix}{split} images ({b / mb:.1f}MB)"
+            pbar.close()
+
+        # Keep directory splits as directories, rewrite *.txt and list splits as *.txt files of relative paths
+        src = data[split]
+        if isinstance(src, str) and Path(src).is_dir() and str(Path(src).resolve()).startswith(str(root.resolve())):
+            splits[split] = Path(src).resolve().relative_to(root.resolve()).as_posix()
+        else:
+            splits[split] = f"{split}.txt"
+            with open(save_dir / splits[split], "w") as t:
+                t.writelines(f"./{n.relative_to(save_dir).as_posix()}\n" for n in sorted(new_files))
+
+    # Write YAML, then build the *.cache label files for the resized copy
+    yaml_file = save_dir / f"{Path(data.get('yaml_file', 'data.yaml')).stem}-{imgsz}.yaml"
+    yaml_save(yaml_file, {"path": str(save_dir), **splits, **new_data})
+    new_data = check_det_dataset(yaml_file, autodownload=False)
+    for split in splits:
+        YOLODataset(img_path=new_data[split], imgsz=imgsz, augment=False, data=new_data, task=task, prefix=prefix)
+    LOGGER.info(f"{prefix}Done ✅ Train with 'data={yaml_file} imgsz={imgsz}'")
+    return yaml_file
@@ -0,0 +1,237 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Pack a detection dataset into tar shards and stream them during training.
+
+Usage:
+    $ yolo data pack data=coco128.yaml shard_size=1000
+    $ yolo train data=<dataset root>-shards/coco128-shards.yaml
+"""
+
+import contextlib
+import math
+import random
+import tarfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+from torch.utils.data import IterableDataset, get_worker_info
+
+from ultralytics.utils import LOGGER, TQDM, colorstr, yaml_save
+from .dataset import DATASET_CACHE_VERSION, YOLODataset, load_dataset_cache_file, save_dataset_cache_file
+from .utils import HELP_URL, check_det_dataset, img2label_paths
+
+SHARD_INDEX_SUFFIX = ".shards.cache"  # dataset YAML splits ending in this suffix are streamed from tar shards
+
+
+def pack_dataset(data="coco8.yaml", save_dir=None, shard_size=1000, task="detect"):
+    """
+    Pack the images of every split of a dataset into tar shards with a label index for streaming.
+
+    Each split is written as '{split}-00000.tar', '{split}-00001.tar', ... holding the original encoded image bytes
+    and label files, plus a '{split}.shards.cache' index with the verified labels and the byte offset of every image
+    in its shard. Val and test splits are stored sorted by aspect ratio so rectangular validation reads sequentially.
+
+    Args:
+        data (str | Path): Path to the source dataset YAML.
+        save_dir (str | Path, optional): Output directory. Defaults to '<dataset root>-shards'.
+        shard_size (int): Maximum number of images per shard. Default is 1000.
+        task (str): Dataset task used to verify the labels, i.e. 'detect', 'segment', 'pose' or 'obb'.
+
+    Returns:
+        (Path): Path to the derived dataset YAML.
+
+    Example:
+        ```python
+        from ultralytics.data.shards import pack_dataset
+
+        yaml_file = pack_dataset('coco8.yaml', shard_size=1000)
+        ```
+    """
+    data = check_det_dataset(data)
+    shard_size = max(int(shard_size), 1)
+    root = Path(data["path"])
+    save_dir = Path(save_dir or f"{root}-shards").resolve()
+    save_dir.mkdir(parents=True, exist_ok=True)
+    prefix = colorstr("pack: ")
+    LOGGER.info(f"{prefix}Packing {root} into shards of {shard_size} images in {save_dir}...")
+
+    splits = {}
+    for split in "train", "val", "test":
+        if not data.get(split):
+            continue
+        labels = YOLODataset(img_path=data[split], augment=False, data=data, task=task, prefix=prefix).labels
+        if split != "train":
+            ar = np.array([lb["shape"][0] / lb["shape"][1] for lb in labels])  # aspect ratio
+            labels = [labels[i] for i in ar.argsort(kind="stable")]
+
+        shards, samples = [], []
+        for s in TQDM(range(0, len(labels), shard_size), desc=f"{prefix}{split} shards"):
+            name = f"{split}-{s // shard_size:05d}.tar"
+            with tarfile.open(save_dir / name, "w") as tar:
+                for k, lb in enumerate(labels[s : s + shard_size], start=s):
+                    tar.add(lb["im_file"], arcname=f"{k:08d}{Path(lb['im_file']).suffix.lower()}")
+                    lb_file = Path(img2label_paths([lb["im_file"]])[0])
+                    if lb_file.is_file():
+                        tar.add(lb_file, arcname=f"{k:08d}.txt")
+            with tarfile.open(save_dir / name) as tar:  # read back image offsets for random access
+                samples += [(len(shards), m.offset_data, m.size) for m in tar.getmembers() if m.name[-4:] != ".txt"]
+            shards.append(name)
+
+        splits[split] = f"{split}{SHARD_INDEX_SUFFIX}"
+        x = {"shards": shards, "samples": samples, "labels": labels}
+        save_dataset_cache_file(prefix, save_dir / splits[split], x)
+
+    new_data = {k: v for k, v in data.items() if k not in {"path", "yaml_file", "download", "train", "val", "test"}}
+    yaml_file = save_dir / f"{Path(data.get('yaml_file', 'data.yaml')).stem}-shards.yaml"
+    yaml_save(yaml_file, {"path": str(save_dir), **splits, **new_data})
+    LOGGER.info(f"{prefix}Done ✅ Train with 'data={yaml_file}'")
+    return yaml_file
+
+
+class ShardedYOLODataset(YOLODataset, IterableDataset):
+    """
+    Streaming YOLODataset that reads images sequentially from the tar shards written by `pack_dataset()`.
+
+    Shards are shuffled every epoch and split across DDP ranks, and each rank's samples are split across dataloader
+    workers in contiguous, batch-aligned chunks. Training samples pass through a shuffle buffer of decoded images,
+    which also serves as the image pool for mosaic, so `Mosaic` and `MixUp` work unchanged.
+
+    Attributes:
+        shards (list): Paths to the tar shards.
+        samples (list): (shard index, byte offset, byte size) of every image, aligned with `labels`.
+        shuffle (bool): Whether to shuffle shards and samples, set by `build_dataloader()`.
+        rank (int): DDP rank of this process, set by `build_dataloader()`.
+        world_size (int): Number of DDP processes, set by `build_dataloader()`.
+        epoch (int): Current epoch, seeds the shard order.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initializes the streaming dataset, disabling image caching which does not apply to shards."""
+        if kwargs.get("cache"):
+            LOGGER.warning(f"{kwargs.get('prefix', '')}WARNING ⚠️ cache={kwargs['cache']} is ignored for shards.")
+        kwargs["cache"] = False
+        self.shuffle, self.rank, self.world_size, self.epoch = False, 0, 1, 0
+        super().__init__(*args, **kwargs)
+
+    def get_img_files(self, img_path):
+        """Reads the shard index and returns the original image paths it was packed from."""
+        try:
+            self.index = load_dataset_cache_file(img_path)
+            assert self.index["version"] == DATASET_CACHE_VERSION  # matches current version
+        except (FileNotFoundError, AssertionError, AttributeError) as e:
+            msg = f"{self.prefix}Error loading shard index {img_path}, re-run 'yolo data pack'"
+            raise FileNotFoundError(msg) from e
+        n = round(len(self.index["labels"]) * self.fraction)  # contiguous subset keeps reads sequential
+        self.index["labels"], self.index["samples"] = self.index["labels"][:n], self.index["samples"][:n]
+        self.shards = [Path(img_path).parent / s for s in self.index["shards"]]
+        return [lb["im_file"] for lb in self.index["labels"]]
+
+    def get_labels(self):
+        """Returns the labels stored in the shard index."""
+        labels, self.samples = self.index.pop("labels"), self.index.pop("samples")
+        self.label_files = img2label_paths(self.im_files)
+        if not labels:
+            LOGGER.warning(
+                f"WARNING ⚠️ No images found in {self.img_path}, training may not work correctly. {HELP_URL}"
+            )
+        return labels
+
+    def subset(self, indices):
+        """Returns a copy of the dataset restricted to the images at `indices`, with their shard locations."""
+        samples, self.samples = self.samples, [self.samples[i] for i in indices]
+        try:
+            return super().subset(indices)  # copies the restricted samples
+        finally:
+            self.samples = samples
+
+    def set_rectangle(self):
+        """Sets rectangular batch shapes, keeping the shard locations aligned with the sorted labels."""
+        loc = dict(zip(self.im_files, self.samples))
+        super().set_rectangle()
+        self.samples = [loc[f] for f in self.im_files]
+
+    def set_epoch(self, epoch):
+        """Sets the epoch used to seed the shard order, call before iterating each epoch."""
+        self.epoch = epoch
+
+    def __len__(self):
+        """Returns the number of samples streamed by this DDP rank."""
+        return math.ceil(self.ni / self.world_size)
+
+    def __iter__(self):
+        """Streams transformed samples of this rank and dataloader worker."""
+        worker = get_worker_info()
+        wid, nw = (worker.id, worker.num_workers) if worker else (0, 1)
+        seq = self.rank_samples()
+        bs = self.batch_size or 1
+        nb = math.ceil(len(seq) / bs)  # split whole batches between workers for rect batch shapes
+        seq = seq[wid * nb // nw * bs : (wid + 1) * nb // nw * bs]
+
+        with contextlib.ExitStack() as stack:
+            files = {}  # open shard file handles, closed by the stack
+            for i in seq:
+                s = self.samples[i][0]
+                if s not in files:
+                    files[s] = stack.enter_context(open(self.shards[s], "rb"))
+                self.read_image(i, files[s])
+                if not self.shuffle:
+                    yield self.emit(i)
+                elif len(self.buffer) >= max(self.max_buffer_length, 1):
+                    yield self.emit(random.choice(self.buffer))
+            while self.buffer:  # drain shuffle buffer
+                yield self.emit(random.choice(self.buffer))
+
+    def rank_samples(self):
+        """Returns the sample indices streamed by this rank, padded or truncated to equal length across ranks."""
+        if self.shuffle:
+            by_shard = {}
+            for i, (s, _, _) in enumerate(self.samples):
+                by_shard.setdefault(s, []).append(i)
+            shards = sorted(by_shard)
+            random.Random(self.epoch).shuffle(shards)  # same order on every rank and worker
+            if len(shards) < self.world_size:  # fewer shards than ranks, split samples instead
+                seq = [i for s in shards for i in by_shard[s]][self.rank :: self.world_size]
+            else:
+                seq = [i for s in shards[self.rank :: self.world_size] for i in by_shard[s]]
+        else:
+            seq = list(range(self.ni))[self.rank :: self.world_size]
+        n = len(self)
+        return (seq * math.ceil(n / len(seq)))[:n] if seq else seq  # repeat samples like DistributedSampler
+
+    def read_image(self, i, file):
+        """Reads and decodes image 'i' from its open shard `file` into the buffer, resized like `load_image()`."""
+        s, offset, size = self.samples[i]
+        file.seek(offset)
+        im = cv2.imdecode(np.frombuffer(file.read(size), np.uint8), cv2.IMREAD_COLOR)  # BGR
+        if im is None:
+            raise FileNotFoundError(f"Image Not Found {self.im_files[i]} in {self.shards[s]}")
+        h0, w0 = im.shape[:2]  # orig hw
+        r = self.imgsz / max(h0, w0)  # ratio
+        if r != 1 and self.materialized != self.imgsz:  # if sizes are not equal and not pre-resized
+            w, h = (min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz))
+            im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+        self.ims[i], self.im_hw0[i], self.im_hw[i] = im, (h0, w0), im.shape[:2]  # im, hw_original, hw_resized
+        self.buffer.append(i)
+
+    def emit(self, i):
+        """Returns transformed sample 'i' and releases its image from the buffer."""
+        x = self.transforms(self.get_image_and_label(i))
+        self.buffer.remove(i)
+        if i not in self.buffer:  # padded ranks may hold the same image twice
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = None, None, None
+        return x
+
+    def load_image(self, i, rect_mode=True):
+        """Returns image 'i' from the buffer, (im, original hw, resized hw)."""
+        return self.ims[i], self.im_hw0[i], self.im_hw[i]
+
+    def get_image_and_label(self, index):
+        """Returns image and label of 'index', remapping indices outside the buffer (i.e. MixUp) to buffered images."""
+        if self.ims[index] is None and self.buffer:
+            index = random.choice(self.buffer)
+        return super().get_image_and_label(index)
+
+    def __getitem__(self, index):
+        """Random access is not supported, shards are streamed by iterating the dataset."""
+        raise TypeError(f"{self.__class__.__name__} is iterable-style, use it with build_dataloader()")
@@ -3,6 +3,7 @@
 import contextlib
 import hashlib
 import json
+import math
 import os
 import random
 import subprocess
@@ -27,6 +28,7 @@ from ultralytics.utils import (
     clean_url,
     colorstr,
     emojis,
+    is_dir_writeable,
     yaml_load,
     yaml_save,
 )
@@ -46,9 +48,84 @@ def img2label_paths(img_paths):
     return [sb.join(x.rsplit(sa, 1)).rsplit(".", 1)[0] + ".txt" for x in img_paths]
 
 
-def get_hash(paths):
-    """Returns a single hash value of a list of paths (files or dirs)."""
-    size = sum(os.path.getsize(p) for p in paths if os.path.exists(p))  # sizes
+FILE_INDEX_SUFFIX = ".files.cache"  # directory file index saved next to the directory, i.e. images/train.files.cache
+FILE_INDEX_VERSION = "1.0.0"
+_FILE_INDEXES = {}  # in-memory file indexes of this process, {dir: (dir mtimes, file sizes)}
+
+
+def _scan_dir(d):
+    """List one directory with os.scandir, returning its mtime, subdirectories and {file: size} of its files."""
+    dirs, files = [], {}
+    with os.scandir(d) as it:
+        for e in it:
+            if e.name.startswith("."):  # skip hidden entries like glob
+                continue
+            if e.is_dir():
+                dirs.append(e.path)
+            elif e.is_file():
+                files[e.path] = e.stat().st_size
+    return os.stat(d).st_mtime_ns, dirs, files
+
+
+def get_file_index(path):
+    """
+    Returns {file: size} of all files under a directory, walked in parallel and cached on disk.
+
+    The index is keyed by the mtimes of the directory and all its subdirectories, which change whenever files are
+    added, removed or renamed, so repeat calls skip the filesystem walk. Files edited in place keep their cached size,
+    so only index directories of files that are replaced rather than edited, i.e. images but not labels. It is kept in
+    memory for the process and saved as '<dir>.files.cache' next to the directory when writeable.
+
+    Args:
+        path (str | Path): Directory to index.
+
+    Returns:
+        (dict): File sizes in bytes keyed by file path, paths are joined onto `path` as given like `glob.glob()`.
+    """
+    path = str(path).rstrip("/" + os.sep) or os.sep
+    cache_path = Path(path + FILE_INDEX_SUFFIX)
+
+    def valid(index):
+        """Checks that no directory of a cached index has been modified."""
+        with contextlib.suppress(OSError):
+            return all(os.stat(d).st_mtime_ns == t for d, t in index[0].items())
+        return False
+
+    if path in _FILE_INDEXES and valid(_FILE_INDEXES[path]):
+        return _FILE_INDEXES[path][1]
+    with contextlib.suppress(Exception):
+        x = np.load(str(cache_path), allow_pickle=True).item()
+        if x["version"] == FILE_INDEX_VERSION and valid((x["dirs"], x["files"])):
+            _FILE_INDEXES[path] = x["dirs"], x["files"]
+            return x["files"]
+
+    mtimes, files, level = {}, {}, [path]
+    with ThreadPool(NUM_THREADS) as pool:
+        while level:  # walk breadth-first, listing each level of directories in parallel
+            next_level = []
+            for d, (t, dirs, f) in zip(level, pool.map(_scan_dir, level)):
+                mtimes[d] = t
+                next_level += dirs
+                files.update(f)
+            level = next_level
+    _FILE_INDEXES[path] = mtimes, files
+    if is_dir_writeable(cache_path.parent):
+        with contextlib.suppress(OSError):
+            np.save(str(cache_path), {"dirs": mtimes, "files": files, "version": FILE_INDEX_VERSION})
+            Path(f"{cache_path}.npy").replace(cache_path)  # remove .npy suffix
+    return files
+
+
+def get_hash(paths, sizes=None):
+    """
+    Returns a single hash value of a list of paths (files or dirs).
+
+    Args:
+        paths (list): File or directory paths.
+        sizes (dict, optional): File sizes keyed by path, i.e. from get_file_index(), used before os.path.getsize().
+    """
+    sizes = sizes or {}
+    size = sum(sizes[p] if p in sizes else os.path.getsize(p) for p in paths if p in sizes or os.path.exists(p))
     h = hashlib.sha256(str(size).encode())  # hash sizes
     h.update("".join(paths).encode())  # hash paths
     return h.hexdigest()  # return hash
@@ -649,3 +726,44 @@ def autosplit(path=DATASETS_DIR / "coco8/images", weights=(0.9, 0.1, 0.0), annot
         if not annotated_only or Path(img2label_paths([str(img)])[0]).exists():  # check label
             with open(path.parent / txt[i], "a") as f:
                 f.write(f"./{img.relative_to(path.parent).as_posix()}" + "\n")  # add image to txt file
+
+
+def stratified_subset(labels, fraction, seed=0):
+    """
+    Selects about `fraction` of the images of a dataset, stratified so that every class keeps its share of images.
+
+    Classes are filled from the rarest, each up to ceil(fraction * images containing the class) images, counting images
+    already selected for rarer classes, and background images are sampled in proportion. The selection is fixed for a
+    given seed.
+
+    Args:
+        labels (list): Dataset labels, dicts with a 'cls' array of the image's instance classes.
+        fraction (float): Fraction of images to select.
+        seed (int): Random seed of the selection.
+
+    Returns:
+        (list): Sorted indices of the selected images.
+
+    Example:
+        ```python
+        from ultralytics.data.utils import stratified_subset
+
+        dataset = dataset.subset(stratified_subset(dataset.labels, 0.1))  # 10% of the images, all classes
+        ```
+    """
+    rng = random.Random(seed)
+    classes = [set(lb["cls"].reshape(-1).astype(int).tolist()) for lb in labels]
+    images = {}  # images of each class
+    for i, c in enumerate(classes):
+        for k in c:
+            images.setdefault(k, []).append(i)
+    selected = set()
+    for k, ik in sorted(images.items(), key=lambda x: len(x[1])):  # rarest class first
+        candidates = [i for i in ik if i not in selected]
+        rng.shuffle(candidates)
+        n = math.ceil(fraction * len(ik)) - (len(ik) - len(candidates))  # remaining images of this class
+        selected.update(candidates[: max(n, 0)])
+    background = [i for i, c in enumerate(classes) if not c]
+    selected.update(rng.sample(background, round(fraction * len(background))))
+    return sorted(selected)
+
@@ -191,6 +191,9 @@ class Exporter:
         if not hasattr(model, "names"):
             model.names = default_class_names()
         model.names = check_class_names(model.names)
+        if self.args.half == "bf16":
+            LOGGER.warning("WARNING ⚠️ half=bf16 is only supported for PyTorch inference, exporting in FP32")
+            self.args.half = False
         if self.args.half and onnx and self.device.type == "cpu":
             LOGGER.warning("WARNING ⚠️ half=True only compatible with GPU export, i.e. use device=0")
             self.args.half = False
@@ -10,7 +10,7 @@ import torch
 
 from ultralytics.cfg import TASK2DATA, get_cfg, get_save_dir
 from ultralytics.hub.utils import HUB_WEB_ROOT
-from ultralytics.nn.tasks import attempt_load_one_weight, guess_model_task, nn, yaml_model_load
+from ultralytics.nn.tasks import attempt_load_one_weight, guess_model_task, load_weights_sidecar, nn, yaml_model_load
 from ultralytics.utils import ASSETS, DEFAULT_CFG_DICT, LOGGER, RANK, SETTINGS, callbacks, checks, emojis, yaml_load
 
 
@@ -231,6 +231,11 @@ class Model(nn.Module):
             self.task = self.model.args["task"]
             self.overrides = self.model.args = self._reset_ckpt_args(self.model.args)
             self.ckpt_path = self.model.pt_path
+        elif Path(weights).suffix == ".safetensors":  # memory-mapped weights-only sidecar, see save_weights_sidecar()
+            self.model, self.ckpt = load_weights_sidecar(weights), None
+            self.task = self.model.task
+            self.overrides = self.model.args = self._reset_ckpt_args(self.model.args or {})
+            self.ckpt_path = self.model.pt_path = weights
         else:
             weights = checks.check_file(weights)  # runs in all cases, not redundant with above call
             self.model, self.ckpt = weights, None
@@ -558,6 +563,43 @@ class Model(nn.Module):
             verbose=kwargs.get("verbose"),
         )
 
+    def prune(
+        self,
+        **kwargs,
+    ):
+        """
+        Prunes channels from the model at one or more sparsity levels, reporting the accuracy, FLOPs and CPU latency.
+
+        This method uses the 'prune' function from the ultralytics.utils.prune module. Each pruned model is saved as a
+        *.pt checkpoint with its *.yaml model to the run directory, and fine-tuned for 'epochs' epochs if passed.
+
+        Args:
+            **kwargs (any): Arbitrary keyword arguments to customize pruning, i.e. 'sparsity', 'importance', 'data',
+                'epochs', 'imgsz', 'batch' and 'device'.
+
+        Returns:
+            (pandas.DataFrame): One row per sparsity level, the first being the unpruned model.
+
+        Raises:
+            AssertionError: If the model is not a PyTorch model.
+        """
+        self._check_is_pytorch_model()
+        from ultralytics.utils.prune import prune
+
+        custom = {"epochs": 0}  # method defaults
+        args = get_cfg(overrides={**self.overrides, **custom, **kwargs, "mode": "prune"})
+        return prune(
+            model=self,
+            data=kwargs.get("data"),  # if no 'data' argument passed set data=None for default datasets
+            sparsity=args.sparsity,
+            importance=args.importance,
+            imgsz=args.imgsz,
+            batch=args.batch,
+            epochs=args.epochs,
+            device=args.device,
+            save_dir=get_save_dir(args),
+        )
+
     def export(
         self,
         **kwargs,
@@ -249,6 +249,8 @@ class BasePredictor:
                     if self.args.embed:
                         yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
                         continue
+                if self.model.compile:
+                    profilers[1].exclude(self.model.compile_dt)  # report compilation separately from inference speed
 
                 # Postprocess
                 with profilers[2]:
@@ -303,7 +305,11 @@ class BasePredictor:
             batch=self.args.batch,
             fuse=True,
             verbose=verbose,
+            mmap=self.args.mmap,
+            compile=self.args.compile,
         )
+        if self.args.quantize:
+            self.model.quantize(self.args)
 
         self.device = self.model.device  # update device
         self.args.half = self.model.fp16  # update half
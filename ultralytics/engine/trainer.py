@@ -9,9 +9,11 @@ Usage:
 import math
 import os
 import subprocess
+import threading
 import time
 import warnings
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -36,16 +38,27 @@ from ultralytics.utils import (
     yaml_save,
 )
 from ultralytics.utils.autobatch import check_train_batch_size
-from ultralytics.utils.checks import check_amp, check_file, check_imgsz, check_model_file_from_stem, print_args
+from ultralytics.utils.checks import (
+    check_amp,
+    check_bf16,
+    check_file,
+    check_imgsz,
+    check_model_file_from_stem,
+    print_args,
+)
 from ultralytics.utils.dist import ddp_cleanup, generate_ddp_command
 from ultralytics.utils.files import get_latest_run
 from ultralytics.utils.torch_utils import (
+    CheckpointWriter,
     EarlyStopping,
     ModelEMA,
     de_parallel,
     init_seeds,
     one_cycle,
     select_device,
+    smart_autocast,
+    snapshot_module,
+    snapshot_optimizer,
     strip_optimizer,
 )
 
@@ -66,6 +79,7 @@ class BaseTrainer:
         last (Path): Path to the last checkpoint.
         best (Path): Path to the best checkpoint.
         save_period (int): Save checkpoint every x epochs (disabled if < 1).
+        ckpt_writer (CheckpointWriter): Background writer of the last, best and periodic checkpoints.
         batch_size (int): Batch size for training.
         epochs (int): Number of epochs to train for.
         start_epoch (int): Starting epoch for training.
@@ -87,6 +101,8 @@ class BaseTrainer:
         csv (Path): Path to results CSV file.
     """
 
+    distillation = False  # whether 'teacher' weights are used, see YOLOv10DistillationTrainer
+
     def __init__(self, cfg=DEFAULT_CFG, overrides=None, _callbacks=None):
         """
         Initializes the BaseTrainer class.
@@ -97,6 +113,11 @@ class BaseTrainer:
         """
         self.args = get_cfg(cfg, overrides)
         self.check_resume(overrides)
+        if self.args.teacher and not self.distillation:
+            raise ValueError(
+                f"'teacher={self.args.teacher}' is not supported by {self.__class__.__name__}, distillation requires a "
+                f"YOLOv10 model, i.e. 'yolo train model=yolov10n.pt teacher=yolov10x.pt'"
+            )
         self.device = select_device(self.args.device, self.args.batch)
         self.validator = None
         self.metrics = None
@@ -113,6 +134,11 @@ class BaseTrainer:
             yaml_save(self.save_dir / "args.yaml", vars(self.args))  # save run args
         self.last, self.best = self.wdir / "last.pt", self.wdir / "best.pt"  # checkpoint paths
         self.save_period = self.args.save_period
+        self.ckpt_writer = CheckpointWriter()  # saves checkpoints in the background
+        self.val_executor, self.val_job = None, None  # background validation with val_async=True
+        self.subset_validator, self.best_subset_fitness = None, None  # val subset with val_fraction < 1
+        self.subset_skipped = False  # whether the last validation skipped the full split, see _validate()
+        self.shared_loader, self.variants = None, []  # lockstep training of 'variants' on shared batches
 
         self.batch_size = self.args.batch
         self.epochs = self.args.epochs
@@ -210,7 +236,14 @@ class BaseTrainer:
                 ddp_cleanup(self, str(file))
 
         else:
-            self._do_train(world_size)
+            try:
+                self._do_train(world_size)
+            except BaseException:
+                for trainer in self.variants:
+                    trainer.stop = True  # stop the variants at the end of the epoch
+                raise
+            finally:
+                self._join_variants()
 
     def _setup_scheduler(self):
         """Initialize training learning rate scheduler."""
@@ -239,8 +272,13 @@ class BaseTrainer:
         # Model
         self.run_callbacks("on_pretrain_routine_start")
         ckpt = self.setup_model()
+        if self.args.qat:
+            self.setup_qat(ckpt)
         self.model = self.model.to(self.device)
         self.set_model_attributes()
+        if self.args.checkpoint:
+            n = self.model.set_checkpoint(self.args.checkpoint)
+            LOGGER.info(f"{colorstr('checkpoint:')} recomputing activations of {n} blocks in backward to save memory")
 
         # Freeze layers
         freeze_list = (
@@ -265,7 +303,10 @@ class BaseTrainer:
                 v.requires_grad = True
 
         # Check AMP
-        self.amp = torch.tensor(self.args.amp).to(self.device)  # True or False
+        self.bf16 = self.args.amp == "bf16"  # bfloat16 autocast, on CPU or CUDA, needs no loss scaling
+        if self.bf16:
+            check_bf16(self.device)
+        self.amp = torch.tensor(bool(self.args.amp) and not self.bf16).to(self.device)  # FP16 CUDA AMP
         if self.amp and RANK in (-1, 0):  # Single-GPU and DDP
             callbacks_backup = callbacks.default_callbacks.copy()  # backup callbacks as check_amp() resets them
             self.amp = torch.tensor(check_amp(self.model), device=self.device)
@@ -284,17 +325,22 @@ class BaseTrainer:
 
         # Batch size
         if self.batch_size == -1 and RANK == -1:  # single-GPU only, estimate best batch size
-            self.args.batch = self.batch_size = check_train_batch_size(self.model, self.args.imgsz, self.amp)
+            self.args.batch = self.batch_size = check_train_batch_size(
+                self.model, self.args.imgsz, self.amp, self.bf16
+            )
 
         # Dataloaders
         batch_size = self.batch_size // max(world_size, 1)
-        self.train_loader = self.get_dataloader(self.trainset, batch_size=batch_size, rank=RANK, mode="train")
+        self.train_loader = self.shared_loader or self.get_dataloader(
+            self.trainset, batch_size=batch_size, rank=RANK, mode="train"
+        )
         if RANK in (-1, 0):
             # Note: When training DOTA dataset, double batch size could get OOM on images with >2000 objects.
             self.test_loader = self.get_dataloader(
                 self.testset, batch_size=batch_size if self.args.task == "obb" else batch_size * 2, rank=-1, mode="val"
             )
             self.validator = self.get_validator()
+            self.subset_validator = self.get_subset_validator()
             metric_keys = self.validator.metrics.keys + self.label_loss_items(prefix="val")
             self.metrics = dict(zip(metric_keys, [0] * len(metric_keys)))
             self.ema = ModelEMA(self.model)
@@ -325,6 +371,8 @@ class BaseTrainer:
         if world_size > 1:
             self._setup_ddp(world_size)
         self._setup_train(world_size)
+        if self.args.variants:
+            self._setup_variants()
 
         nb = len(self.train_loader)  # number of batches
         nw = max(round(self.args.warmup_epochs * nb), 100) if self.args.warmup_epochs > 0 else -1  # warmup iterations
@@ -347,7 +395,9 @@ class BaseTrainer:
             self.epoch = epoch
             self.run_callbacks("on_train_epoch_start")
             self.model.train()
-            if RANK != -1:
+            if hasattr(self.train_loader.dataset, "set_epoch"):  # streaming datasets shuffle shards per epoch
+                self.train_loader.dataset.set_epoch(epoch)
+            elif RANK != -1:
                 self.train_loader.sampler.set_epoch(epoch)
             pbar = enumerate(self.train_loader)
             # Update dataloader attributes (optional)
@@ -376,7 +426,7 @@ class BaseTrainer:
                             x["momentum"] = np.interp(ni, xi, [self.args.warmup_momentum, self.args.momentum])
 
                 # Forward
-                with torch.cuda.amp.autocast(self.amp):
+                with smart_autocast(self.device, self.amp, self.bf16):
                     batch = self.preprocess_batch(batch)
                     self.loss, self.loss_items = self.model(batch)
                     if RANK != -1:
@@ -422,19 +472,27 @@ class BaseTrainer:
             self.run_callbacks("on_train_epoch_end")
             if RANK in (-1, 0):
                 final_epoch = epoch + 1 == self.epochs
+                paused = epoch + 1 == self.args.stop_epoch < self.epochs  # resumable stop, i.e. a Tuner rung
                 self.ema.update_attr(self.model, include=["yaml", "nc", "args", "names", "stride", "class_weights"])
 
                 # Validation
-                if (self.args.val and (((epoch+1) % self.args.val_period == 0) or (self.epochs - epoch) <= 10)) \
-                    or final_epoch or self.stopper.possible_stop or self.stop:
-                    self.metrics, self.fitness = self.validate()
-                self.save_metrics(metrics={**self.label_loss_items(self.tloss), **self.metrics, **self.lr})
-                self.stop |= self.stopper(epoch + 1, self.fitness) or final_epoch
+                self.collect_validation()  # of the previous epoch, with val_async=True
+                dense = (self.epochs - epoch) <= self.args.val_dense  # validate every epoch at the end of training
+                full = dense or final_epoch or paused or self.stopper.possible_stop or self.stop  # not the subset
+                if (self.args.val and (((epoch+1) % self.args.val_period == 0) or dense)) or full:
+                    if self.args.val_async and not (final_epoch or paused):
+                        self.validate_async(subset=not full)
+                    else:
+                        self.metrics, self.fitness = self.validate(subset=not full)
+                if not self.val_job:  # otherwise saved once validated
+                    self.save_metrics(metrics={**self.label_loss_items(self.tloss), **self.metrics, **self.lr})
+                    self.stop |= self.stopper(epoch + 1, self.stopper_fitness())
+                self.stop |= final_epoch or paused
                 if self.args.time:
                     self.stop |= (time.time() - self.train_time_start) > (self.args.time * 3600)
 
                 # Save model
-                if self.args.save or final_epoch:
+                if self.args.save or final_epoch or paused:
                     self.save_model()
                     self.run_callbacks("on_model_save")
 
@@ -464,32 +522,86 @@ class BaseTrainer:
             epoch += 1
 
         if RANK in (-1, 0):
+            self.collect_validation()  # of the last epoch if stopped early
+
             # Do final val with best.pt
             LOGGER.info(
                 f"\n{epoch - self.start_epoch + 1} epochs completed in "
                 f"{(time.time() - self.train_time_start) / 3600:.3f} hours."
             )
-            self.final_eval()
+            if self.epoch + 1 == self.args.stop_epoch < self.epochs:  # paused, keep the optimizer for resuming
+                self.ckpt_writer.wait()
+            else:
+                self.final_eval()
             if self.args.plots:
                 self.plot_metrics()
             self.run_callbacks("on_train_end")
         torch.cuda.empty_cache()
         self.run_callbacks("teardown")
 
+    def _setup_variants(self):
+        """
+        Starts training the 'variants' models in lockstep with this trainer, each in a thread, on the same batches.
+
+        The train_loader is shared through a LockstepLoader, so images are loaded and augmented once for all models.
+        Every variant is trained by a trainer of this class with the same arguments and batch size, and saves its own
+        checkpoints, validation metrics and results.csv to a '{name}-{variant}' directory.
+        """
+        from ultralytics.data.build import LockstepLoader  # scope for faster startup
+
+        if RANK != -1:
+            raise NotImplementedError("'variants' are not supported for Multi-GPU training")
+        models = [self.args.variants] if isinstance(self.args.variants, str) else list(self.args.variants)
+        loader = LockstepLoader(self.train_loader, 1 + len(models))
+        self.train_loader = loader.views[0]
+        args = {k: v for k, v in vars(self.args).items() if k not in {"save_dir", "resume", "variants"}}
+        trainers = []
+        for model, view in zip(models, loader.views[1:]):
+            name = f"{self.args.name}-{Path(model).stem}"
+            trainer = self.__class__(overrides={**args, "model": model, "name": name, "batch": self.batch_size})
+            trainer.shared_loader, trainer.variant_error = view, None
+            trainer.variant_thread = threading.Thread(target=trainer._train_variant, name=name)
+            trainers.append(trainer)
+        for trainer in trainers:
+            trainer.variant_thread.start()
+        self.variants = trainers
+        LOGGER.info(f"{colorstr('variants:')} training {len(models)} variants in lockstep: {', '.join(models)}")
+
+    def _train_variant(self):
+        """Trains a variant in its thread, see _setup_variants(), keeping errors for _join_variants()."""
+        try:
+            self._do_train()
+        except Exception as e:
+            self.variant_error = e
+        finally:
+            self.shared_loader.close()  # the other trainers continue without this one
+
+    def _join_variants(self):
+        """Waits for the 'variants' to finish training, re-raising their first error."""
+        if not self.variants:
+            return
+        self.train_loader.close()
+        for trainer in self.variants:
+            trainer.variant_thread.join()
+        for trainer in self.variants:
+            if trainer.variant_error is not None:
+                raise RuntimeError(f"variant '{trainer.args.model}' training failed") from trainer.variant_error
+
     def save_model(self):
         """Save model training checkpoints with additional metadata."""
         import pandas as pd  # scope for faster startup
 
         metrics = {**self.metrics, **{"fitness": self.fitness}}
-        results = {k.strip(): v for k, v in pd.read_csv(self.csv).to_dict(orient="list").items()}
+        results = pd.read_csv(self.csv).to_dict(orient="list") if self.csv.exists() else {}  # none yet with val_async
+        results = {k.strip(): v for k, v in results.items()}
         ckpt = {
             "epoch": self.epoch,
             "best_fitness": self.best_fitness,
-            "model": deepcopy(de_parallel(self.model)).half(),
-            "ema": deepcopy(self.ema.ema).half(),
+            "model": snapshot_module(de_parallel(self.model)),  # CPU FP16 snapshots, training updates tensors in place
+            "ema": snapshot_module(self.ema.ema),
             "updates": self.ema.updates,
-            "optimizer": self.optimizer.state_dict(),
-            "train_args": vars(self.args),  # save as dict
+            "optimizer": snapshot_optimizer(self.optimizer),
+            "train_args": dict(vars(self.args)),  # save as dict
             "train_metrics": metrics,
             "train_results": results,
             "date": datetime.now().isoformat(),
@@ -498,12 +610,13 @@ class BaseTrainer:
             "docs": "https://docs.ultralytics.com",
         }
 
-        # Save last and best
-        torch.save(ckpt, self.last)
-        if self.best_fitness == self.fitness:
-            torch.save(ckpt, self.best)
+        # Save last and best, in the background
+        links = []
+        if not self.val_job and self.best_fitness == self.fitness:  # else linked by collect_validation() if best
+            links.append(self.best)
         if (self.save_period > 0) and (self.epoch > 0) and (self.epoch % self.save_period == 0):
-            torch.save(ckpt, self.wdir / f"epoch{self.epoch}.pt")
+            links.append(self.wdir / f"epoch{self.epoch}.pt")
+        self.ckpt_writer.save(ckpt, self.last, *links)
 
     @staticmethod
     def get_dataset(data):
@@ -529,6 +642,18 @@ class BaseTrainer:
         self.model = self.get_model(cfg=cfg, weights=weights, verbose=RANK == -1)  # calls Model(cfg, weights)
         return ckpt
 
+    def setup_qat(self, ckpt=None):
+        """Prepares the float model for quantization-aware training, restoring fake-quantized weights if resuming."""
+        from ultralytics.utils.quantize import is_quantized, prepare_qat  # scope for faster startup
+
+        prepare_qat(self.model)
+        weights = ckpt and (ckpt.get("ema") or ckpt["model"])
+        if weights is not None and is_quantized(weights):  # resume, fake-quantized weights do not match float layers
+            self.model.load_state_dict(weights.float().state_dict())
+        if self.args.amp:
+            LOGGER.warning("WARNING ⚠️ 'qat=True' is incompatible with AMP, setting 'amp=False'")
+            self.args.amp = False
+
     def optimizer_step(self):
         """Perform a single step of the training optimizer with gradient clipping and EMA update."""
         self.scaler.unscale_(self.optimizer)  # unscale gradients
@@ -543,18 +668,73 @@ class BaseTrainer:
         """Allows custom preprocessing model inputs and ground truths depending on task type."""
         return batch
 
-    def validate(self):
+    def validate(self, subset=False):
         """
         Runs validation on test set using self.validator.
 
-        The returned dict is expected to contain "fitness" key.
+        The returned dict is expected to contain "fitness" key. With `subset`, see _validate(), fitness is None if the
+        full split was skipped.
         """
-        metrics = self.validator(self)
-        fitness = metrics.pop("fitness", -self.loss.detach().cpu().numpy())  # use loss as fitness measure if not found
-        if not self.best_fitness or self.best_fitness < fitness:
+        metrics, fitness = self._validate(subset=subset)
+        if fitness is not None and (not self.best_fitness or self.best_fitness < fitness):
             self.best_fitness = fitness
         return metrics, fitness
 
+    def _validate(self, model=None, subset=False):
+        """
+        Validates the EMA, or a snapshot of it as `model`, and returns the metrics and fitness.
+
+        With `subset` and val_fraction < 1 the stratified val subset is validated first, and the full split only if the
+        subset fitness improved, otherwise the previous metrics are returned with fitness None and `subset_skipped` is
+        set, so early stopping counts the epoch as not improving.
+        """
+        self.subset_skipped = False
+        if subset and self.subset_validator:
+            metrics = self.subset_validator(self, model)
+            fitness = metrics.pop("fitness", -self.loss.detach().cpu().numpy())
+            best = self.best_subset_fitness
+            if best is not None and fitness <= best:
+                LOGGER.info(f"Subset fitness {fitness:.5f} did not improve on {best:.5f}, skipping full validation")
+                self.subset_skipped = True
+                return self.metrics, None
+            self.best_subset_fitness = fitness
+        metrics = self.validator(self, model)
+        fitness = metrics.pop("fitness", -self.loss.detach().cpu().numpy())  # use loss as fitness measure if not found
+        return metrics, fitness
+
+    def stopper_fitness(self):
+        """Returns the fitness for EarlyStopping, -inf after a skipped full validation, which counts to patience."""
+        return -math.inf if self.subset_skipped else self.fitness
+
+    def validate_async(self, subset=False):
+        """
+        Starts validating a snapshot of the EMA in a background thread, while training continues.
+
+        The validation is merged by collect_validation() at the end of the next epoch, so metrics, best.pt selection and
+        early stopping lag one epoch behind training. Until then `fitness` is None, and the epoch's last.pt is not
+        linked to best.pt by save_model().
+        """
+        if self.val_executor is None:
+            self.val_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="val")
+        row = {**self.label_loss_items(self.tloss), **self.lr}  # train metrics of this epoch
+        future = self.val_executor.submit(self._validate, deepcopy(self.ema.ema), subset)
+        self.val_job = self.epoch, row, future
+        self.fitness = None
+
+    def collect_validation(self):
+        """Waits for the background validation started by validate_async() and merges it into the training state."""
+        if not self.val_job:
+            return
+        epoch, row, future = self.val_job
+        self.val_job = None
+        self.metrics, self.fitness = future.result()
+        if self.fitness is not None and (not self.best_fitness or self.best_fitness <= self.fitness):
+            self.best_fitness = self.fitness
+            if self.args.save:
+                self.ckpt_writer.link(self.last, self.best)  # last.pt is still the validated epoch's checkpoint
+        self.save_metrics(metrics={**row, **self.metrics}, epoch=epoch)
+        self.stop |= self.stopper(epoch + 1, self.stopper_fitness())
+
     def get_model(self, cfg=None, weights=None, verbose=True):
         """Get model and raise NotImplementedError for loading cfg files."""
         raise NotImplementedError("This task trainer doesn't support loading cfg files")
@@ -563,6 +743,25 @@ class BaseTrainer:
         """Returns a NotImplementedError when the get_validator function is called."""
         raise NotImplementedError("get_validator function not implemented in trainer")
 
+    def get_subset_validator(self):
+        """Returns a copy of self.validator for a fixed stratified subset of the val split if val_fraction < 1."""
+        from ultralytics.data import build_dataloader  # scope for faster startup
+        from ultralytics.data.utils import stratified_subset
+
+        loader, fraction = self.test_loader, self.args.val_fraction
+        if fraction >= 1:
+            return None
+        if not hasattr(loader.dataset, "subset"):
+            LOGGER.warning(f"WARNING ⚠️ val_fraction={fraction} is not supported for task={self.args.task}, ignoring")
+            return None
+        dataset = loader.dataset.subset(stratified_subset(loader.dataset.labels, fraction, seed=self.args.seed))
+        LOGGER.info(f"Validating a stratified subset of {len(dataset)}/{len(loader.dataset)} val images first")
+        validator = copy(self.validator)
+        validator.dataloader = build_dataloader(dataset, loader.batch_size, loader.num_workers, shuffle=False)
+        validator.args = copy(self.validator.args)
+        validator.args.plots = False  # plots are of the full split
+        return validator
+
     def get_dataloader(self, dataset_path, batch_size=16, rank=0, mode="train"):
         """Returns dataloader derived from torch.data.Dataloader."""
         raise NotImplementedError("get_dataloader function not implemented in trainer")
@@ -601,13 +800,14 @@ class BaseTrainer:
         """Plots training labels for YOLO model."""
         pass
 
-    def save_metrics(self, metrics):
-        """Saves training metrics to a CSV file."""
+    def save_metrics(self, metrics, epoch=None):
+        """Saves training metrics of the current epoch, or of a background validated `epoch`, to a CSV file."""
         keys, vals = list(metrics.keys()), list(metrics.values())
         n = len(metrics) + 1  # number of cols
         s = "" if self.csv.exists() else (("%23s," * n % tuple(["epoch"] + keys)).rstrip(",") + "\n")  # header
+        epoch = self.epoch if epoch is None else epoch
         with open(self.csv, "a") as f:
-            f.write(s + ("%23.5g," * n % tuple([self.epoch + 1] + vals)).rstrip(",") + "\n")
+            f.write(s + ("%23.5g," * n % tuple([epoch + 1] + vals)).rstrip(",") + "\n")
 
     def plot_metrics(self):
         """Plot and display metrics visually."""
@@ -620,6 +820,7 @@ class BaseTrainer:
 
     def final_eval(self):
         """Performs final evaluation and validation for object detection YOLO model."""
+        self.ckpt_writer.wait()
         for f in self.last, self.best:
             if f.exists():
                 strip_optimizer(f)  # strip optimizers
@@ -646,7 +847,7 @@ class BaseTrainer:
                 resume = True
                 self.args = get_cfg(ckpt_args)
                 self.args.model = self.args.resume = str(last)  # reinstate model
-                for k in "imgsz", "batch", "device":  # allow arg updates to reduce memory or update device on resume
+                for k in "imgsz", "batch", "device", "stop_epoch":  # allow updates of memory, device and pausing
                     if k in overrides:
                         setattr(self.args, k, overrides[k])
 
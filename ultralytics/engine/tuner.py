@@ -7,6 +7,10 @@ Hyperparameter tuning is the process of systematically searching for the optimal
 that yield the best model performance. This is particularly crucial in deep learning models like YOLO,
 where small changes in hyperparameters can lead to significant differences in model accuracy and efficiency.
 
+Trials run as training subprocesses, `parallel` at a time, and are pruned early with asynchronous successive halving
+(ASHA) when `rungs` > 1: every trial trains to the first rung of epochs, and only the best 1/`eta` of the trials at a
+rung resume from their checkpoint to the next rung, up to the full `epochs`.
+
 Example:
     Tune hyperparameters for YOLOv8n on COCO8 at imgsz=640 and epochs=30 for 300 tuning iterations.
     ```python
@@ -15,8 +19,14 @@ Example:
     model = YOLO('yolov8n.pt')
     model.tune(data='coco8.yaml', epochs=10, iterations=300, optimizer='AdamW', plots=False, save=False, val=False)
     ```
+
+    Run 4 trials at a time, pruning them after 3 and 10 epochs of 30.
+    ```python
+    model.tune(data='coco8.yaml', epochs=30, iterations=100, parallel=4, rungs=3, eta=3, plots=False, val=False)
+    ```
 """
 
+import os
 import random
 import shutil
 import subprocess
@@ -41,6 +51,10 @@ class Tuner:
         space (dict): Hyperparameter search space containing bounds and scaling factors for mutation.
         tune_dir (Path): Directory where evolution logs and results will be saved.
         tune_csv (Path): Path to the CSV file where evolution logs are saved.
+        parallel (int): Number of trials trained concurrently, sharing the CPU threads and listed CUDA devices.
+        rungs (list): Epochs at which ASHA prunes trials, ending at 'epochs'.
+        eta (int): ASHA reduction factor, the best 1/eta of the trials at a rung are promoted to the next rung.
+        trials (list): Trial dicts with 'hyp', 'save_dir', the last completed 'rung' and its 'fitness'.
 
     Methods:
         _mutate(hyp: dict) -> dict:
@@ -72,8 +86,11 @@ class Tuner:
         Initialize the Tuner with configurations.
 
         Args:
-            args (dict, optional): Configuration for hyperparameter evolution.
+            args (dict, optional): Configuration for hyperparameter evolution, with optional 'space', 'parallel' (1),
+                'rungs' (1, no pruning) and 'eta' (3) tuner settings.
         """
+        self.parallel = args.pop("parallel", 1)
+        rungs, self.eta = args.pop("rungs", 1), args.pop("eta", 3)
         self.space = args.pop("space", None) or {  # key: (min, max, gain(optional))
             # 'optimizer': tune.choice(['SGD', 'Adam', 'AdamW', 'NAdam', 'RAdam', 'RMSProp']),
             "lr0": (1e-5, 1e-1),  # initial learning rate (i.e. SGD=1E-2, Adam=1E-3)
@@ -103,6 +120,8 @@ class Tuner:
         self.args = get_cfg(overrides=args)
         self.tune_dir = get_save_dir(self.args, name="tune")
         self.tune_csv = self.tune_dir / "tune_results.csv"
+        self.rungs = sorted({max(round(self.args.epochs / self.eta**k), 1) for k in range(rungs)})
+        self.trials = []
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.prefix = colorstr("Tuner: ")
         callbacks.add_integration_callbacks(self)
@@ -124,9 +143,13 @@ class Tuner:
         Returns:
             (dict): A dictionary containing mutated hyperparameters.
         """
-        if self.tune_csv.exists():  # if CSV file exists: select best hyps and mutate
-            # Select parent(s)
-            x = np.loadtxt(self.tune_csv, ndmin=2, delimiter=",", skiprows=1)
+        if self.tune_csv.exists() or self.trials:  # select best hyps and mutate
+            # Select parent(s), the defaults while the first parallel trials have no results
+            x = (
+                np.loadtxt(self.tune_csv, ndmin=2, delimiter=",", skiprows=1)
+                if self.tune_csv.exists()
+                else np.array([[0.0] + [getattr(self.args, k) for k in self.space.keys()]])
+            )
             fitness = x[:, 0]  # first column
             n = min(n, len(x))  # number of previous results to consider
             x = x[np.argsort(-fitness)][:n]  # top n mutations
@@ -139,7 +162,7 @@ class Tuner:
 
             # Mutate
             r = np.random  # method
-            r.seed(int(time.time()))
+            r.seed(int(time.time()) + len(self.trials))  # distinct for trials started together
             g = np.array([v[2] if len(v) == 3 else 1.0 for k, v in self.space.items()])  # gains 0-1
             ng = len(self.space)
             v = np.ones(ng)
@@ -161,82 +184,155 @@ class Tuner:
         """
         Executes the hyperparameter evolution process when the Tuner instance is called.
 
-        This method iterates through the number of iterations, performing the following steps in each iteration:
-        1. Load the existing hyperparameters or initialize new ones.
-        2. Mutate the hyperparameters using the `mutate` method.
-        3. Train a YOLO model with the mutated hyperparameters.
-        4. Log the fitness score and mutated hyperparameters to a CSV file.
+        This method runs `parallel` trials at a time until `iterations` trials are started, performing these steps:
+        1. Promote the best paused trial of a rung, or mutate the best hyperparameters found into a new trial.
+        2. Train the trial in a subprocess to its next rung of epochs, resuming from its last checkpoint if promoted.
+        3. Log the fitness score and hyperparameters of every completed rung to a CSV file.
 
         Args:
            model (Model): A pre-initialized YOLO model to be used for training.
-           iterations (int): The number of generations to run the evolution for.
-           cleanup (bool): Whether to delete iteration weights to reduce storage space used during tuning.
+           iterations (int): The number of trials to run the evolution for.
+           cleanup (bool): Whether to delete trial weights to reduce storage space used during tuning.
 
         Note:
            The method utilizes the `self.tune_csv` Path object to read and log hyperparameters and fitness scores.
            Ensure this path is set correctly in the Tuner instance.
         """
 
-        t0 = time.time()
-        best_save_dir, best_metrics = None, None
+        self.t0 = time.time()
+        self.best, self.best_metrics = None, None  # trial and metrics of the best fitness
+        self.rows = len(np.loadtxt(self.tune_csv, ndmin=2, delimiter=",", skiprows=1)) if self.tune_csv.exists() else 0
+        self.row_trials = []  # trial of each CSV row logged by this run
         (self.tune_dir / "weights").mkdir(parents=True, exist_ok=True)
-        for i in range(iterations):
-            # Mutate hyperparameters
-            mutated_hyp = self._mutate()
-            LOGGER.info(f"{self.prefix}Starting iteration {i + 1}/{iterations} with hyperparameters: {mutated_hyp}")
-
-            metrics = {}
-            train_args = {**vars(self.args), **mutated_hyp}
-            save_dir = get_save_dir(get_cfg(train_args))
-            weights_dir = save_dir / "weights"
-            try:
-                # Train YOLO model with mutated hyperparameters (run in subprocess to avoid dataloader hang)
-                cmd = ["yolo", "train", *(f"{k}={v}" for k, v in train_args.items())]
-                return_code = subprocess.run(cmd, check=True).returncode
-                ckpt_file = weights_dir / ("best.pt" if (weights_dir / "best.pt").exists() else "last.pt")
-                metrics = torch.load(ckpt_file)["train_metrics"]
-                assert return_code == 0, "training failed"
-
-            except Exception as e:
-                LOGGER.warning(f"WARNING ❌️ training failure for hyperparameter tuning iteration {i + 1}\n{e}")
-
-            # Save results and mutated_hyp to CSV
-            fitness = metrics.get("fitness", 0.0)
-            log_row = [round(fitness, 5)] + [mutated_hyp[k] for k in self.space.keys()]
-            headers = "" if self.tune_csv.exists() else (",".join(["fitness"] + list(self.space.keys())) + "\n")
-            with open(self.tune_csv, "a") as f:
-                f.write(headers + ",".join(map(str, log_row)) + "\n")
-
-            # Get best results
-            x = np.loadtxt(self.tune_csv, ndmin=2, delimiter=",", skiprows=1)
-            fitness = x[:, 0]  # first column
-            best_idx = fitness.argmax()
-            best_is_current = best_idx == i
-            if best_is_current:
-                best_save_dir = save_dir
-                best_metrics = {k: round(v, 5) for k, v in metrics.items()}
-                for ckpt in weights_dir.glob("*.pt"):
-                    shutil.copy2(ckpt, self.tune_dir / "weights")
-            elif cleanup:
-                shutil.rmtree(ckpt_file.parent)  # remove iteration weights/ dir to reduce storage space
-
-            # Plot tune results
-            plot_tune_results(self.tune_csv)
-
-            # Save and print tune results
-            header = (
-                f'{self.prefix}{i + 1}/{iterations} iterations complete ✅ ({time.time() - t0:.2f}s)\n'
-                f'{self.prefix}Results saved to {colorstr("bold", self.tune_dir)}\n'
-                f'{self.prefix}Best fitness={fitness[best_idx]} observed at iteration {best_idx + 1}\n'
-                f'{self.prefix}Best fitness metrics are {best_metrics}\n'
-                f'{self.prefix}Best fitness model is {best_save_dir}\n'
-                f'{self.prefix}Best fitness hyperparameters are printed below.\n'
-            )
-            LOGGER.info("\n" + header)
-            data = {k: float(x[best_idx, i + 1]) for i, k in enumerate(self.space.keys())}
-            yaml_save(
-                self.tune_dir / "best_hyperparameters.yaml",
-                data=data,
-                header=remove_colorstr(header.replace(self.prefix, "# ")) + "\n",
+        running, slots = {}, list(range(self.parallel))  # running trials by slot, free slots
+        while True:
+            while slots and (trial := self._next_trial(iterations, running)):
+                slot = slots.pop(0)
+                running[slot] = trial
+                self._launch(trial, slot)
+            if not running:
+                break
+            time.sleep(1)
+            for slot, trial in list(running.items()):
+                if trial["process"].poll() is not None:
+                    del running[slot]
+                    slots.append(slot)
+                    self._collect(trial, iterations, cleanup)
+        if cleanup:
+            for trial in self.trials:  # paused trials
+                if trial is not self.best and (trial["save_dir"] / "weights").exists():
+                    shutil.rmtree(trial["save_dir"] / "weights")
+
+    def _next_trial(self, iterations, running):
+        """
+        Returns the next trial to train, promoted by ASHA or new, or None to wait for the running trials.
+
+        A paused trial at rung k is promoted if it ranks in the best 1/eta of the trials that completed rung k. Once all
+        trials are started and none runs, the best trial of the highest rung is promoted until one completes 'epochs'.
+        """
+        last = len(self.rungs) - 1
+        paused = [t for t in self.trials if t["process"] is None and not t["failed"] and t["rung"] < last]
+        for k in reversed(range(last)):
+            ranked = sorted(
+                (t for t in self.trials if t["rung"] >= k and not t["failed"]), key=lambda t: -t["fitness"][k]
             )
-            yaml_print(self.tune_dir / "best_hyperparameters.yaml")
+            for t in ranked[: len(ranked) // self.eta]:
+                if t in paused and t["rung"] == k:
+                    return self._promote(t)
+        if len(self.trials) < iterations:
+            hyp = self._mutate()
+            trial = {"i": len(self.trials), "hyp": hyp, "rung": -1, "fitness": {}, "failed": False, "process": None}
+            train_args = {**vars(self.args), **hyp}
+            trial["save_dir"] = get_save_dir(get_cfg(train_args))
+            trial["save_dir"].mkdir(parents=True, exist_ok=True)  # reserve the directory of parallel trials
+            self.trials.append(trial)
+            LOGGER.info(f"{self.prefix}Starting iteration {trial['i'] + 1}/{iterations} with hyperparameters: {hyp}")
+            return trial
+        if paused and not running and not any(t["rung"] == last for t in self.trials):
+            k = max(t["rung"] for t in paused)
+            return self._promote(max((t for t in paused if t["rung"] == k), key=lambda t: t["fitness"][k]))
+
+    def _promote(self, trial):
+        """Returns a paused trial to resume to its next rung of epochs."""
+        epochs = self.rungs[trial["rung"] + 1]
+        LOGGER.info(f"{self.prefix}Promoting iteration {trial['i'] + 1} to {epochs} epochs")
+        return trial
+
+    def _launch(self, trial, slot):
+        """Trains a trial to its next rung in a subprocess, on the CPU threads and CUDA device of its slot."""
+        epochs = self.rungs[trial["rung"] + 1]
+        stop_epoch = 0 if epochs == self.args.epochs else epochs
+        if trial["rung"] < 0:
+            train_args = {**vars(self.args), **trial["hyp"], "name": trial["save_dir"].name, "exist_ok": True}
+        else:  # resume the paused training
+            train_args = {"model": trial["save_dir"] / "weights" / "last.pt", "resume": True}
+        devices = str(self.args.device).split(",")
+        if len(devices) > 1 and self.parallel > 1:
+            train_args["device"] = devices[slot % len(devices)]
+        env = os.environ.copy()
+        if self.parallel > 1:
+            env["OMP_NUM_THREADS"] = str(max((os.cpu_count() or 1) // self.parallel, 1))
+
+        # Train YOLO model with mutated hyperparameters (run in subprocess to avoid dataloader hang)
+        cmd = ["yolo", "train", *(f"{k}={v}" for k, v in {**train_args, "stop_epoch": stop_epoch}.items())]
+        trial["process"] = subprocess.Popen(cmd, env=env)
+
+    def _collect(self, trial, iterations, cleanup):
+        """Logs the fitness of a trial that completed a rung, saving the best weights and tune results."""
+        process, trial["process"] = trial["process"], None
+        trial["rung"] += 1
+        weights_dir = trial["save_dir"] / "weights"
+        metrics = {}
+        try:
+            ckpt_file = weights_dir / ("best.pt" if (weights_dir / "best.pt").exists() else "last.pt")
+            metrics = torch.load(ckpt_file)["train_metrics"]
+            assert process.returncode == 0, "training failed"
+
+        except Exception as e:
+            trial["failed"] = True
+            LOGGER.warning(f"WARNING ❌️ training failure for hyperparameter tuning iteration {trial['i'] + 1}\n{e}")
+
+        # Save results and mutated_hyp to CSV
+        fitness = trial["fitness"][trial["rung"]] = metrics.get("fitness") or 0.0
+        log_row = [round(fitness, 5)] + [trial["hyp"][k] for k in self.space.keys()]
+        headers = "" if self.tune_csv.exists() else (",".join(["fitness"] + list(self.space.keys())) + "\n")
+        with open(self.tune_csv, "a") as f:
+            f.write(headers + ",".join(map(str, log_row)) + "\n")
+        self.row_trials.append(trial)
+
+        # Get best results
+        x = np.loadtxt(self.tune_csv, ndmin=2, delimiter=",", skiprows=1)
+        fitness = x[:, 0]  # first column
+        best_idx = fitness.argmax()
+        if best_idx == len(x) - 1:
+            self.best, self.best_metrics = trial, {k: round(v, 5) for k, v in metrics.items()}
+            for ckpt in weights_dir.glob("*.pt"):
+                shutil.copy2(ckpt, self.tune_dir / "weights")
+        if cleanup:  # remove weights/ dirs of finished trials other than the best to reduce storage space
+            for t in self.trials:
+                finished = t["failed"] or t["rung"] == len(self.rungs) - 1
+                if finished and t["process"] is None and t is not self.best and (t["save_dir"] / "weights").exists():
+                    shutil.rmtree(t["save_dir"] / "weights")
+
+        # Plot tune results
+        plot_tune_results(self.tune_csv)
+
+        # Save and print tune results
+        best = self.row_trials[best_idx - self.rows] if best_idx >= self.rows else None
+        header = (
+            f'{self.prefix}{len(self.trials)}/{iterations} iterations started, rung {trial["rung"] + 1}/'
+            f'{len(self.rungs)} of iteration {trial["i"] + 1} complete ✅ ({time.time() - self.t0:.2f}s)\n'
+            f'{self.prefix}Results saved to {colorstr("bold", self.tune_dir)}\n'
+            f'{self.prefix}Best fitness={fitness[best_idx]} observed at iteration {best["i"] + 1 if best else "-"}\n'
+            f'{self.prefix}Best fitness metrics are {self.best_metrics}\n'
+            f'{self.prefix}Best fitness model is {best and best["save_dir"]}\n'
+            f'{self.prefix}Best fitness hyperparameters are printed below.\n'
+        )
+        LOGGER.info("\n" + header)
+        data = {k: float(x[best_idx, i + 1]) for i, k in enumerate(self.space.keys())}
+        yaml_save(
+            self.tune_dir / "best_hyperparameters.yaml",
+            data=data,
+            header=remove_colorstr(header.replace(self.prefix, "# ")) + "\n",
+        )
+        yaml_print(self.tune_dir / "best_hyperparameters.yaml")
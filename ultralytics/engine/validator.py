@@ -33,7 +33,13 @@ from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.utils import LOGGER, TQDM, callbacks, colorstr, emojis
 from ultralytics.utils.checks import check_imgsz
 from ultralytics.utils.ops import Profile
-from ultralytics.utils.torch_utils import de_parallel, select_device, smart_inference_mode
+from ultralytics.utils.torch_utils import (
+    bf16_to_float,
+    de_parallel,
+    select_device,
+    smart_autocast,
+    smart_inference_mode,
+)
 
 
 class BaseValidator:
@@ -44,6 +50,7 @@ class BaseValidator:
 
     Attributes:
         args (SimpleNamespace): Configuration for the validator.
+        bf16 (bool): Whether to run inference under bfloat16 autocast, requested by 'half=bf16'.
         dataloader (DataLoader): Dataloader to use for validation.
         pbar (tqdm): Progress bar to update during validation.
         model (nn.Module): Model to validate.
@@ -77,6 +84,9 @@ class BaseValidator:
             _callbacks (dict): Dictionary to store various callback functions.
         """
         self.args = get_cfg(overrides=args)
+        self.bf16 = self.args.half == "bf16"  # BF16 autocast of the FP32 model
+        if self.bf16:
+            self.args.half = False  # FP32 inputs
         self.dataloader = dataloader
         self.pbar = pbar
         self.stride = None
@@ -105,7 +115,7 @@ class BaseValidator:
     @smart_inference_mode()
     def __call__(self, trainer=None, model=None):
         """Supports validation of a pre-trained model if passed or a model being trained if trainer is passed (trainer
-        gets priority).
+        gets priority), i.e. its EMA or a snapshot of it passed as `model`.
         """
         self.training = trainer is not None
         augment = self.args.augment and (not self.training)
@@ -113,7 +123,7 @@ class BaseValidator:
             self.device = trainer.device
             self.data = trainer.data
             # self.args.half = self.device.type != "cpu"  # force FP16 val during training
-            model = trainer.ema.ema or trainer.model
+            model = model or trainer.ema.ema or trainer.model
             model = model.half() if self.args.half else model.float()
             # self.model = model
             self.loss = torch.zeros_like(trainer.loss_items, device=trainer.device)
@@ -126,8 +136,12 @@ class BaseValidator:
                 device=select_device(self.args.device, self.args.batch),
                 dnn=self.args.dnn,
                 data=self.args.data,
-                fp16=self.args.half,
+                fp16="bf16" if self.bf16 else self.args.half,
+                mmap=self.args.mmap,
+                compile=self.args.compile,
             )
+            if self.args.quantize:
+                model.quantize(self.args)
             # self.model = model
             self.device = model.device  # update device
             self.args.half = model.fp16  # update half
@@ -175,7 +189,13 @@ class BaseValidator:
 
             # Inference
             with dt[1]:
-                preds = model(batch["img"], augment=augment)
+                if self.training and self.bf16:  # AutoBackend autocasts otherwise
+                    with smart_autocast(self.device, bf16=True):
+                        preds = bf16_to_float(model(batch["img"], augment=augment))
+                else:
+                    preds = model(batch["img"], augment=augment)
+            if not self.training and model.compile:
+                dt[1].exclude(model.compile_dt)  # report compilation separately from inference speed
 
             # Loss
             with dt[2]:
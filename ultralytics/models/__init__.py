@@ -1,8 +1,20 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from .rtdetr import RTDETR
-from .sam import SAM
-from .yolo import YOLO, YOLOWorld
-from .yolov10 import YOLOv10
+import importlib
+
+_LAZY_IMPORTS = {"YOLO": ".yolo", "RTDETR": ".rtdetr", "SAM": ".sam", "YOLOWorld": ".yolo", "YOLOv10": ".yolov10"}
 
 __all__ = "YOLO", "RTDETR", "SAM", "YOLOWorld", "YOLOv10"  # allow simpler import
+
+
+def __getattr__(name):
+    """Imports model classes on first access, so using one model family does not import the others."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    return value
+
+
+def __dir__():
+    """Lists public attributes including the ones that are not imported yet."""
+    return sorted({*globals(), *__all__})
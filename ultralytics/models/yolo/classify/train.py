@@ -97,8 +97,8 @@ class ClassificationTrainer(BaseTrainer):
         return loader
 
     def preprocess_batch(self, batch):
-        """Preprocesses a batch of images and classes."""
-        batch["img"] = batch["img"].to(self.device)
+        """Preprocesses a batch of images and classes, applying the dataset's batched augmentations on device."""
+        batch["img"] = self.train_loader.dataset.batch_transforms(batch["img"].to(self.device))
         batch["cls"] = batch["cls"].to(self.device)
         return batch
 
@@ -135,6 +135,7 @@ class ClassificationTrainer(BaseTrainer):
 
     def final_eval(self):
         """Evaluate trained model and save validation results."""
+        self.ckpt_writer.wait()
         for f in self.last, self.best:
             if f.exists():
                 strip_optimizer(f)  # strip optimizers
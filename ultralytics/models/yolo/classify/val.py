@@ -49,6 +49,7 @@ class ClassificationValidator(BaseValidator):
     def preprocess(self, batch):
         """Preprocesses input batch and returns it."""
         batch["img"] = batch["img"].to(self.device, non_blocking=True)
+        batch["img"] = self.dataloader.dataset.batch_transforms(batch["img"])
         batch["img"] = batch["img"].half() if self.args.half else batch["img"].float()
         batch["cls"] = batch["cls"].to(self.device)
         return batch
@@ -4,7 +4,15 @@ from pathlib import Path
 
 from ultralytics.engine.model import Model
 from ultralytics.models import yolo
-from ultralytics.nn.tasks import ClassificationModel, DetectionModel, OBBModel, PoseModel, SegmentationModel, WorldModel
+from ultralytics.nn.tasks import (
+    ClassificationModel,
+    DetectionModel,
+    OBBModel,
+    PoseModel,
+    SegmentationModel,
+    WorldModel,
+    YOLOv10DetectionModel,
+)
 from ultralytics.utils import yaml_load, ROOT
 
 
@@ -27,6 +35,14 @@ class YOLO(Model):
             # Continue with default YOLO initialization
             super().__init__(model=model, task=task, verbose=verbose)
 
+    def train(self, trainer=None, **kwargs):
+        """Trains the model, with YOLOv10DistillationTrainer if 'teacher' weights are given for a YOLOv10 model."""
+        if trainer is None and kwargs.get("teacher") and isinstance(self.model, YOLOv10DetectionModel):
+            from ultralytics.models.yolov10 import YOLOv10DistillationTrainer
+
+            trainer = YOLOv10DistillationTrainer
+        return super().train(trainer=trainer, **kwargs)
+
     @property
     def task_map(self):
         """Map head to model, trainer, validator, and predictor classes."""
@@ -1,5 +1,6 @@
 from .model import YOLOv10
+from .distill import YOLOv10DistillationTrainer
 from .predict import YOLOv10DetectionPredictor
 from .val import YOLOv10DetectionValidator
 
-__all__ = "YOLOv10DetectionPredictor", "YOLOv10DetectionValidator", "YOLOv10"
+__all__ = "YOLOv10DetectionPredictor", "YOLOv10DetectionValidator", "YOLOv10DistillationTrainer", "YOLOv10"
@@ -0,0 +1,263 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import hashlib
+import json
+import random
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from ultralytics.data import YOLODataset
+from ultralytics.data.augment import Compose, Mosaic
+from ultralytics.nn.tasks import attempt_load_one_weight
+from ultralytics.utils import DEFAULT_CFG, LOGGER, RANK, colorstr
+from ultralytics.utils.loss import v10DistillLoss
+from ultralytics.utils.ops import xywh2xyxy
+from ultralytics.utils.torch_utils import de_parallel, torch_distributed_zero_first
+
+from .train import YOLOv10DetectionTrainer
+
+# Augmentation hyperparameters that change the augmented images, and so the teacher outputs cached for them
+AUGMENT_KEYS = (
+    "hsv_h",
+    "hsv_s",
+    "hsv_v",
+    "degrees",
+    "translate",
+    "scale",
+    "shear",
+    "perspective",
+    "flipud",
+    "fliplr",
+    "bgr",
+    "mosaic",
+    "mixup",
+    "copy_paste",
+)
+
+
+class DistillationDataset(YOLODataset):
+    """
+    YOLODataset with reproducible augmentation, so teacher outputs can be cached per augmented sample.
+
+    Each sample picks one of `views` augmentation views of the image at random and seeds the transforms with
+    (seed, index, view, stage), so a given key always yields the same augmented image. The stage advances when mosaic
+    is closed. The key is returned as the 'distill_slot' of the sample, its row in the TeacherCache.
+
+    Attributes:
+        views (int): Number of distinct augmentations per image.
+        seed (int): Base seed of the augmentations.
+        stage (int): 0 while mosaic is on, 1 once it has been closed.
+    """
+
+    def __init__(self, *args, views=1, seed=0, **kwargs):
+        """Initializes the DistillationDataset with the number of augmentation views per image and a base seed."""
+        self.views, self.seed, self.stage = max(views, 1), seed, 0
+        super().__init__(*args, **kwargs)
+
+    @property
+    def slots(self):
+        """Number of distinct augmented samples, i.e. rows of the TeacherCache."""
+        return 2 * self.views * len(self)
+
+    def build_transforms(self, hyp=None):
+        """Builds the YOLODataset transforms, with mosaic partners drawn from the whole dataset."""
+        transforms = super().build_transforms(hyp)
+        stack = [transforms]
+        while stack:  # Mosaic picks partners from the load-order dependent image buffer by default, not reproducible
+            for t in stack.pop().tolist():
+                if isinstance(t, Compose):
+                    stack.append(t)
+                elif isinstance(t, Mosaic):
+                    t.get_indexes = partial(t.get_indexes, buffer=False)
+        return transforms
+
+    def close_mosaic(self, hyp):
+        """Closes mosaic and moves to the next stage, so samples are cached apart from the mosaic ones."""
+        self.stage = 1
+        super().close_mosaic(hyp)
+
+    def __getitem__(self, index):
+        """Returns the augmented sample of a random view of the image, with its 'distill_slot'."""
+        view = int(torch.randint(self.views, ())) if self.views > 1 else 0
+        slot = (self.stage * self.views + view) * len(self) + index
+        random.seed((self.seed << 32) + slot)
+        np.random.seed((self.seed, slot))
+        label = super().__getitem__(index)
+        label["distill_slot"] = slot
+        return label
+
+
+class TeacherCache:
+    """
+    Top-k teacher detections per augmented sample, stored in *.npy memmaps and filled on first use.
+
+    Attributes:
+        filled (np.memmap): (S,) bool, whether a row holds teacher detections.
+        idx (np.memmap): (S, K) int32 anchor indices, -1 for padding.
+        cls (np.memmap): (S, K) int16 classes.
+        score (np.memmap): (S, K) float16 scores.
+        box (np.memmap): (S, K, 4) float16 xyxy boxes in pixels.
+    """
+
+    def __init__(self, path, slots, topk):
+        """Opens the cache at `path`, creating zeroed memmaps for `slots` rows of `topk` detections if missing."""
+        path.mkdir(parents=True, exist_ok=True)
+        shapes = {
+            "filled": ((slots,), np.bool_),
+            "idx": ((slots, topk), np.int32),
+            "cls": ((slots, topk), np.int16),
+            "score": ((slots, topk), np.float16),
+            "box": ((slots, topk, 4), np.float16),
+        }
+        for k, (shape, dtype) in shapes.items():
+            f = path / f"{k}.npy"
+            if f.exists():
+                setattr(self, k, np.lib.format.open_memmap(f, mode="r+"))
+            else:
+                setattr(self, k, np.lib.format.open_memmap(f, mode="w+", dtype=dtype, shape=shape))
+        self.path, self.topk = path, topk
+
+    def get(self, slots):
+        """Returns the detections of the given rows as a dict of CPU tensors."""
+        return {
+            "idx": torch.from_numpy(self.idx[slots]).long(),
+            "cls": torch.from_numpy(self.cls[slots]).long(),
+            "score": torch.from_numpy(self.score[slots]),
+            "box": torch.from_numpy(self.box[slots]),
+        }
+
+    def put(self, slots, idx, cls, score, box):
+        """Writes (N, k) detections to the given rows, padding them to topk, then marks the rows as filled."""
+        n, k = idx.shape
+        pad = np.full((n, self.topk), -1, dtype=np.int32)
+        pad[:, :k] = idx
+        self.idx[slots] = pad
+        self.cls[slots, :k], self.score[slots, :k], self.box[slots, :k] = cls, score, box
+        self.filled[slots] = True
+
+
+class YOLOv10DistillationTrainer(YOLOv10DetectionTrainer):
+    """
+    A YOLOv10DetectionTrainer distilling a large teacher model into the student, against teacher outputs cached on disk.
+
+    The teacher runs once per unique augmented sample rather than every epoch. DistillationDataset makes augmentation
+    reproducible per (image, view), and the teacher's top-k one2one detections are stored in a TeacherCache under the
+    project directory, shared by later runs with the same teacher, data and augmentation settings. The student's
+    one2one head is fitted to the cached detections on top of the label losses, see v10DistillLoss.
+
+    Example:
+        ```python
+        from ultralytics import YOLOv10
+
+        model = YOLOv10("yolov10n.yaml")
+        model.train(data="coco8.yaml", teacher="yolov10x.pt", distill_views=4)
+        ```
+    """
+
+    distillation = True
+    topk = 100  # teacher detections cached per sample
+
+    def __init__(self, cfg=DEFAULT_CFG, overrides=None, _callbacks=None):
+        """Initialize a YOLOv10DistillationTrainer, requires 'teacher' weights."""
+        super().__init__(cfg, overrides, _callbacks)
+        if not self.args.teacher:
+            raise ValueError("YOLOv10DistillationTrainer requires teacher weights, i.e. 'teacher=yolov10x.pt'")
+        if self.args.multi_scale:
+            LOGGER.warning("WARNING ⚠️ 'multi_scale=True' is incompatible with cached teacher outputs, setting False")
+            self.args.multi_scale = False
+        self.teacher = self.teacher_cache = None
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        """Build a DistillationDataset for training and a YOLODataset for validation."""
+        if mode != "train":
+            return super().build_dataset(img_path, mode, batch)
+        gs = max(int(de_parallel(self.model).stride.max() if self.model else 0), 32)
+        return DistillationDataset(
+            img_path=img_path,
+            imgsz=self.args.imgsz,
+            batch_size=batch,
+            augment=True,
+            hyp=self.args,
+            rect=self.args.rect,
+            cache=self.args.cache or None,
+            single_cls=self.args.single_cls or False,
+            stride=gs,
+            pad=0.0,
+            prefix=colorstr("train: "),
+            task=self.args.task,
+            classes=self.args.classes,
+            data=self.data,
+            fraction=self.args.fraction,
+            views=self.args.distill_views,
+            seed=self.args.seed,
+        )
+
+    def get_validator(self):
+        """Returns a YOLOv10DetectionValidator, adding the distillation losses to the loss names."""
+        validator = super().get_validator()
+        self.loss_names += ("box_kd", "cls_kd", "dfl_kd")
+        return validator
+
+    def _setup_train(self, world_size):
+        """Sets up training, then attaches the distillation criterion, loads the teacher and opens its cache."""
+        super()._setup_train(world_size)
+        model = de_parallel(self.model)
+        model.criterion = v10DistillLoss(model)
+        if self.ema:  # validation losses match the trainer loss items
+            self.ema.ema.criterion = v10DistillLoss(self.ema.ema)
+        self.teacher = self.get_teacher(model)
+
+        dataset = self.train_loader.dataset
+        teacher = Path(self.args.teacher)
+        key = {
+            "teacher": [str(teacher.resolve()), teacher.stat().st_size, teacher.stat().st_mtime],
+            "files": hashlib.sha256("".join(dataset.im_files).encode()).hexdigest(),
+            "args": [self.args.imgsz, self.args.rect, self.args.seed, dataset.views, self.topk],
+            "augment": [getattr(self.args, k) for k in AUGMENT_KEYS],
+        }
+        h = hashlib.sha256(json.dumps(key).encode()).hexdigest()[:16]
+        path = self.save_dir.parent / ".distill" / f"{teacher.stem}-{h}"  # shared by runs of the project
+        with torch_distributed_zero_first(RANK):  # create the cache once if DDP
+            self.teacher_cache = TeacherCache(path, dataset.slots, self.topk)
+        LOGGER.info(
+            f"{colorstr('distill:')} caching teacher outputs for {len(dataset)} images x {dataset.views} views to "
+            f"{self.teacher_cache.path}, {self.teacher_cache.filled.sum()} samples cached"
+        )
+
+    def get_teacher(self, student):
+        """Loads the fused teacher model in eval mode, checking its classes and strides match the student's."""
+        teacher = attempt_load_one_weight(self.args.teacher, device=self.device, fuse=True)[0]
+        head = teacher.model[-1]
+        if not hasattr(head, "one2one_cv2"):
+            raise TypeError(f"teacher={self.args.teacher} is not a YOLOv10 model")
+        if head.nc != student.nc or not torch.equal(teacher.stride.cpu(), student.stride.cpu()):
+            raise ValueError(
+                f"teacher={self.args.teacher} with nc={head.nc}, stride={teacher.stride.tolist()} does not match the "
+                f"student with nc={student.nc}, stride={student.stride.tolist()}"
+            )
+        return teacher.half() if self.amp else teacher
+
+    def preprocess_batch(self, batch):
+        """Preprocesses a batch of images and adds the teacher detections for its samples as batch['teacher']."""
+        batch = super().preprocess_batch(batch)
+        batch["teacher"] = self.teacher_targets(batch["img"], np.asarray(batch["distill_slot"]))
+        return batch
+
+    @torch.no_grad()
+    def teacher_targets(self, imgs, slots):
+        """Returns the cached teacher detections of a batch, running the teacher on the samples not cached yet."""
+        cache = self.teacher_cache
+        todo = ~cache.filled[slots]
+        if todo.any():
+            im = imgs[torch.from_numpy(todo).to(imgs.device)]
+            preds = self.teacher(im.half() if self.amp else im)["one2one"][0]  # (b, 4 + nc, anchors), xywh pixels
+            nc = preds.shape[1] - 4
+            boxes, scores = preds.permute(0, 2, 1).float().split((4, nc), -1)
+            score, i = scores.flatten(1).topk(min(self.topk, scores[0].numel()))
+            idx, cls = i // nc, i % nc
+            box = xywh2xyxy(boxes.gather(1, idx.unsqueeze(-1).expand(-1, -1, 4)))
+            cache.put(slots[todo], *(x.cpu().numpy() for x in (idx, cls, score, box)))
+        return {k: v.to(self.device, non_blocking=True) for k, v in cache.get(slots).items()}
@@ -1,8 +1,12 @@
+import torch
+
 from ultralytics.engine.model import Model
 from ultralytics.nn.tasks import YOLOv10DetectionModel
+from ultralytics.utils.torch_utils import empty_init, load_empty_state_dict
 from .val import YOLOv10DetectionValidator
 from .predict import YOLOv10DetectionPredictor
 from .train import YOLOv10DetectionTrainer
+from .distill import YOLOv10DistillationTrainer
 
 from huggingface_hub import PyTorchModelHubMixin
 from .card import card_template_text
@@ -23,6 +27,35 @@ class YOLOv10(Model, PyTorchModelHubMixin, model_card_template=card_template_tex
         kwargs['config'] = config
         super().push_to_hub(repo_name, **kwargs)
 
+    @classmethod
+    def _from_pretrained(cls, **kwargs):
+        """Builds the model on the meta device, so hub weights are loaded without random init or stride probing."""
+        with empty_init():
+            return super()._from_pretrained(**kwargs)
+
+    @classmethod
+    def _load_as_safetensor(cls, model, model_file, map_location, strict):
+        """Materializes the model built by `_from_pretrained()` from a safetensors file."""
+        from safetensors.torch import load_file  # scope for faster startup
+
+        with torch.device(map_location):  # exit the meta device context
+            load_empty_state_dict(model, load_file(model_file, device=str(map_location)), device=map_location)
+        return model
+
+    @classmethod
+    def _load_as_pickle(cls, model, model_file, map_location, strict):
+        """Materializes the model built by `_from_pretrained()` from a pickled state_dict."""
+        with torch.device(map_location):  # exit the meta device context
+            state_dict = torch.load(model_file, map_location=map_location)
+            load_empty_state_dict(model, state_dict, device=map_location)
+        return model
+
+    def train(self, trainer=None, **kwargs):
+        """Trains the model, with YOLOv10DistillationTrainer if 'teacher' weights are given."""
+        if trainer is None and kwargs.get("teacher"):
+            trainer = YOLOv10DistillationTrainer
+        return super().train(trainer=trainer, **kwargs)
+
     @property
     def task_map(self):
         """Map head to model, trainer, validator, and predictor classes."""
@@ -14,9 +14,10 @@ import torch
 import torch.nn as nn
 from PIL import Image
 
-from ultralytics.utils import ARM64, LINUX, LOGGER, ROOT, yaml_load
-from ultralytics.utils.checks import check_requirements, check_suffix, check_version, check_yaml
+from ultralytics.utils import ARM64, LINUX, LOGGER, ROOT, colorstr, yaml_load
+from ultralytics.utils.checks import check_bf16, check_requirements, check_suffix, check_version, check_yaml
 from ultralytics.utils.downloads import attempt_download_asset, is_url
+from ultralytics.utils.torch_utils import bf16_to_float, smart_autocast
 
 
 def check_class_names(names):
@@ -89,6 +90,8 @@ class AutoBackend(nn.Module):
         batch=1,
         fuse=True,
         verbose=True,
+        mmap=False,
+        compile=False,
     ):
         """
         Initialize the AutoBackend for inference.
@@ -98,10 +101,15 @@ class AutoBackend(nn.Module):
             device (torch.device): Device to run the model on. Defaults to CPU.
             dnn (bool): Use OpenCV DNN module for ONNX inference. Defaults to False.
             data (str | Path | optional): Path to the additional data.yaml file containing class names. Optional.
-            fp16 (bool): Enable half-precision inference. Supported only on specific backends. Defaults to False.
+            fp16 (bool | str): Enable half-precision inference. Supported only on specific backends, or 'bf16' for
+                bfloat16 autocast of PyTorch models with FP32 weights, i.e. on CPU. Defaults to False.
             batch (int): Batch-size to assume for inference.
             fuse (bool): Fuse Conv2D + BatchNorm layers for optimization. Defaults to True.
             verbose (bool): Enable verbose logging. Defaults to True.
+            mmap (bool): Load *.pt weights for inference only via a memory-mapped *.safetensors sidecar, see
+                `attempt_load_weights()`. Defaults to False.
+            compile (bool): Run PyTorch models compiled by `torch.compile()` in channels-last memory format, compiled
+                once per input shape and dtype, falling back to eager mode if compilation fails. Defaults to False.
         """
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
@@ -122,7 +130,8 @@ class AutoBackend(nn.Module):
             ncnn,
             triton,
         ) = self._model_type(w)
-        fp16 &= pt or jit or onnx or xml or engine or nn_module or triton  # FP16
+        bf16 = fp16 == "bf16" and (pt or nn_module)  # BF16 autocast
+        fp16 = fp16 != "bf16" and bool(fp16) and (pt or jit or onnx or xml or engine or nn_module or triton)  # FP16
         nhwc = coreml or saved_model or pb or tflite or edgetpu  # BHWC formats (vs torch BCWH)
         stride = 32  # default stride
         model, metadata = None, None
@@ -154,7 +163,7 @@ class AutoBackend(nn.Module):
             from ultralytics.nn.tasks import attempt_load_weights
 
             model = attempt_load_weights(
-                weights if isinstance(weights, list) else w, device=device, inplace=True, fuse=fuse
+                weights if isinstance(weights, list) else w, device=device, inplace=True, fuse=fuse, mmap=mmap
             )
             if hasattr(model, "kpt_shape"):
                 kpt_shape = model.kpt_shape  # pose-only
@@ -396,6 +405,16 @@ class AutoBackend(nn.Module):
             for p in model.parameters():
                 p.requires_grad = False
 
+        # Compile
+        compile &= pt
+        if compile:
+            model.to(memory_format=torch.channels_last)
+        compiled, compile_dt = {}, 0.0  # compiled models by input (b, ch, h, w, dtype), compile seconds of last call
+
+        # BF16
+        if bf16:
+            check_bf16(device)
+
         self.__dict__.update(locals())  # assign all variables to self
 
     def forward(self, im, augment=False, visualize=False, embed=None):
@@ -419,7 +438,13 @@ class AutoBackend(nn.Module):
 
         # PyTorch
         if self.pt or self.nn_module:
-            y = self.model(im, augment=augment, visualize=visualize, embed=embed)
+            with smart_autocast(self.device, bf16=self.bf16):
+                if self.compile and not (augment or visualize or embed):
+                    y = self._compiled(im)
+                else:
+                    y = self.model(im, augment=augment, visualize=visualize, embed=embed)
+            if self.bf16:
+                y = bf16_to_float(y)  # FP32 for postprocessing
 
         # TorchScript
         elif self.jit:
@@ -574,6 +599,39 @@ class AutoBackend(nn.Module):
         """
         return torch.tensor(x).to(self.device) if isinstance(x, np.ndarray) else x
 
+    def _compiled(self, im):
+        """
+        Runs the PyTorch model compiled for the shape and dtype of `im`, compiling it on the first call.
+
+        Compilation time is excluded from steady-state inference timings through `self.compile_dt`, the seconds spent
+        compiling during the last call. The eager model is cached instead if `torch.compile()` fails.
+
+        Args:
+            im (torch.Tensor): The image tensor in BCHW shape.
+
+        Returns:
+            (torch.Tensor | tuple): The model output.
+        """
+        from ultralytics.utils.ops import Profile  # scope for faster startup
+
+        im = im.contiguous(memory_format=torch.channels_last)
+        key = (*im.shape, im.dtype)
+        self.compile_dt = 0.0
+        if key in self.compiled:
+            return self.compiled[key](im)
+
+        with Profile(device=self.device) as dt:
+            try:
+                model = torch.compile(self.model, dynamic=False)
+                y = model(im)  # compiles on the first call
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ torch.compile failed for input {key}, falling back to eager mode: {e}")
+                model = self.model
+                y = model(im)
+        self.compiled[key], self.compile_dt = model, dt.dt
+        LOGGER.info(f"{colorstr('compile:')} input {key} prepared in {dt.dt:.1f}s, excluded from inference speed")
+        return y
+
     def warmup(self, imgsz=(1, 3, 640, 640)):
         """
         Warm up the model by running one forward pass with a dummy input.
@@ -587,6 +645,28 @@ class AutoBackend(nn.Module):
             for _ in range(2 if self.jit else 1):
                 self.forward(im)  # warmup
 
+    def quantize(self, args):
+        """
+        Quantizes the PyTorch model to INT8 for CPU inference, calibrated on images of the dataset.
+
+        Args:
+            args (SimpleNamespace): Arguments with 'quantize', 'data', 'calib', 'imgsz', 'batch' and 'workers', see
+                `ultralytics.utils.quantize.quantize_static()`.
+        """
+        from ultralytics.utils.quantize import quantize_static  # scope for faster startup
+
+        if args.quantize != "int8":
+            raise ValueError(f"Invalid quantize='{args.quantize}', valid choices are 'int8'")
+        if not self.pt:
+            raise TypeError("'quantize=int8' requires PyTorch *.pt weights")
+        if not args.data:
+            raise ValueError("'quantize=int8' requires a dataset to calibrate on, i.e. 'data=coco8.yaml'")
+        if self.device.type != "cpu":
+            LOGGER.warning(f"WARNING ⚠️ INT8 kernels are CPU only, switching from device={self.device} to CPU")
+        self.model = quantize_static(self.model, args)
+        self.device, self.fp16, self.bf16 = torch.device("cpu"), False, False
+        self.compiled.clear()  # compile the INT8 model instead
+
     @staticmethod
     def _model_type(p="path/to/model.pt"):
         """
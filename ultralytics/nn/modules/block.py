@@ -7,7 +7,7 @@ import torch.nn.functional as F
 
 from .conv import Conv, DWConv, GhostConv, LightConv, RepConv, autopad
 from .transformer import TransformerBlock
-from ultralytics.utils.torch_utils import fuse_conv_and_bn
+from ultralytics.utils.torch_utils import TORCH_2_0, fuse_conv_and_bn
 
 __all__ = (
     "DFL",
@@ -769,6 +769,19 @@ class C2fCIB(C2f):
 
 
 class Attention(nn.Module):
+    """
+    Multi-head self-attention over all positions of a feature map, with a depthwise positional encoding.
+
+    Attention runs as `F.scaled_dot_product_attention()` on torch>=2.0, except for ONNX export. Maps of more than
+    `chunk` positions attend in chunks of `chunk` queries, which gives the same result while bounding the attention
+    matrix to (B, heads, chunk, N) for large inputs, i.e. the P5 map at imgsz=1920.
+
+    Attributes:
+        chunk (int): Maximum number of queries attended at once, 0 for all.
+    """
+
+    chunk = 2048
+
     def __init__(self, dim, num_heads=8,
                  attn_ratio=0.5):
         super().__init__()
@@ -788,14 +801,22 @@ class Attention(nn.Module):
         qkv = self.qkv(x)
         q, k, v = qkv.view(B, self.num_heads, self.key_dim*2 + self.head_dim, N).split([self.key_dim, self.key_dim, self.head_dim], dim=2)
 
-        attn = (
-            (q.transpose(-2, -1) @ k) * self.scale
-        )
-        attn = attn.softmax(dim=-1)
-        x = (v @ attn.transpose(-2, -1)).view(B, C, H, W) + self.pe(v.reshape(B, C, H, W))
+        q, k, v_t = q.transpose(-2, -1), k.transpose(-2, -1), v.transpose(-2, -1)  # (B, heads, N, dim)
+        if self.chunk and N > self.chunk:
+            x = torch.cat([self.attend(qi, k, v_t) for qi in q.split(self.chunk, dim=2)], 2)
+        else:
+            x = self.attend(q, k, v_t)
+        x = x.transpose(-2, -1).reshape(B, C, H, W) + self.pe(v.reshape(B, C, H, W))
         x = self.proj(x)
         return x
 
+    def attend(self, q, k, v):
+        """Returns softmax(q @ k^T * scale) @ v for (B, heads, N, dim) queries, keys and values."""
+        if TORCH_2_0 and not torch.onnx.is_in_onnx_export():
+            return F.scaled_dot_product_attention(q, k, v)  # scale defaults to key_dim ** -0.5
+        attn = (q @ k.transpose(-2, -1)) * self.scale
+        return attn.softmax(dim=-1) @ v
+
 class PSA(nn.Module):
 
     def __init__(self, c1, c2, e=0.5):
@@ -510,20 +510,26 @@ class v10Detect(Detect):
     
     def forward(self, x):
         one2one = self.forward_feat([xi.detach() for xi in x], self.one2one_cv2, self.one2one_cv3)
-        if not self.export:
+        if not self.export and self.cv2 is not None:  # one2many branch is removed by fuse() for inference
             one2many = super().forward(x)
 
         if not self.training:
             one2one = self.inference(one2one)
             if not self.export:
-                return {"one2many": one2many, "one2one": one2one}
+                return {"one2many": one2many, "one2one": one2one} if self.cv2 is not None else {"one2one": one2one}
             else:
                 assert(self.max_det != -1)
                 boxes, scores, labels = ops.v10postprocess(one2one.permute(0, 2, 1), self.max_det, self.nc)
                 return torch.cat([boxes, scores.unsqueeze(-1), labels.unsqueeze(-1).to(boxes.dtype)], dim=-1)
+        elif self.cv2 is None:
+            raise RuntimeError("v10Detect head fused for inference by fuse() can not be trained, reload the model")
         else:
             return {"one2many": one2many, "one2one": one2one}
 
+    def fuse(self):
+        """Remove the one2many branch, which only provides training supervision, so inference runs the one2one head."""
+        self.cv2 = self.cv3 = None
+
     def bias_init(self):
         super().bias_init()
         """Initialize Detect() biases, WARNING: requires stride availability."""
@@ -1,11 +1,15 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import contextlib
+import json
+import mmap
+import zipfile
 from copy import deepcopy
 from pathlib import Path
 
 import torch
 import torch.nn as nn
+import torchvision
 
 from ultralytics.nn.modules import (
     AIFI,
@@ -58,23 +62,25 @@ from ultralytics.nn.modules import (
 from ultralytics.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER, colorstr, emojis, yaml_load
 from ultralytics.utils.checks import check_requirements, check_suffix, check_yaml
 from ultralytics.utils.loss import v8ClassificationLoss, v8DetectionLoss, v8OBBLoss, v8PoseLoss, v8SegmentationLoss, v10DetectLoss
+from ultralytics.utils.metrics import box_iou
+from ultralytics.utils.ops import v10postprocess, xywh2xyxy
 from ultralytics.utils.plotting import feature_visualization
 from ultralytics.utils.torch_utils import (
+    TORCH_1_13,
+    TORCH_2_1,
+    checkpoint_module,
+    empty_init,
     fuse_conv_and_bn,
     fuse_deconv_and_bn,
     initialize_weights,
     intersect_dicts,
+    load_empty_state_dict,
     make_divisible,
     model_info,
     scale_img,
     time_sync,
 )
 
-try:
-    import thop
-except ImportError:
-    thop = None
-
 
 class BaseModel(nn.Module):
     """The BaseModel class serves as a base class for all the models in the Ultralytics YOLO family."""
@@ -125,12 +131,13 @@ class BaseModel(nn.Module):
             (torch.Tensor): The last output of the model.
         """
         y, dt, embeddings = [], [], []  # outputs
+        checkpointed = getattr(self, "checkpointed", ()) if self.training and torch.is_grad_enabled() else ()
         for m in self.model:
             if m.f != -1:  # if not from previous layer
                 x = y[m.f] if isinstance(m.f, int) else [x if j == -1 else y[j] for j in m.f]  # from earlier layers
             if profile:
                 self._profile_one_layer(m, x, dt)
-            x = m(x)  # run
+            x = checkpoint_module(m, x) if m.i in checkpointed else m(x)  # run, checkpointed recomputes in backward
             y.append(x if m.i in self.save else None)  # save output
             if visualize:
                 feature_visualization(x, m.type, m.i, save_dir=visualize)
@@ -162,7 +169,12 @@ class BaseModel(nn.Module):
             None
         """
         c = m == self.model[-1] and isinstance(x, list)  # is final layer list, copy input as inplace fix
-        flops = thop.profile(m, inputs=[x.copy() if c else x], verbose=False)[0] / 1e9 * 2 if thop else 0  # FLOPs
+        try:
+            import thop  # scope for faster startup
+
+            flops = thop.profile(m, inputs=[x.copy() if c else x], verbose=False)[0] / 1e9 * 2  # FLOPs
+        except ImportError:
+            flops = 0
         t = time_sync()
         for _ in range(10):
             m(x.copy() if c else x)
@@ -173,15 +185,50 @@ class BaseModel(nn.Module):
         if c:
             LOGGER.info(f"{sum(dt):10.2f} {'-':>10s} {'-':>10s}  Total")
 
+    def set_checkpoint(self, policy=True):
+        """
+        Selects the C2f, C2fCIB, PSA and SCDown blocks that run with activation checkpointing in training.
+
+        Checkpointed blocks save only their input and recompute their activations in backward, trading about one extra
+        forward pass of the blocks for memory, i.e. a larger batch or image size.
+
+        Args:
+            policy (bool | str | int): True or 'all' for all blocks, 'backbone' for the backbone blocks, n for every
+                n-th block from the first, which has the largest activations, or False for none.
+
+        Returns:
+            (int): Number of checkpointed blocks.
+        """
+        blocks = [m.i for m in self.model if isinstance(m, (C2f, PSA, SCDown))]  # C2f includes C2fCIB
+        if policy == "backbone":
+            blocks = [i for i in blocks if i < len(self.yaml["backbone"])]
+        elif isinstance(policy, int) and not isinstance(policy, bool) and policy > 0:
+            blocks = blocks[::policy]
+        elif policy not in (True, "all"):
+            if policy:
+                raise ValueError(f"invalid checkpoint={policy}, use True, 'all', 'backbone' or n for every n-th block")
+            blocks = []
+        if blocks and not TORCH_1_13:
+            LOGGER.warning("WARNING ⚠️ checkpoint requires torch>=1.13, training without activation checkpointing")
+            blocks = []
+        self.checkpointed = set(blocks)
+        return len(blocks)
+
     def fuse(self, verbose=True):
         """
         Fuse the `Conv2d()` and `BatchNorm2d()` layers of the model into a single layer, in order to improve the
-        computation efficiency.
+        computation efficiency. YOLOv10 heads also drop their training-only one2many branch, and quantization-aware
+        trained models are converted to INT8 on CPU.
 
         Returns:
             (nn.Module): The fused model is returned.
         """
         if not self.is_fused():
+            if any(isinstance(m, torch.ao.quantization.FakeQuantizeBase) for m in self.modules()):
+                from ultralytics.utils.quantize import convert  # scope for faster startup
+
+                if next(self.parameters()).device.type == "cpu":  # INT8 kernels are CPU only, else keep fake quant
+                    convert(self)
             for m in self.model.modules():
                 if isinstance(m, (Conv, Conv2, DWConv)) and hasattr(m, "bn"):
                     if isinstance(m, Conv2):
@@ -199,6 +246,8 @@ class BaseModel(nn.Module):
                 if isinstance(m, RepVGGDW):
                     m.fuse()
                     m.forward = m.forward_fuse
+                if isinstance(m, v10Detect):
+                    m.fuse()  # remove one2many head
             self.info(verbose=verbose)
 
         return self
@@ -308,9 +357,13 @@ class DetectionModel(BaseModel):
             forward = lambda x: self.forward(x)[0] if isinstance(m, (Segment, Pose, OBB)) else self.forward(x)
             if isinstance(m, v10Detect):
                 forward = lambda x: self.forward(x)["one2many"]
-            m.stride = torch.tensor([s / x.shape[-2] for x in forward(torch.zeros(1, ch, s, s))])  # forward
+            strides = self.yaml.pop("stride", None)  # known strides, i.e. from a weights sidecar
+            if strides is None:
+                strides = [s / x.shape[-2] for x in forward(torch.zeros(1, ch, s, s))]  # forward, shapes only on meta
+            m.stride = torch.tensor(strides, device="cpu")
             self.stride = m.stride
-            m.bias_init()  # only run once
+            if not next(m.parameters()).is_meta:  # weights built inside empty_init() are loaded, not initialized
+                m.bias_init()  # only run once
         else:
             self.stride = torch.Tensor([32])  # default stride for i.e. RTDETR
 
@@ -321,44 +374,77 @@ class DetectionModel(BaseModel):
             LOGGER.info("")
 
     def _predict_augment(self, x):
-        """Perform augmentations on input image x and return augmented inference and train outputs."""
-        img_size = x.shape[-2:]  # height, width
+        """
+        Perform augmentations on input image x and return augmented inference and train outputs.
+
+        The scaled and flipped views are padded to the input shape and run as a single batch, then de-scaled together.
+        NMS-free v10Detect predictions of all views are merged by `_merge_augmented()`, other heads leave duplicates
+        to NMS.
+        """
+        b, img_size = x.shape[0], x.shape[-2:]  # batch, (height, width)
         s = [1, 0.83, 0.67]  # scales
         f = [None, 3, None]  # flips (2-ud, 3-lr)
-        y = []  # outputs
-        for si, fi in zip(s, f):
-            xi = scale_img(x.flip(fi) if fi else x, si, gs=int(self.stride.max()))
-            yi = super().predict(xi)  # forward
-            if isinstance(yi, dict):
-                yi = yi["one2one"]  # yolov10 outputs
-            if isinstance(yi, (list, tuple)):
-                yi = yi[0]
-            yi = self._descale_pred(yi, fi, si, img_size)
-            y.append(yi)
-        y = self._clip_augmented(y)  # clip augmented tails
-        return torch.cat(y, -1), None  # augmented inference, train
+        gs = int(self.stride.max())
+        x = torch.cat([scale_img(x.flip(fi) if fi else x, si, same_shape=True, gs=gs) for si, fi in zip(s, f)])
+        y = super().predict(x)  # forward all views at once
+        if isinstance(y, dict):
+            y = y["one2one"]  # yolov10 outputs
+        if isinstance(y, (list, tuple)):
+            y = y[0]
+        y = self._descale_pred(y.view(len(s), b, *y.shape[1:]), f, s, img_size)
+        y = self._clip_augmented(y, s, img_size)  # clip augmented tails and padding
+        if isinstance(self.model[-1], v10Detect):
+            y = self._merge_augmented(y)
+        return y, None  # augmented inference, train
 
     @staticmethod
-    def _descale_pred(p, flips, scale, img_size, dim=1):
-        """De-scale predictions following augmented inference (inverse operation)."""
-        p[:, :4] /= scale  # de-scale
+    def _descale_pred(p, flips, scales, img_size, dim=2):
+        """De-scale predictions of shape(views, b, no, anchors) following augmented inference (inverse operation)."""
+        scale = p.new_tensor(scales).view(-1, 1, 1, 1)
         x, y, wh, cls = p.split((1, 1, 2, p.shape[dim] - 4), dim)
-        if flips == 2:
-            y = img_size[0] - y  # de-flip ud
-        elif flips == 3:
-            x = img_size[1] - x  # de-flip lr
+        x, y, wh = x / scale, y / scale, wh / scale  # de-scale
+        y = torch.where(p.new_tensor([fi == 2 for fi in flips]).bool().view(-1, 1, 1, 1), img_size[0] - y, y)  # ud
+        x = torch.where(p.new_tensor([fi == 3 for fi in flips]).bool().view(-1, 1, 1, 1), img_size[1] - x, x)  # lr
         return torch.cat((x, y, wh, cls), dim)
 
-    def _clip_augmented(self, y):
-        """Clip YOLO augmented inference tails."""
-        nl = self.model[-1].nl  # number of detection layers (P3-P5)
-        g = sum(4**x for x in range(nl))  # grid points
-        e = 1  # exclude layer count
-        i = (y[0].shape[-1] // g) * sum(4**x for x in range(e))  # indices
-        y[0] = y[0][..., :-i]  # large
-        i = (y[-1].shape[-1] // g) * sum(4 ** (nl - 1 - x) for x in range(e))  # indices
-        y[-1] = y[-1][..., i:]  # small
-        return y
+    def _clip_augmented(self, y, scales, img_size):
+        """Clip YOLO augmented inference tails, i.e. P5 of the largest and P3 of the smallest view, and padding."""
+        m = self.model[-1]  # Detect()
+        xy = m.anchors * m.strides  # anchor centers in pixels, shape(2, anchors)
+        strides = m.strides[0]
+        keep = []
+        for i, si in enumerate(scales):
+            k = (xy[0] < img_size[1] * si) & (xy[1] < img_size[0] * si)  # inside the scaled image
+            if i == 0:
+                k &= strides != strides.max()  # large
+            if i == len(scales) - 1:
+                k &= strides != strides.min()  # small
+            keep.append(y[i][..., k])
+        return torch.cat(keep, -1)
+
+    def _merge_augmented(self, y, iou=0.6):
+        """
+        Merge the one-to-one predictions of augmented views, which NMS-free heads do not deduplicate.
+
+        The top candidates of all views are clustered per class by NMS, and each kept box is replaced by the
+        score-weighted mean of its cluster.
+
+        Args:
+            y (torch.Tensor): De-scaled predictions of all views, shape(b, 4 + nc, anchors).
+            iou (float): IoU threshold of boxes of the same object.
+
+        Returns:
+            (torch.Tensor): Detections of shape(b, max_det, 6) as (x1, y1, x2, y2, score, class), zero padded.
+        """
+        m = self.model[-1]  # v10Detect()
+        boxes, scores, labels = v10postprocess(y.transpose(-1, -2), min(3 * m.max_det, y.shape[-1]), m.nc)
+        boxes = xywh2xyxy(boxes)
+        out = y.new_zeros(y.shape[0], m.max_det, 6)
+        for j, (b, s, c) in enumerate(zip(boxes, scores, labels)):
+            i = torchvision.ops.batched_nms(b, s, c, iou)[: m.max_det]
+            w = (box_iou(b[i], b) > iou) * (c[i, None] == c) * s  # cluster weights, shape(kept, candidates)
+            out[j, : len(i)] = torch.cat((w @ b / w.sum(1, keepdim=True), s[i, None], c[i, None].to(b.dtype)), 1)
+        return out
 
     def init_criterion(self):
         """Initialize the loss criterion for the DetectionModel."""
@@ -710,7 +796,7 @@ def temporary_modules(modules=None):
                 del sys.modules[old]
 
 
-def torch_safe_load(weight):
+def torch_safe_load(weight, mmap=False):
     """
     This function attempts to load a PyTorch model with the torch.load() function. If a ModuleNotFoundError is raised,
     it catches the error, logs a warning message, and attempts to install the missing module via the
@@ -718,6 +804,8 @@ def torch_safe_load(weight):
 
     Args:
         weight (str): The file path of the PyTorch model.
+        mmap (bool): Load for inference only. The file is memory-mapped on torch>=2.1 so only the tensors that are used
+            are read from disk, and the optimizer state and the unused model copy are dropped. Defaults to False.
 
     Returns:
         (dict): The loaded PyTorch model.
@@ -726,6 +814,7 @@ def torch_safe_load(weight):
 
     check_suffix(file=weight, suffix=".pt")
     file = attempt_download_asset(weight)  # search online if missing locally
+    kwargs = {"mmap": True} if mmap and TORCH_2_1 and zipfile.is_zipfile(file) else {}  # legacy format can't mmap
     try:
         with temporary_modules(
             {
@@ -734,7 +823,7 @@ def torch_safe_load(weight):
                 "ultralytics.yolo.data": "ultralytics.data",
             }
         ):  # for legacy 8.0 Classify and Pose models
-            ckpt = torch.load(file, map_location="cpu", weights_only=False)
+            ckpt = torch.load(file, map_location="cpu", weights_only=False, **kwargs)
 
     except ModuleNotFoundError as e:  # e.name is missing module name
         if e.name == "models":
@@ -754,7 +843,7 @@ def torch_safe_load(weight):
             f"run a command with an official YOLOv8 model, i.e. 'yolo predict model=yolov8n.pt'"
         )
         check_requirements(e.name)  # install missing module
-        ckpt = torch.load(file, map_location="cpu", weights_only=False)
+        ckpt = torch.load(file, map_location="cpu", weights_only=False, **kwargs)
 
     if not isinstance(ckpt, dict):
         # File is likely a YOLO instance saved with i.e. torch.save(model, "saved_model.pt")
@@ -764,27 +853,134 @@ def torch_safe_load(weight):
         )
         ckpt = {"model": ckpt.model}
 
+    if mmap:  # inference uses the EMA if present, release everything else
+        model = ckpt.get("ema") or ckpt["model"]
+        ckpt = {**{k: v for k, v in ckpt.items() if k not in {"model", "ema", "optimizer"}}, "model": model}
+
     return ckpt, file  # load
 
 
-def attempt_load_weights(weights, device=None, inplace=True, fuse=False):
-    """Loads an ensemble of models weights=[a,b,c] or a single model weights=[a] or weights=a."""
+def save_weights_sidecar(model, file):
+    """
+    Save a model as a weights-only safetensors file that `load_weights_sidecar()` memory-maps for inference.
+
+    The file holds the FP32 state_dict, plus metadata with the model class, YAML and attributes needed to rebuild the
+    model. Fused models are saved fused, so loading them skips fusing too.
+
+    Args:
+        model (BaseModel): Model to save, i.e. a fused model loaded with `attempt_load_weights()`.
+        file (str | Path): Output file, i.e. 'yolov8n.safetensors' next to 'yolov8n.pt'.
+
+    Example:
+        ```python
+        from ultralytics.nn.tasks import attempt_load_one_weight, save_weights_sidecar
+
+        model, _ = attempt_load_one_weight('yolov8n.pt', fuse=True)
+        save_weights_sidecar(model, 'yolov8n.safetensors')
+        ```
+    """
+    from safetensors.torch import save_file  # scope for faster startup
+
+    attrs = {k: getattr(model, k) for k in ("names", "nc", "kpt_shape", "args", "task") if hasattr(model, k)}
+    metadata = {
+        "format": "pt",
+        "class": type(model).__name__,
+        "yaml": json.dumps(model.yaml),
+        "stride": json.dumps(model.stride.tolist()),
+        "fused": json.dumps(model.is_fused()),
+        "attrs": json.dumps(attrs, default=str),
+    }
+    state_dict = {
+        k: (v.float() if v.is_floating_point() else v).detach().cpu().contiguous()
+        for k, v in model.state_dict().items()
+        if not k.endswith(("total_ops", "total_params"))  # thop profiling buffers on the shared Conv.default_act
+    }
+    f = Path(file)
+    save_file(state_dict, f.with_suffix(".tmp"), metadata=metadata)
+    f.with_suffix(".tmp").replace(f)  # atomic for concurrent readers
+
+
+def load_weights_sidecar(file):
+    """
+    Load a model saved by `save_weights_sidecar()` with its weights memory-mapped from the file.
+
+    The model is built on the meta device and its weights are views into a copy-on-write memory map of the file, so
+    nothing is copied at load time and processes loading the same file share its pages in the OS page cache.
+
+    Args:
+        file (str | Path): Path to the safetensors file.
+
+    Returns:
+        (BaseModel): The loaded model on CPU.
+    """
+    with open(file, "rb") as f:
+        n = int.from_bytes(f.read(8), "little")  # header size
+        header = json.loads(f.read(n))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)  # writes stay private to this process
+    metadata = header.pop("__metadata__", {})
+    cls = globals().get(metadata.get("class"))
+    if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+        raise TypeError(f"'{file}' is not an Ultralytics weights sidecar, create one with save_weights_sidecar()")
+
+    with empty_init():
+        model = cls({**json.loads(metadata["yaml"]), "stride": json.loads(metadata["stride"])}, verbose=False)
+        if json.loads(metadata["fused"]):
+            model.fuse(verbose=False)
+    dtypes = {"F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16}
+    dtypes.update({"I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8})
+    state_dict = {}
+    for k, v in header.items():
+        (start, end), dtype = v["data_offsets"], dtypes[v["dtype"]]
+        count = (end - start) // torch.empty(0, dtype=dtype).element_size()
+        x = torch.frombuffer(buffer, dtype=dtype, count=count, offset=8 + n + start) if count else torch.empty(0)
+        state_dict[k] = x.to(dtype).view(v["shape"])
+    load_empty_state_dict(model, state_dict, assign=True)
+
+    for k, v in json.loads(metadata["attrs"]).items():
+        setattr(model, k, {int(i): x for i, x in v.items()} if k == "names" else v)
+    return model
+
+
+def attempt_load_weights(weights, device=None, inplace=True, fuse=False, mmap=False):
+    """
+    Loads an ensemble of models weights=[a,b,c] or a single model weights=[a] or weights=a.
+
+    With mmap=True checkpoints are loaded for inference only, see `torch_safe_load()`, and a weights-only
+    '*.safetensors' sidecar is written next to each '*.pt' file. Later loads memory-map the sidecar with
+    `load_weights_sidecar()`.
+    """
 
     ensemble = Ensemble()
     for w in weights if isinstance(weights, list) else [weights]:
-        ckpt, w = torch_safe_load(w)  # load ckpt
-        args = {**DEFAULT_CFG_DICT, **ckpt["train_args"]} if "train_args" in ckpt else None  # combined args
-        model = (ckpt.get("ema") or ckpt["model"]).to(device).float()  # FP32 model
-
-        # Model compatibility updates
-        model.args = args  # attach args to model
+        model, sidecar = None, Path(w).with_suffix(".safetensors")
+        if mmap and sidecar.is_file() and sidecar.stat().st_mtime >= Path(w).stat().st_mtime:
+            try:
+                model = load_weights_sidecar(sidecar).to(device)
+                model = model if model.is_fused() == bool(fuse and hasattr(model, "fuse")) else None
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ failed to load {sidecar}, loading {w} instead: {e}")
+                model = None
+
+        if model is None:
+            ckpt, w = torch_safe_load(w, mmap=mmap)  # load ckpt
+            args = {**DEFAULT_CFG_DICT, **ckpt["train_args"]} if "train_args" in ckpt else None  # combined args
+            model = (ckpt.get("ema") or ckpt["model"]).to(device).float()  # FP32 model
+
+            # Model compatibility updates
+            model.args = args  # attach args to model
+            model.task = guess_model_task(model)
+            if not hasattr(model, "stride"):
+                model.stride = torch.tensor([32.0])
+            model = model.fuse() if fuse and hasattr(model, "fuse") else model
+            if mmap:
+                try:
+                    save_weights_sidecar(model, sidecar)
+                except Exception as e:  # i.e. read-only directory or models that can't be rebuilt from their YAML
+                    LOGGER.warning(f"WARNING ⚠️ failed to save weights sidecar {sidecar}: {e!r}")
         model.pt_path = w  # attach *.pt file path to model
-        model.task = guess_model_task(model)
-        if not hasattr(model, "stride"):
-            model.stride = torch.tensor([32.0])
 
         # Append
-        ensemble.append(model.fuse().eval() if fuse and hasattr(model, "fuse") else model.eval())  # model in eval mode
+        ensemble.append(model.eval())  # model in eval mode
 
     # Module updates
     for m in ensemble.modules():
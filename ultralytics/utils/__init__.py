@@ -17,7 +17,6 @@ from types import SimpleNamespace
 from typing import Union
 
 import cv2
-import matplotlib.pyplot as plt
 import numpy as np
 import torch
 import yaml
@@ -211,6 +210,8 @@ def plt_settings(rcparams=None, backend="Agg"):
 
         def wrapper(*args, **kwargs):
             """Sets rc parameters and backend, calls the original function, and restores the settings."""
+            import matplotlib.pyplot as plt  # scope for faster startup
+
             original_backend = plt.get_backend()
             if backend.lower() != original_backend.lower():
                 plt.close("all")  # auto-close()ing of figures upon backend switching is deprecated since 3.8
@@ -437,6 +438,8 @@ def is_jupyter():
     Returns:
         (bool): True if running inside a Jupyter Notebook, False otherwise.
     """
+    if "IPython" not in sys.modules:  # notebook kernels import IPython at startup, skip the 0.4s import otherwise
+        return False
     with contextlib.suppress(Exception):
         from IPython import get_ipython
 
@@ -1,16 +1,21 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
-"""Functions for estimating the best YOLO batch size to use a fraction of the available CUDA memory in PyTorch."""
+"""Functions for estimating the best YOLO batch size to use a fraction of the available CUDA or CPU memory."""
 
+import contextlib
+import ctypes
+import threading
 from copy import deepcopy
+from pathlib import Path
 
 import numpy as np
+import psutil
 import torch
 
 from ultralytics.utils import DEFAULT_CFG, LOGGER, colorstr
-from ultralytics.utils.torch_utils import profile
+from ultralytics.utils.torch_utils import profile, smart_autocast
 
 
-def check_train_batch_size(model, imgsz=640, amp=True):
+def check_train_batch_size(model, imgsz=640, amp=True, bf16=False):
     """
     Check YOLO training batch size using the autobatch() function.
 
@@ -18,23 +23,24 @@ def check_train_batch_size(model, imgsz=640, amp=True):
         model (torch.nn.Module): YOLO model to check batch size for.
         imgsz (int): Image size used for training.
         amp (bool): If True, use automatic mixed precision (AMP) for training.
+        bf16 (bool): If True, use bfloat16 autocast for training instead, i.e. on CPU.
 
     Returns:
         (int): Optimal batch size computed using the autobatch() function.
     """
 
-    with torch.cuda.amp.autocast(amp):
+    with smart_autocast(next(model.parameters()).device, amp, bf16):
         return autobatch(deepcopy(model).train(), imgsz)  # compute optimal batch size
 
 
 def autobatch(model, imgsz=640, fraction=0.60, batch_size=DEFAULT_CFG.batch):
     """
-    Automatically estimate the best YOLO batch size to use a fraction of the available CUDA memory.
+    Automatically estimate the best YOLO batch size to use a fraction of the available CUDA memory, or CPU memory.
 
     Args:
         model (torch.nn.module): YOLO model to compute batch size for.
         imgsz (int, optional): The image size used as input for the YOLO model. Defaults to 640.
-        fraction (float, optional): The fraction of available CUDA memory to use. Defaults to 0.60.
+        fraction (float, optional): The fraction of available CUDA or CPU memory to use. Defaults to 0.60.
         batch_size (int, optional): The default batch size to use if an error is detected. Defaults to 16.
 
     Returns:
@@ -46,8 +52,7 @@ def autobatch(model, imgsz=640, fraction=0.60, batch_size=DEFAULT_CFG.batch):
     LOGGER.info(f"{prefix}Computing optimal batch size for imgsz={imgsz}")
     device = next(model.parameters()).device  # get model device
     if device.type == "cpu":
-        LOGGER.info(f"{prefix}CUDA not detected, using default CPU batch-size {batch_size}")
-        return batch_size
+        return autobatch_cpu(model, imgsz, fraction, batch_size)
     if torch.backends.cudnn.benchmark:
         LOGGER.info(f"{prefix} ⚠️ Requires torch.backends.cudnn.benchmark=False, using default batch-size {batch_size}")
         return batch_size
@@ -69,13 +74,7 @@ def autobatch(model, imgsz=640, fraction=0.60, batch_size=DEFAULT_CFG.batch):
         results = profile(img, model, n=3, device=device)
 
         # Fit a solution
-        y = [x[2] for x in results if x]  # memory [2]
-        p = np.polyfit(batch_sizes[: len(y)], y, deg=1)  # first degree polynomial fit
-        b = int((f * fraction - p[1]) / p[0])  # y intercept (optimal batch size)
-        if None in results:  # some sizes failed
-            i = results.index(None)  # first fail index
-            if b >= batch_sizes[i]:  # y intercept above failure point
-                b = batch_sizes[max(i - 1, 0)]  # select prior safe point
+        b, p = fit_batch_size(batch_sizes, [x and x[2] for x in results], f * fraction)
         if b < 1 or b > 1024:  # b outside of safe range
             b = batch_size
             LOGGER.info(f"{prefix}WARNING ⚠️ CUDA anomaly detected, using default batch-size {batch_size}.")
@@ -86,3 +85,134 @@ def autobatch(model, imgsz=640, fraction=0.60, batch_size=DEFAULT_CFG.batch):
     except Exception as e:
         LOGGER.warning(f"{prefix}WARNING ⚠️ error detected: {e},  using default batch-size {batch_size}.")
         return batch_size
+
+
+def autobatch_cpu(model, imgsz=640, fraction=0.60, batch_size=DEFAULT_CFG.batch):
+    """
+    Estimate the best YOLO batch size to use a fraction of the available CPU memory, within container memory limits.
+
+    CPU tensors have no allocator statistics like CUDA, so the peak resident memory (RSS) of the process is sampled
+    during a training forward and backward pass at each batch size, after returning freed memory to the OS, and fitted
+    like autobatch(). Batch sizes predicted to exceed the target memory are not profiled, as the OOM killer ends the
+    process instead of raising an error.
+
+    Args:
+        model (torch.nn.module): YOLO model on CPU to compute batch size for, in training mode.
+        imgsz (int, optional): The image size used as input for the YOLO model. Defaults to 640.
+        fraction (float, optional): The fraction of available CPU memory to use. Defaults to 0.60.
+        batch_size (int, optional): The default batch size to use if an error is detected. Defaults to 16.
+
+    Returns:
+        (int): The optimal batch size.
+    """
+    prefix = colorstr("AutoBatch: ")
+    gb = 1 << 30  # bytes to GiB (1024 ** 3)
+    malloc_trim()
+    t, f = cpu_memory()
+    rss = psutil.Process().memory_info().rss
+    LOGGER.info(f"{prefix}CPU {t / gb:.2f}G total, {rss / gb:.2f}G used by process, {f / gb:.2f}G free")
+
+    # Profile batch sizes
+    batch_sizes, y = [1, 2, 4, 8, 16], []
+    try:
+        for b in batch_sizes:
+            if len(y) > 1 and np.polyval(np.polyfit(batch_sizes[: len(y)], y, deg=1), b) > f / gb * fraction:
+                break  # predicted to exceed the target, smaller batch sizes suffice for the fit
+            malloc_trim()
+            y.append((peak_rss(model, torch.zeros(b, 3, imgsz, imgsz)) - rss) / gb)
+            model.zero_grad(set_to_none=True)
+        LOGGER.info(f"{prefix}Peak memory {', '.join(f'{m:.2f}G' for m in y)} for batch-size {batch_sizes[:len(y)]}")
+
+        # Fit a solution
+        b, p = fit_batch_size(batch_sizes, y, f / gb * fraction)
+        if b < 1 or b > 1024:  # b outside of safe range
+            b = batch_size
+            LOGGER.info(f"{prefix}WARNING ⚠️ CPU anomaly detected, using default batch-size {batch_size}.")
+
+        fraction = (np.polyval(p, b) + (t - f) / gb) / (t / gb)  # actual fraction predicted
+        LOGGER.info(f"{prefix}Using batch-size {b} for CPU {t / gb * fraction:.2f}G/{t / gb:.2f}G ({fraction:.0%}) ✅")
+        return b
+    except Exception as e:
+        LOGGER.warning(f"{prefix}WARNING ⚠️ error detected: {e},  using default batch-size {batch_size}.")
+        return batch_size
+
+
+def fit_batch_size(batch_sizes, memory, free):
+    """
+    Returns the largest batch size whose memory fits in `free`, from a linear fit of profiled memory per batch size.
+
+    Args:
+        batch_sizes (list): Profiled batch sizes, in increasing order.
+        memory (list): Memory used at each batch size, None for failed sizes, in the units of `free`.
+        free (float): Memory available to the batch.
+
+    Returns:
+        (tuple): The batch size, not checked for a safe range, and the (slope, intercept) fit.
+    """
+    y = [m for m in memory if m is not None]
+    p = np.polyfit(batch_sizes[: len(y)], y, deg=1)  # first degree polynomial fit
+    b = int((free - p[1]) / p[0])  # y intercept (optimal batch size)
+    if None in memory:  # some sizes failed
+        i = memory.index(None)  # first fail index
+        if b >= batch_sizes[i]:  # y intercept above failure point
+            b = batch_sizes[max(i - 1, 0)]  # select prior safe point
+    return b, p
+
+
+def peak_rss(model, x):
+    """Returns the peak RSS in bytes of the process during a forward and backward pass of `model` on `x`."""
+    process, done = psutil.Process(), threading.Event()
+    peak = [process.memory_info().rss]
+
+    def sample():
+        """Samples the RSS every millisecond until done."""
+        while not done.wait(0.001):
+            peak[0] = max(peak[0], process.memory_info().rss)
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    try:
+        y = model(x)
+        _sum(y).backward()
+        peak[0] = max(peak[0], process.memory_info().rss)  # before outputs and graph are freed
+    finally:
+        done.set()
+        thread.join()
+    return peak[0]
+
+
+def _sum(y):
+    """Returns the sum of all tensors of a model output, i.e. nested lists and dicts of the Detect head."""
+    if isinstance(y, torch.Tensor):
+        return y.sum()
+    return sum(_sum(v) for v in (y.values() if isinstance(y, dict) else y))
+
+
+def malloc_trim():
+    """Returns freed heap memory to the OS with glibc malloc_trim(), so that the RSS only counts memory in use."""
+    with contextlib.suppress(Exception):  # not glibc
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+
+
+def cpu_memory():
+    """
+    Returns the total and available CPU memory in bytes, limited by the cgroup memory limit of containers.
+
+    The cgroup usage includes the page cache, of which the inactive file pages are reclaimable and counted as available
+    like in psutil.virtual_memory().available.
+    """
+    mem = psutil.virtual_memory()
+    total, free = mem.total, mem.available
+    for d, limit_file, usage_file, inactive in (
+        ("/sys/fs/cgroup", "memory.max", "memory.current", "inactive_file"),  # cgroup v2
+        ("/sys/fs/cgroup/memory", "memory.limit_in_bytes", "memory.usage_in_bytes", "total_inactive_file"),  # v1
+    ):
+        with contextlib.suppress(Exception):  # missing, or 'max' for no limit
+            limit, usage = (int((Path(d) / f).read_text()) for f in (limit_file, usage_file))
+            if limit < total:
+                with contextlib.suppress(Exception):  # page cache reclaimable under the limit
+                    stat = dict(line.split() for line in (Path(d) / "memory.stat").read_text().splitlines())
+                    usage -= min(int(stat.get(inactive, 0)), usage)
+                total, free = limit, min(free, limit - usage)
+            break
+    return total, free
@@ -18,7 +18,6 @@ import cv2
 import numpy as np
 import requests
 import torch
-from matplotlib import font_manager
 
 from ultralytics.utils import (
     ASSETS,
@@ -303,6 +302,8 @@ def check_font(font="Arial.ttf"):
     Returns:
         file (Path): Resolved font file path.
     """
+    from matplotlib import font_manager  # scope for faster startup
+
     name = Path(font).name
 
     # Check USER_CONFIG_DIR
@@ -668,6 +669,29 @@ def check_amp(model):
     return True
 
 
+def check_bf16(device):
+    """
+    Checks bfloat16 autocast support of a device, warning if it has no native bfloat16 arithmetic.
+
+    CPUs compute bfloat16 with AVX512-BF16 or AMX instructions, other CPUs emulate it, usually slower than FP32. CUDA
+    devices compute bfloat16 from Ampere.
+
+    Args:
+        device (torch.device): Device to check.
+
+    Returns:
+        (bool): True if bfloat16 is computed natively, else False.
+    """
+    if device.type == "cuda":
+        native = torch.cuda.is_bf16_supported()
+    else:
+        flags = Path("/proc/cpuinfo").read_text() if Path("/proc/cpuinfo").exists() else ""
+        native = device.type == "cpu" and any(f in flags for f in ("avx512_bf16", "amx_bf16"))
+    if not native:
+        LOGGER.warning(f"WARNING ⚠️ bfloat16 is not supported natively by {device}, it may be slower than FP32")
+    return native
+
+
 def git_describe(path=ROOT):  # path must be a directory
     """Return human-readable git description, i.e. v5.0-5-g3e25f1e https://git-scm.com/docs/git-describe."""
     with contextlib.suppress(Exception):
@@ -762,6 +762,64 @@ class v10DetectLoss:
         loss_one2one = self.one2one(one2one, batch)
         return loss_one2many[0] + loss_one2one[0], torch.cat((loss_one2many[1], loss_one2one[1]))
 
+
+class v10DistillLoss(v10DetectLoss):
+    """v10DetectLoss plus a distillation term fitting the one2one head to cached teacher detections."""
+
+    def __call__(self, preds, batch):
+        """Calculate the label losses and the distillation loss against batch['teacher'], zero if not given."""
+        loss, loss_items = super().__call__(preds, batch)
+        if "teacher" not in batch:  # i.e. validation
+            return loss, torch.cat((loss_items, torch.zeros(3, device=loss_items.device)))
+        loss_distill = self.distill(preds["one2one"], batch["teacher"])
+        return loss + loss_distill.sum() * batch["img"].shape[0], torch.cat((loss_items, loss_distill.detach()))
+
+    def distill(self, feats, teacher):
+        """
+        Compute the one2one box, cls and dfl losses with the teacher detections standing in for the assigner.
+
+        Args:
+            feats (list[torch.Tensor]): One2one head outputs, one (B, no, H, W) map per stride.
+            teacher (dict): Top-k teacher detections per image, 'idx' (B, K) anchor indices (-1 for padding), 'cls'
+                (B, K) classes, 'score' (B, K) scores and 'box' (B, K, 4) xyxy boxes in pixels.
+
+        Returns:
+            (torch.Tensor): Box, cls and dfl distillation losses scaled by their gains and the 'distill' gain.
+        """
+        o = self.one2one
+        loss = torch.zeros(3, device=o.device)  # box, cls, dfl
+        pred_distri, pred_scores = torch.cat([xi.view(feats[0].shape[0], o.no, -1) for xi in feats], 2).split(
+            (o.reg_max * 4, o.nc), 1
+        )
+        pred_scores = pred_scores.permute(0, 2, 1).contiguous()
+        pred_distri = pred_distri.permute(0, 2, 1).contiguous()
+        dtype = pred_scores.dtype
+        anchor_points, stride_tensor = make_anchors(feats, o.stride, 0.5)
+        pred_bboxes = o.bbox_decode(anchor_points, pred_distri)  # xyxy, (b, h*w, 4)
+
+        # Dense targets from the sparse teacher detections, anchors the teacher kept are the foreground
+        b, k = (teacher["idx"] >= 0).nonzero(as_tuple=True)
+        a = teacher["idx"][b, k]
+        target_scores = torch.zeros_like(pred_scores)
+        target_scores[b, a, teacher["cls"][b, k]] = teacher["score"][b, k].to(dtype)
+        target_bboxes = torch.zeros_like(pred_bboxes)
+        target_bboxes[b, a] = teacher["box"][b, k].to(dtype) / stride_tensor[a]
+        fg_mask = torch.zeros(pred_scores.shape[:2], dtype=torch.bool, device=o.device)
+        fg_mask[b, a] = True
+        target_scores_sum = max(target_scores.sum(), 1)
+
+        loss[1] = o.bce(pred_scores, target_scores).sum() / target_scores_sum  # BCE
+        if fg_mask.sum():
+            loss[0], loss[2] = o.bbox_loss(
+                pred_distri, pred_bboxes, anchor_points, target_bboxes, target_scores, target_scores_sum, fg_mask
+            )
+
+        loss[0] *= o.hyp.box  # box gain
+        loss[1] *= o.hyp.cls  # cls gain
+        loss[2] *= o.hyp.dfl  # dfl gain
+        return loss * o.hyp.distill
+
+
 class DFLoss:
     def __init__(self, *args, **kwargs):
         super().__init__()
@@ -52,6 +52,11 @@ class Profile(contextlib.ContextDecorator):
         self.dt = self.time() - self.start  # delta-time
         self.t += self.dt  # accumulate dt
 
+    def exclude(self, dt):
+        """Removes `dt` seconds spent inside the last timed block, i.e. one-off model compilation, from the timings."""
+        self.dt -= dt
+        self.t -= dt
+
     def __str__(self):
         """Returns a human-readable string representing the accumulated elapsed time in the profiler."""
         return f"Elapsed time is {self.t} s"
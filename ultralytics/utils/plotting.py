@@ -6,7 +6,6 @@ import warnings
 from pathlib import Path
 
 import cv2
-import matplotlib.pyplot as plt
 import numpy as np
 import torch
 from PIL import Image, ImageDraw, ImageFont
@@ -598,6 +597,7 @@ class Annotator:
 @plt_settings()
 def plot_labels(boxes, cls, names=(), save_dir=Path(""), on_plot=None):
     """Plot training labels including class histograms and box statistics."""
+    import matplotlib.pyplot as plt  # scope for faster startup
     import pandas as pd
     import seaborn as sn
 
@@ -860,6 +860,7 @@ def plot_results(file="path/to/results.csv", dir="", segment=False, pose=False,
         plot_results('path/to/results.csv', segment=True)
         ```
     """
+    import matplotlib.pyplot as plt  # scope for faster startup
     import pandas as pd
     from scipy.ndimage import gaussian_filter1d
 
@@ -919,6 +920,7 @@ def plt_color_scatter(v, f, bins=20, cmap="viridis", alpha=0.8, edgecolors="none
         >>> f = np.random.rand(100)
         >>> plt_color_scatter(v, f)
     """
+    import matplotlib.pyplot as plt  # scope for faster startup
 
     # Calculate 2D histogram and corresponding colors
     hist, xedges, yedges = np.histogram2d(v, f, bins=bins)
@@ -945,7 +947,7 @@ def plot_tune_results(csv_file="tune_results.csv"):
     Examples:
         >>> plot_tune_results('path/to/tune_results.csv')
     """
-
+    import matplotlib.pyplot as plt  # scope for faster startup
     import pandas as pd
     from scipy.ndimage import gaussian_filter1d
 
@@ -1025,6 +1027,8 @@ def feature_visualization(x, module_type, stage, n=32, save_dir=Path("runs/detec
         n (int, optional): Maximum number of feature maps to plot. Defaults to 32.
         save_dir (Path, optional): Directory to save results. Defaults to Path('runs/detect/exp').
     """
+    import matplotlib.pyplot as plt  # scope for faster startup
+
     for m in ["Detect", "Pose", "Segment"]:
         if m in module_type:
             return
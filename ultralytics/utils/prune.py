@@ -0,0 +1,416 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+Structured channel pruning of YOLO detection models, with optional fine-tuning and accuracy, FLOPs and CPU latency
+reports for each sparsity level.
+
+Usage:
+    from ultralytics.utils.prune import ChannelPruner, prune
+    pruned = ChannelPruner(model).prune(0.5)  # DetectionModel with half of the channels of each layer
+    prune(model='yolov10n.pt', data='coco8.yaml', sparsity=[0.25, 0.5], importance='taylor', epochs=10)
+
+    yolo prune model=yolov10n.pt data=coco8.yaml sparsity=[0.25,0.5] importance=taylor epochs=10
+"""
+
+import time
+from copy import deepcopy
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from ultralytics.cfg import TASK2DATA, TASK2METRIC, get_cfg, get_save_dir
+from ultralytics.nn.modules import PSA, SPPF, C2f, Concat, Conv, Detect, RepVGGDW, SCDown
+from ultralytics.utils import DEFAULT_CFG_DICT, LOGGER, IterableSimpleNamespace, __version__, colorstr, yaml_save
+from ultralytics.utils.torch_utils import get_flops, select_device
+
+PRUNABLE = (Conv, C2f, SCDown, SPPF, PSA)  # layers with a channel argument in the model YAML, C2f includes C2fCIB
+
+
+class ChannelPruner:
+    """
+    Dependency-aware structured channel pruning of YOLO detection models.
+
+    The output channels of every convolution are ranked by importance and the top ones kept, and the same channels are
+    removed from all their consumers: Concat offsets, C2f chunks, the residual chains of C2f and C2fCIB blocks and
+    depthwise convolutions tied to their inputs. The pruned widths are written to a new model YAML without scales, so
+    the pruned model can be rebuilt, i.e. by the trainer for fine-tuning. PSA layers and their inputs keep their width,
+    as the PSA attention heads are derived from it.
+
+    Attributes:
+        model (nn.Module): Unfused DetectionModel to prune.
+        scores (dict): Taylor importance of each BatchNorm2d channel if importance='taylor', else empty.
+
+    Example:
+        ```python
+        from ultralytics.nn.tasks import YOLOv10DetectionModel
+        from ultralytics.utils.prune import ChannelPruner
+
+        model = YOLOv10DetectionModel('yolov10n.yaml')
+        pruned = ChannelPruner(model).prune(0.5)
+        ```
+    """
+
+    def __init__(self, model, importance="bn", batches=()):
+        """
+        Initializes the ChannelPruner.
+
+        Args:
+            model (nn.Module): Unfused DetectionModel to prune.
+            importance (str): 'bn' ranks channels by |BatchNorm2d weight|, 'taylor' by the first-order Taylor expansion
+                of the loss on `batches`.
+            batches (Iterable[dict]): Preprocessed training batches for importance='taylor'.
+        """
+        if importance not in {"bn", "taylor"}:
+            raise ValueError(f"Invalid importance='{importance}', valid choices are 'bn' and 'taylor'")
+        if model.is_fused():
+            raise ValueError("Channel pruning requires an unfused model, i.e. a *.pt checkpoint or a *.yaml model")
+        self.model = model
+        self.scores = self.taylor_scores(batches) if importance == "taylor" else {}
+
+    def taylor_scores(self, batches):
+        """Returns the squared first-order Taylor importance (γ·∂L/∂γ + β·∂L/∂β)² of BatchNorm2d channels, summed."""
+        model = deepcopy(self.model).train()
+        args = getattr(model, "args", {})
+        model.args = IterableSimpleNamespace(**{**DEFAULT_CFG_DICT, **(args if isinstance(args, dict) else vars(args))})
+        model.criterion = model.init_criterion()
+        model.requires_grad_(True)
+        device = next(model.parameters()).device
+        bns = [(a, b) for a, b in zip(self.model.modules(), model.modules()) if isinstance(a, nn.BatchNorm2d)]
+        scores = {a: torch.zeros_like(a.weight, dtype=torch.float) for a, _ in bns}
+        for batch in batches:
+            model.zero_grad()
+            model.loss({**batch, "img": batch["img"].to(device)})[0].backward()
+            for a, b in bns:
+                scores[a] += (b.weight * b.weight.grad + b.bias * b.bias.grad).detach().float().pow(2)
+        return scores
+
+    def prune(self, sparsity):
+        """
+        Returns a pruned copy of the model, keeping a (1 - sparsity) fraction of the channels of every layer.
+
+        Layer widths are rounded to multiples of 8, and the kept channels are copied from the original weights.
+
+        Args:
+            sparsity (float): Fraction of channels to remove from every layer, 0.0 to 1.0.
+
+        Returns:
+            (nn.Module): Pruned model of the same class, with the pruned YAML as its `yaml`.
+        """
+        model = self.model
+        layers = list(model.model)
+        locked = set()
+        for i, m in enumerate(layers):
+            if isinstance(m, PSA):  # PSA(c1, c2) requires c1 == c2, and its attention heads are derived from c1
+                self._lock(layers, i, locked)
+
+        d = deepcopy(model.yaml)
+        d.pop("scales", None)
+        d.pop("scale", None)
+        d["depth_multiple"] = d["width_multiple"] = 1.0
+        for i, (m, layer) in enumerate(zip(layers, d["backbone"] + d["head"])):
+            if isinstance(m, PRUNABLE):
+                c2 = self._out_channels(m)
+                layer[3][0] = c2 if i in locked else max(round(c2 * (1 - sparsity) / 8) * 8, 8)
+                if isinstance(m, C2f):
+                    layer[1] = len(m.m)  # resolve the depth scale
+            elif not isinstance(m, (Concat, nn.Upsample, Detect)):
+                raise NotImplementedError(f"Channel pruning does not support layer {i} {m.type}")
+
+        new = model.__class__(d, verbose=False).to(next(model.parameters()).device)
+        with torch.no_grad():
+            self._copy_layers(layers, list(new.model), model.yaml.get("ch", 3))
+        for k in "names", "args", "task", "pt_path":
+            if hasattr(model, k):
+                setattr(new, k, getattr(model, k))
+        return new
+
+    def _copy_layers(self, old, new, ch):
+        """Copies the kept channels of each layer of `old` to `new`, following the model graph."""
+        keep, width = [], []  # kept output channels and original output width of each layer
+        for i, (a, b) in enumerate(zip(old, new)):
+            f = a.f if isinstance(a.f, list) else [a.f]
+            x = [torch.arange(ch)] if i == 0 else [keep[j] for j in f]
+            if isinstance(a, Concat):
+                offsets = np.cumsum([0] + [width[j] for j in f])
+                out, w = torch.cat([k + o for k, o in zip(x, offsets)]), offsets[-1]
+            elif isinstance(a, nn.Upsample):
+                out, w = x[0], width[f[0]]
+            elif isinstance(a, Detect):
+                self._copy_head(a, b, x)
+                out, w = None, 0
+            elif isinstance(a, PSA):
+                assert len(x[0]) == a.cv1.conv.in_channels, "PSA input channels must not be pruned"
+                b.load_state_dict(a.state_dict())
+                out, w = x[0], self._out_channels(a)
+            elif isinstance(a, C2f):
+                out, w = self._copy_c2f(a, b, x[0]), self._out_channels(a)
+            elif isinstance(a, SPPF):
+                h = self._copy_chain([a.cv1], [b.cv1], x[0])
+                c = a.cv1.conv.out_channels
+                out = self._copy_chain([a.cv2], [b.cv2], torch.cat([h + j * c for j in range(4)]))
+                w = a.cv2.conv.out_channels
+            else:  # Conv, SCDown
+                out, w = self._copy_chain(self._convs(a), self._convs(b), x[0]), self._out_channels(a)
+            keep.append(out)
+            width.append(w)
+
+    def _copy_c2f(self, a, b, keep_in):
+        """Copies a C2f or C2fCIB block, keeping the same channels along the residual chain of its blocks."""
+        c, n = a.c, b.c
+        score = self.score(a.cv1)
+        k0, s1 = self._top(score[:c], n), score[c:].clone()
+        if a.m and a.m[0].add:  # residual blocks add their outputs to the second chunk
+            for m in a.m:
+                s1 += self._tail_score(self._convs(m))
+        k1 = self._top(s1, n)
+        self._copy(a.cv1, b.cv1, keep_in, torch.cat((k0, k1 + c)))
+        y = [k0, k1]
+        for ma, mb in zip(a.m, b.m):
+            y.append(self._copy_chain(self._convs(ma), self._convs(mb), y[-1], k1 if ma.add else None))
+        return self._copy_chain([a.cv2], [b.cv2], torch.cat([k + j * c for j, k in enumerate(y)]))
+
+    def _copy_head(self, a, b, keep_in):
+        """Copies the box and class branches of a Detect or v10Detect head, outputs are not pruned."""
+        for name in "cv2", "cv3", "one2one_cv2", "one2one_cv3":
+            if getattr(a, name, None) is not None:
+                for k, sa, sb in zip(keep_in, getattr(a, name), getattr(b, name)):
+                    self._copy_chain(self._convs(sa), self._convs(sb), k)
+
+    def _copy_chain(self, old, new, keep_in, keep_out=None):
+        """
+        Copies a sequence of convolutions, keeping the most important output channels of each.
+
+        Depthwise convolutions keep the channels of their input, which also add their importance to the convolution
+        before them.
+
+        Args:
+            old (list[nn.Module]): Original Conv, RepVGGDW or nn.Conv2d modules, in order.
+            new (list[nn.Module]): Pruned modules matching `old`.
+            keep_in (torch.Tensor): Kept input channels of the first module.
+            keep_out (torch.Tensor, optional): Channels to keep at the output of the last non-depthwise module, i.e.
+                for a residual connection.
+
+        Returns:
+            (torch.Tensor): Kept output channels of the sequence.
+        """
+        last = max(j for j, m in enumerate(old) if not self._depthwise(m))
+        for j, (a, b) in enumerate(zip(old, new)):
+            if self._depthwise(a):
+                keep = keep_in
+            elif j == last and keep_out is not None:
+                keep = keep_out
+            else:
+                keep = self._top(self._tail_score(old[j:]), self._out_channels(b))
+            self._copy(a, b, keep_in, keep)
+            keep_in = keep
+        return keep_in
+
+    def _copy(self, a, b, keep_in, keep_out):
+        """Copies the `keep_out` output and `keep_in` input channels of a Conv, RepVGGDW or nn.Conv2d module."""
+        if isinstance(a, RepVGGDW):
+            self._copy(a.conv, b.conv, keep_in, keep_out)
+            self._copy(a.conv1, b.conv1, keep_in, keep_out)
+            return
+        ca, cb = (a.conv, b.conv) if isinstance(a, Conv) else (a, b)
+        w = ca.weight[keep_out]
+        cb.weight.copy_(w if ca.groups > 1 else w[:, keep_in])
+        if ca.bias is not None:
+            cb.bias.copy_(ca.bias[keep_out])
+        if isinstance(a, Conv):
+            for k in "weight", "bias", "running_mean", "running_var":
+                getattr(b.bn, k).copy_(getattr(a.bn, k)[keep_out])
+            b.bn.num_batches_tracked.copy_(a.bn.num_batches_tracked)
+
+    def score(self, m):
+        """Returns the importance of each output channel of a Conv, RepVGGDW or nn.Conv2d module."""
+        if isinstance(m, RepVGGDW):
+            return self.score(m.conv) + self.score(m.conv1)
+        if isinstance(m, Conv):
+            return self.scores[m.bn] if m.bn in self.scores else m.bn.weight.detach().float().abs()
+        return m.weight.detach().float().flatten(1).abs().sum(1)  # L1 norm for convolutions without BatchNorm2d
+
+    def _tail_score(self, convs):
+        """Returns the importance of the first convolution of `convs` plus the depthwise convolutions following it."""
+        score = self.score(convs[0])
+        for m in convs[1:]:
+            if not self._depthwise(m):
+                break
+            score = score + self.score(m)
+        return score
+
+    @staticmethod
+    def _convs(m):
+        """Returns the Conv, RepVGGDW and nn.Conv2d modules of `m` in forward order."""
+        if isinstance(m, (Conv, RepVGGDW, nn.Conv2d)):
+            return [m]
+        return [x for c in m.children() for x in ChannelPruner._convs(c)]
+
+    @staticmethod
+    def _depthwise(m):
+        """Returns True if `m` is a depthwise convolution, whose output channels follow its input channels."""
+        c = m.conv.conv if isinstance(m, RepVGGDW) else m.conv if isinstance(m, Conv) else m
+        if c.groups == 1:
+            return False
+        if c.groups == c.in_channels == c.out_channels:
+            return True
+        raise NotImplementedError(f"Channel pruning does not support grouped convolutions, i.e. {c}")
+
+    @staticmethod
+    def _out_channels(m):
+        """Returns the number of output channels of a Conv, nn.Conv2d or PRUNABLE layer."""
+        if isinstance(m, nn.Conv2d):
+            return m.out_channels
+        return (m.cv1 if isinstance(m, SCDown) else m.cv2 if hasattr(m, "cv2") else m).conv.out_channels
+
+    @staticmethod
+    def _top(score, n):
+        """Returns the sorted indices of the `n` highest scores."""
+        return score.topk(n).indices.sort().values
+
+    @staticmethod
+    def _lock(layers, i, locked):
+        """Locks the width of layer `i` and, through Concat and nn.Upsample layers, of the layers it is derived from."""
+        locked.add(i)
+        m = layers[i]
+        f = m.f if isinstance(m.f, list) else [m.f]
+        for j in f if isinstance(m, (PSA, Concat, nn.Upsample)) else ():
+            j = j % i
+            if j not in locked:
+                ChannelPruner._lock(layers, j, locked)
+
+
+def cpu_latency(model, imgsz=640, n=10):
+    """Returns the median CPU latency in ms of the fused model on one imgsz x imgsz image."""
+    model = deepcopy(model).float().cpu().fuse(verbose=False).eval()
+    im = torch.zeros(1, 3, imgsz, imgsz)
+    t = []
+    with torch.inference_mode():
+        for i in range(n + 3):  # 3 warmup runs
+            t0 = time.perf_counter()
+            model(im)
+            t.append(time.perf_counter() - t0)
+    return float(np.median(t[3:]) * 1000)
+
+
+def prune(
+    model="yolov10n.pt",
+    data=None,
+    sparsity=0.5,
+    importance="bn",
+    imgsz=640,
+    batch=16,
+    epochs=0,
+    device="cpu",
+    save_dir=None,
+):
+    """
+    Prune a YOLO detection model at one or more sparsity levels and report the accuracy, FLOPs and CPU latency of each.
+
+    Every pruned model is saved as a *.pt checkpoint and its *.yaml model, and optionally fine-tuned by the trainer
+    before validation.
+
+    Args:
+        model (str | Path | Model): Model to prune, a *.pt checkpoint or a *.yaml model. Default is 'yolov10n.pt'.
+        data (str, optional): Dataset to fine-tune and validate on, inherited from TASK2DATA if not passed.
+        sparsity (float | list): Fraction of channels removed from each layer, or a list of levels. Default is 0.5.
+        importance (str): Channel importance, 'bn' for |BatchNorm2d weight| or 'taylor' for the first-order Taylor
+            expansion of the loss on training batches. Default is 'bn'.
+        imgsz (int): Image size for importance, fine-tuning, validation, FLOPs and latency. Default is 640.
+        batch (int): Batch size for importance, fine-tuning and validation. Default is 16.
+        epochs (int): Epochs to fine-tune each pruned model for, 0 to skip fine-tuning. Default is 0.
+        device (str): Device to fine-tune and validate on, latency is always measured on CPU. Default is 'cpu'.
+        save_dir (str | Path, optional): Directory for the pruned models, runs/<task>/prune if not passed.
+
+    Returns:
+        df (pandas.DataFrame): One row per sparsity level, 0.0 being the input model, with parameters, GFLOPs, metric,
+            CPU latency and the path of the pruned weights.
+
+    Example:
+        ```python
+        from ultralytics.utils.prune import prune
+
+        prune(model='yolov10n.pt', data='coco8.yaml', sparsity=[0.25, 0.5], epochs=10)
+        ```
+    """
+    import pandas as pd  # scope for faster startup
+
+    from ultralytics import YOLO
+
+    if isinstance(model, (str, Path)):
+        model = YOLO(model)
+    levels = sorted({0.0, *(sparsity if isinstance(sparsity, (list, tuple)) else [sparsity])})
+    if not all(0 <= s < 1 for s in levels):
+        raise ValueError(f"Invalid sparsity={sparsity}, sparsity levels must be in [0.0, 1.0)")
+    if model.task != "detect":
+        raise NotImplementedError(f"Channel pruning supports detection models, not task={model.task}")
+    data = data or TASK2DATA[model.task]
+    save_dir = Path(save_dir or get_save_dir(get_cfg(overrides={"mode": "prune", "task": model.task})))
+    save_dir.mkdir(parents=True, exist_ok=True)
+    device = select_device(device, verbose=False)
+    key = TASK2METRIC[model.task]  # metric, i.e. metrics/mAP50-95(B)
+    stem = Path(model.ckpt_path or model.cfg).stem
+
+    batches = _training_batches(model.model, data, imgsz, batch) if importance == "taylor" else ()
+    pruner = ChannelPruner(model.model, importance, batches)
+    t0 = time.time()
+    files = {0.0: model.ckpt_path or model.cfg}
+    for s in levels[1:]:  # prune every level first, validation fuses the model in place
+        m = pruner.prune(s)
+        f = files[s] = save_dir / f"{stem}-pruned{round(s * 100)}.pt"
+        yaml_save(f.with_suffix(".yaml"), m.yaml)
+        torch.save(
+            {
+                "date": datetime.now().isoformat(),
+                "version": __version__,
+                "model": deepcopy(m).half(),
+                "train_args": dict(m.args),
+            },
+            f,
+        )
+
+    y = []
+    for s, f in files.items():
+        pruned = model.__class__(f) if s else model
+        if s and epochs:
+            pruned.train(
+                data=data,
+                epochs=epochs,
+                imgsz=imgsz,
+                batch=batch,
+                device=device,
+                project=save_dir,
+                name=Path(f).stem,
+                exist_ok=True,
+                plots=False,
+            )
+            f = pruned.trainer.best
+            pruned = model.__class__(f)
+        params = sum(x.numel() for x in pruned.model.parameters())
+        flops, latency = get_flops(pruned.model, imgsz), cpu_latency(pruned.model, imgsz)
+        results = pruned.val(data=data, imgsz=imgsz, batch=batch, device=device, plots=False, verbose=False)
+        metric = results.results_dict[key]
+        y.append([s, round(params / 1e6, 3), round(flops, 2), round(metric, 4), round(latency, 2), str(f)])
+
+    df = pd.DataFrame(y, columns=["Sparsity", "Params (M)", "GFLOPs", key, "CPU latency (ms/im)", "Weights"])
+    LOGGER.info(
+        f"\n{colorstr('prune:')} {stem} pruned with importance={importance} on {data} at imgsz={imgsz} "
+        f"({time.time() - t0:.2f}s), saved to {colorstr('bold', save_dir)}\n{df.to_string(index=False)}\n"
+    )
+    return df
+
+
+def _training_batches(model, data, imgsz, batch, n=8):
+    """Returns up to `n` preprocessed training batches of `data` without augmentation, for Taylor importance."""
+    from ultralytics.data import build_dataloader, build_yolo_dataset
+    from ultralytics.data.utils import check_det_dataset
+
+    data = check_det_dataset(data)
+    cfg = get_cfg(overrides={"imgsz": imgsz})
+    dataset = build_yolo_dataset(cfg, data["train"], batch, data, mode="val", stride=int(model.stride.max()))
+    batches = list(islice(build_dataloader(dataset, batch, workers=0, shuffle=True), n))
+    for b in batches:
+        b["img"] = b["img"].float() / 255
+    return batches
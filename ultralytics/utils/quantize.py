@@ -0,0 +1,191 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+"""
+INT8 quantization of YOLO models with torch.ao.quantization FX graph mode, for CPU inference.
+
+Every Conv (Conv2d + BatchNorm2d + activation), RepVGGDW and bare nn.Conv2d of the model is traced and prepared as its
+own quantized unit, the rest of the model (C2f chunking, attention, Detect anchors, DFL and box decoding) runs in float
+between units. Models are prepared with fake quantization for quantization-aware training, and converted to INT8
+kernels by `model.fuse()` on CPU, as called by AutoBackend and the Exporter. Float models are quantized post-training
+by quantize_static(), calibrated on dataset images.
+
+Usage:
+    from ultralytics.utils.quantize import prepare_qat, quantize_static
+    model = prepare_qat(model)  # fake-quantized DetectionModel, trained as usual
+    model = model.cpu().fuse()  # INT8 DetectionModel
+    model = quantize_static(model, get_cfg(overrides={'data': 'coco8.yaml'}))  # INT8 copy of a float model
+
+    yolo train model=yolov10n.pt data=coco8.yaml qat=True epochs=10 lr0=0.001
+    yolo val model=yolov10n.pt data=coco8.yaml quantize=int8
+"""
+
+import math
+from copy import copy, deepcopy
+from itertools import islice
+
+import torch
+import torch.nn as nn
+from torch.ao.quantization import QConfigMapping, get_default_qat_qconfig, get_default_qconfig
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx, prepare_qat_fx
+
+from ultralytics.nn.modules import DFL, Conv, RepVGGDW
+from ultralytics.utils import LOGGER, colorstr
+
+UNIT_ATTRS = ("f", "i", "type", "np")  # DetectionModel layer attributes kept by quantized units
+# Quantized engine, 'x86' dispatches some convolutions to oneDNN, which corrupts memory on small feature maps
+ENGINE = "fbgemm" if "fbgemm" in torch.backends.quantized.supported_engines else torch.backends.quantized.engine
+OBSERVED = "_observed_graph_module_attrs"  # GraphModule meta key of FX prepared modules, required by convert_fx()
+
+
+class QuantUnit(nn.Module):
+    """
+    A Conv, RepVGGDW or nn.Conv2d module traced and prepared, or converted, by FX graph mode quantization.
+
+    GraphModule meta is lost when pickled, so the observed attributes needed by convert_fx() are kept by the unit.
+
+    Attributes:
+        m (torch.fx.GraphModule): Prepared or converted module.
+        observed (ObservedGraphModuleAttrs): FX attributes of the prepared module, None once converted.
+    """
+
+    def __init__(self, m, observed=None):
+        """Initializes the QuantUnit with a prepared or converted module and its observed attributes."""
+        super().__init__()
+        self.m, self.observed = m, observed
+
+    def forward(self, x):
+        """Forward pass through the quantized module, with float inputs and outputs."""
+        return self.m(x)
+
+
+def _units(module):
+    """Yields (parent, name, module) for the Conv, RepVGGDW and nn.Conv2d modules quantized as units, DFL excluded."""
+    for name, m in module.named_children():
+        if isinstance(m, (Conv, RepVGGDW, nn.Conv2d)):
+            yield module, name, m
+        elif not isinstance(m, (DFL, QuantUnit)):
+            yield from _units(m)
+
+
+def _in_channels(m):
+    """Returns the input channels of a Conv, RepVGGDW or nn.Conv2d unit."""
+    while not isinstance(m, nn.Conv2d):
+        m = m.conv
+    return m.in_channels
+
+
+def _copy_unit_attrs(a, b):
+    """Copies the DetectionModel layer attributes of module `a`, i.e. 'f' and 'i', to its replacement `b`."""
+    for k in UNIT_ATTRS:
+        if k in vars(a):
+            setattr(b, k, vars(a)[k])
+
+
+def _traceable(m):
+    """Returns a module FX can trace for a unit, as fused Conv and RepVGGDW units replace forward() on the instance."""
+    if isinstance(m, nn.Conv2d):
+        return nn.Sequential(m)
+    if isinstance(m, Conv) and not hasattr(m, "bn"):  # fused, forward_fuse()
+        return nn.Sequential(m.conv, m.act)
+    if isinstance(m, RepVGGDW) and not hasattr(m, "conv1"):  # fused to a single nn.Conv2d, forward_fuse()
+        return nn.Sequential(m.conv, m.act)
+    return m
+
+
+def _prepare(model, prepare, qconfig):
+    """Replaces the float units of the model in place with QuantUnits prepared by `prepare` with `qconfig`."""
+    mapping = QConfigMapping().set_global(qconfig)
+    device = next(model.parameters()).device
+    units = list(_units(model.model))
+    for parent, name, m in units:
+        x, t = torch.zeros(1, _in_channels(m), 8, 8, device=device), _traceable(m)
+        g = prepare(t, mapping, (x,))
+        kept = set(g.modules())
+        for k in t.modules():  # fused away, i.e. a ReLU shared by all Convs through Conv.default_act
+            if k not in kept:
+                vars(k).pop("qconfig", None)
+        for k in g.modules():  # FX binds qconfigs to the device with local functions, which can not be pickled
+            if getattr(k, "qconfig", None) is not None:
+                k.qconfig = qconfig
+        observed = g.meta[OBSERVED]
+        observed.node_name_to_qconfig = {k: v and qconfig for k, v in observed.node_name_to_qconfig.items()}
+        unit = QuantUnit(g, observed)
+        _copy_unit_attrs(m, unit)
+        setattr(parent, name, unit)
+    return len(units)
+
+
+def prepare_qat(model):
+    """
+    Prepares a float model for quantization-aware training in place, inserting fake quantization into every unit.
+
+    BatchNorm2d layers are folded into their QAT convolutions, weights are fake-quantized per channel and activations
+    per tensor with the default QAT qconfig of ENGINE, 'fbgemm' on x86 CPUs.
+
+    Args:
+        model (nn.Module): Float DetectionModel in any mode, on any device.
+
+    Returns:
+        (nn.Module): The prepared model.
+    """
+    training = model.training
+    n = _prepare(model.train(), prepare_qat_fx, get_default_qat_qconfig(ENGINE))  # FX QAT requires training mode
+    LOGGER.info(f"{colorstr('qat:')} prepared {n} layers for {ENGINE} INT8")
+    return model.train(training)
+
+
+@torch.no_grad()
+def quantize_static(model, args):
+    """
+    Returns an INT8 copy of a float model for CPU inference, with post-training static quantization.
+
+    Conv, BatchNorm2d and activation layers are fused into INT8 convolutions, with activation ranges calibrated on
+    `args.calib` images of the 'data' train split, loaded like validation images. The model is not modified.
+
+    Args:
+        model (nn.Module): Float DetectionModel, fused or not.
+        args (SimpleNamespace): Arguments with 'data', 'calib', 'imgsz', 'batch', 'workers' and dataset settings.
+
+    Returns:
+        (nn.Module): The INT8 DetectionModel on CPU, in eval mode.
+    """
+    from ultralytics.data import build_dataloader, build_yolo_dataset  # scope for faster startup
+    from ultralytics.data.utils import check_det_dataset
+
+    model = deepcopy(model).float().cpu().eval()
+    n = _prepare(model, prepare_fx, get_default_qconfig(ENGINE))
+    data = check_det_dataset(args.data)
+    stride = max(int(model.stride.max()), 32)
+    cfg = copy(args)
+    cfg.imgsz = max(args.imgsz) if isinstance(args.imgsz, (list, tuple)) else args.imgsz
+    dataset = build_yolo_dataset(cfg, data["train"], args.batch, data, mode="val", stride=stride)
+    loader = build_dataloader(dataset, args.batch, args.workers, shuffle=False)
+    for batch in islice(loader, math.ceil(args.calib / args.batch)):
+        model(batch["img"].float() / 255)
+    LOGGER.info(f"{colorstr('quantize:')} quantized {n} layers to {ENGINE} INT8, calibrated on {args.calib} images")
+    return convert(model)
+
+
+def convert(model):
+    """
+    Converts the fake-quantized units of a prepared model to INT8 kernels in place, the model must be on CPU.
+
+    Sets `torch.backends.quantized.engine` to ENGINE, which runs the INT8 kernels.
+
+    Args:
+        model (nn.Module): DetectionModel returned by prepare_qat().
+
+    Returns:
+        (nn.Module): The INT8 model in eval mode.
+    """
+    torch.backends.quantized.engine = ENGINE
+    model.eval()
+    for m in model.modules():
+        if isinstance(m, QuantUnit) and m.observed is not None:
+            m.m.meta[OBSERVED] = m.observed
+            m.m, m.observed = convert_fx(m.m), None
+    return model
+
+
+def is_quantized(model):
+    """Returns True if the model has fake-quantized or INT8 units."""
+    return any(isinstance(m, QuantUnit) for m in model.modules())
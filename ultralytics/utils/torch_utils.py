@@ -1,8 +1,11 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
+import functools
 import math
 import os
 import random
+import shutil
+import threading
 import time
 from contextlib import contextmanager
 from copy import deepcopy
@@ -15,19 +18,16 @@ import torch.distributed as dist
 import torch.nn as nn
 import torch.nn.functional as F
 import torchvision
+from torch.utils.checkpoint import checkpoint
 
 from ultralytics.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER, __version__
 from ultralytics.utils.checks import PYTHON_VERSION, check_version
 
-try:
-    import thop
-except ImportError:
-    thop = None
-
 # Version checks (all default to version>=min_version)
 TORCH_1_9 = check_version(torch.__version__, "1.9.0")
 TORCH_1_13 = check_version(torch.__version__, "1.13.0")
 TORCH_2_0 = check_version(torch.__version__, "2.0.0")
+TORCH_2_1 = check_version(torch.__version__, "2.1.0")
 TORCHVISION_0_10 = check_version(torchvision.__version__, "0.10.0")
 TORCHVISION_0_11 = check_version(torchvision.__version__, "0.11.0")
 TORCHVISION_0_13 = check_version(torchvision.__version__, "0.13.0")
@@ -57,8 +57,9 @@ def smart_inference_mode():
     return decorate
 
 
+@functools.lru_cache
 def get_cpu_info():
-    """Return a string with system CPU information, i.e. 'Apple M2'."""
+    """Return a string with system CPU information, i.e. 'Apple M2', cached as py-cpuinfo takes about a second."""
     import cpuinfo  # pip install py-cpuinfo
 
     k = "brand_raw", "hardware_raw", "arch_string_raw"  # info keys sorted by preference (not all keys always available)
@@ -150,10 +151,10 @@ def select_device(device="", batch=0, newline=False, verbose=True):
         arg = "cuda:0"
     elif mps and TORCH_2_0 and torch.backends.mps.is_available():
         # Prefer MPS if available
-        s += f"MPS ({get_cpu_info()})\n"
+        s += f"MPS ({get_cpu_info() if verbose else ''})\n"  # py-cpuinfo runs subprocesses, only query to log
         arg = "mps"
     else:  # revert to CPU
-        s += f"CPU ({get_cpu_info()})\n"
+        s += f"CPU ({get_cpu_info() if verbose else ''})\n"
         arg = "cpu"
 
     if verbose:
@@ -184,6 +185,8 @@ def fuse_conv_and_bn(conv, bn):
         .requires_grad_(False)
         .to(conv.weight.device)
     )
+    if conv.weight.is_meta:  # structure only, i.e. models built with empty_init() to load fused weights into
+        return fusedconv
 
     # Prepare filters
     w_conv = conv.weight.clone().view(conv.out_channels, -1)
@@ -300,7 +303,9 @@ def model_info_for_loggers(trainer):
 
 def get_flops(model, imgsz=640):
     """Return a YOLO model's FLOPs."""
-    if not thop:
+    try:
+        import thop  # scope for faster startup
+    except ImportError:
         return 0.0  # if not installed return 0.0 GFLOPs
 
     try:
@@ -352,6 +357,74 @@ def initialize_weights(model):
             m.inplace = True
 
 
+@contextmanager
+def empty_init():
+    """
+    Context manager that builds modules on the 'meta' device, without allocating or randomly initializing weights.
+
+    Forward passes inside the context only propagate shapes, so model construction steps like the stride computation
+    of DetectionModel still work. Models built inside it must be materialized with `load_empty_state_dict()`.
+
+    Example:
+        ```python
+        from ultralytics.nn.tasks import DetectionModel
+        from ultralytics.utils.torch_utils import empty_init, load_empty_state_dict
+
+        with empty_init():
+            model = DetectionModel('yolov8n.yaml', verbose=False)
+        load_empty_state_dict(model, state_dict)
+        ```
+    """
+    if not TORCH_2_0:  # torch.device() context manager requires torch>=2.0, build normally instead
+        yield
+        return
+    with torch.device("meta"):
+        yield
+
+
+def load_empty_state_dict(model, state_dict, device="cpu", assign=False):
+    """
+    Materialize a model built with `empty_init()` on 'device' and load a state_dict covering all of its weights.
+
+    Args:
+        model (nn.Module): Model built inside `empty_init()`.
+        state_dict (dict): State dict with every parameter and buffer of the model, loaded with strict=True.
+        device (str | torch.device): Device to allocate the weights on. Defaults to 'cpu'.
+        assign (bool): Use the state_dict tensors as the model weights instead of copying them, keeping i.e.
+            memory-mapped tensors shared with the page cache. Defaults to False.
+
+    Returns:
+        (nn.Module): The materialized model.
+
+    Raises:
+        RuntimeError: If the state_dict does not match the model parameters and buffers.
+        ValueError: If the model holds tensors outside its parameters and buffers that were built on the meta device.
+    """
+    attrs = [(m, k, v) for m in model.modules() for k, v in vars(m).items() if isinstance(v, torch.Tensor)]
+    if assign:
+        modules = dict(model.named_modules())
+        for k, v in state_dict.items():
+            name, _, attr = k.rpartition(".")
+            m = modules.get(name)
+            if m is not None and attr in m._parameters:
+                m._parameters[attr] = nn.Parameter(v, requires_grad=m._parameters[attr].requires_grad)
+            elif m is not None and attr in m._buffers:
+                m._buffers[attr] = v
+            else:
+                raise RuntimeError(f"Unexpected key in state_dict: '{k}'")
+        missing = [k for k, v in (*model.named_parameters(), *model.named_buffers()) if v.is_meta]
+        if missing:
+            raise RuntimeError(f"Missing key(s) in state_dict: {missing}")
+    else:
+        model.to_empty(device=device)  # allocate uninitialized weights, BaseModel._apply() also empties Detect.stride
+        model.load_state_dict(state_dict, strict=True)  # uninitialized weights must all be overwritten
+    for m, k, v in attrs:  # restore plain tensor attributes, i.e. Detect stride and anchors
+        if v.is_meta and v.numel():
+            raise ValueError(f"{type(m).__name__}.{k} was built on the meta device and can not be restored")
+        setattr(m, k, torch.empty(v.shape, dtype=v.dtype, device=device) if v.is_meta else v.to(device))
+    return model
+
+
 def scale_img(img, ratio=1.0, same_shape=False, gs=32):
     """Scales and pads an image tensor of shape img(bs,3,y,x) based on given ratio and grid size gs, optionally
     retaining the original shape.
@@ -366,6 +439,62 @@ def scale_img(img, ratio=1.0, same_shape=False, gs=32):
     return F.pad(img, [0, w - s[1], 0, h - s[0]], value=0.447)  # value = imagenet mean
 
 
+def smart_autocast(device, amp=False, bf16=False):
+    """
+    Returns the mixed precision context for `device`: bfloat16 autocast if `bf16`, on CPU or CUDA, FP16 CUDA AMP if
+    `amp`, else FP32.
+
+    Example:
+        ```python
+        with smart_autocast(torch.device('cpu'), bf16=True):
+            y = model(x)  # convolutions and matmuls in bfloat16, i.e. with AVX512-BF16 or AMX on CPU
+        ```
+    """
+    if bf16:
+        return torch.autocast(torch.device(device).type, dtype=torch.bfloat16)
+    return torch.cuda.amp.autocast(amp)
+
+
+def bf16_to_float(y):
+    """Converts the BF16 tensors of a possibly nested model output, i.e. run under `smart_autocast()`, to FP32."""
+    if isinstance(y, torch.Tensor):
+        return y.float() if y.dtype == torch.bfloat16 else y
+    if isinstance(y, dict):
+        return {k: bf16_to_float(v) for k, v in y.items()}
+    if isinstance(y, (list, tuple)):
+        return type(y)(bf16_to_float(x) for x in y)
+    return y
+
+
+def checkpoint_module(m, x):
+    """
+    Runs module `m` on `x` with activation checkpointing, recomputing its activations in backward instead of storing.
+
+    The recomputation runs with BatchNorm momentum 0 and restores 'num_batches_tracked', so running statistics are
+    updated once per step as without checkpointing. Requires torch>=1.13 for non-reentrant checkpointing, which
+    computes parameter gradients for inputs that do not require gradients.
+    """
+    recompute = []
+
+    def run(x):
+        """Runs `m`, freezing BatchNorm running statistics when recomputing in backward."""
+        if not recompute:
+            recompute.append(True)
+            return m(x)
+        bn = [b for b in m.modules() if isinstance(b, nn.modules.batchnorm._BatchNorm) and b.track_running_stats]
+        state = [(b.momentum, b.num_batches_tracked.clone()) for b in bn]
+        for b in bn:
+            b.momentum = 0.0
+        try:
+            return m(x)
+        finally:
+            for b, (momentum, n) in zip(bn, state):
+                b.momentum = momentum
+                b.num_batches_tracked.copy_(n)
+
+    return checkpoint(run, x, use_reentrant=False)
+
+
 def make_divisible(x, divisor):
     """Returns nearest x divisible by divisor."""
     if isinstance(divisor, torch.Tensor):
@@ -433,29 +562,72 @@ class ModelEMA:
     Keeps a moving average of everything in the model state_dict (parameters and buffers)
     For EMA details see https://www.tensorflow.org/api_docs/python/tf/train/ExponentialMovingAverage
     To disable EMA set the `enabled` attribute to `False`.
+
+    The floating point tensors of both models are paired once, grouped by dtype, and averaged with fused
+    `torch._foreach_lerp_()` kernels, or multiply-add kernels for model tensors cast to the EMA dtype, i.e. after FP16
+    validation.
+    With `every=k` the average is updated on every k-th call only, with the product of the k skipped decays.
     """
 
-    def __init__(self, model, decay=0.9999, tau=2000, updates=0):
+    def __init__(self, model, decay=0.9999, tau=2000, updates=0, every=1):
         """Create EMA."""
         self.ema = deepcopy(de_parallel(model)).eval()  # FP32 EMA
         self.updates = updates  # number of EMA updates
         self.decay = lambda x: decay * (1 - math.exp(-x / tau))  # decay exponential ramp (to help early epochs)
+        self.every = every  # average every n updates
         for p in self.ema.parameters():
             p.requires_grad_(False)
         self.enabled = True
+        # QAT fake quantization observers and qparams are copied from the model, not averaged
+        fake_quant = torch.ao.quantization.FakeQuantizeBase
+        self.fake_quant = [n for n, m in self.ema.named_modules() if isinstance(m, fake_quant)]
+        self.fake_quant_keys = {f"{n}.{k}" for n in self.fake_quant for k in self.ema.get_submodule(n).state_dict()}
+        self.pairs = None  # (model, buffer probes, {(EMA dtype, model dtype): (EMA tensors, model tensors)}), _pairs()
 
+    @torch.no_grad()
     def update(self, model):
         """Update EMA parameters."""
         if self.enabled:
             self.updates += 1
-            d = self.decay(self.updates)
+            if self.updates % self.every:
+                return
+            d = math.prod(self.decay(self.updates - i) for i in range(self.every))
+
+            model = de_parallel(model)
+            for (dtype, model_dtype), (ema_tensors, model_tensors) in self._pairs(model).items():
+                if model_dtype == dtype:
+                    torch._foreach_lerp_(ema_tensors, model_tensors, 1 - d)  # v = d * v + (1 - d) * msd[k]
+                else:  # _foreach_lerp_() requires matching dtypes, and has no FP16 CPU kernel
+                    torch._foreach_mul_(ema_tensors, d)
+                    torch._foreach_add_(ema_tensors, [t.to(dtype) for t in model_tensors], alpha=1 - d)
+            for n in self.fake_quant:
+                self.ema.get_submodule(n).load_state_dict(model.get_submodule(n).state_dict())
+
+    def _pairs(self, model):
+        """
+        Returns the floating point EMA and model tensors to average grouped by their dtypes, cached until either model
+        is cast or moved.
 
-            msd = de_parallel(model).state_dict()  # model state_dict
-            for k, v in self.ema.state_dict().items():
-                if v.dtype.is_floating_point:  # true for FP16 and FP32
-                    v *= d
-                    v += (1 - d) * msd[k].detach()
-                    # assert v.dtype == msd[k].dtype == torch.float32, f'{k}: EMA {v.dtype},  model {msd[k].dtype}'
+        Parameters are cached as objects, which follow casts, while buffers are replaced by `Module.to()`, so the first
+        floating point buffer of each model is probed on every call to detect a stale cache.
+        """
+        if self.pairs and self.pairs[0] is model and all(m._buffers[k] is v for m, k, v in self.pairs[1]):
+            return self.pairs[2]
+        esd, msd = self.ema.state_dict(keep_vars=True), model.state_dict(keep_vars=True)
+        keys = [k for k, v in esd.items() if v.dtype.is_floating_point and k not in self.fake_quant_keys]
+        buffers = dict(self.ema.named_buffers())
+        k = next((k for k in keys if k in buffers), None)  # first floating point buffer
+        probes = []
+        if k:
+            n, b = k.rpartition(".")[::2]
+            probes = [(self.ema.get_submodule(n), b, esd[k]), (model.get_submodule(n), b, msd[k])]
+        groups = {}
+        for k in keys:
+            e, m = groups.setdefault((esd[k].dtype, msd[k].dtype), ([], []))
+            e.append(esd[k])
+            m.append(msd[k])
+        self.pairs = model, probes, groups
+        return groups
 
     def update_attr(self, model, include=(), exclude=("process_group", "reducer")):
         """Updates attributes and saves stripped model with optimizer removed."""
@@ -463,6 +635,90 @@ class ModelEMA:
             copy_attr(self.ema, model, include, exclude)
 
 
+def snapshot_module(m, dtype=torch.half):
+    """
+    Returns a copy of module `m` for checkpoints, its parameters and buffers cloned to CPU and floating point ones cast
+    to `dtype`, without the device copy of `deepcopy(m).half()`.
+
+    The cloned tensors are passed to `deepcopy()` through its memo, so only the module structure and small tensor
+    attributes are copied on top of the CPU clones.
+    """
+    memo = {}
+    for t in (*m.parameters(), *m.buffers()):
+        c = t.detach().to("cpu", dtype if t.is_floating_point() else t.dtype, copy=True)
+        memo[id(t)] = nn.Parameter(c, requires_grad=t.requires_grad) if isinstance(t, nn.Parameter) else c
+    return deepcopy(m, memo)
+
+
+def snapshot_optimizer(optimizer):
+    """Returns the optimizer state_dict() for checkpoints, its state tensors cloned to CPU instead of deep-copied."""
+    sd = optimizer.state_dict()
+    state = {
+        i: {k: v.detach().to("cpu", copy=True) if isinstance(v, torch.Tensor) else v for k, v in s.items()}
+        for i, s in sd["state"].items()
+    }
+    return {"state": state, "param_groups": deepcopy(sd["param_groups"])}
+
+
+class CheckpointWriter:
+    """
+    Saves training checkpoints in a background thread, so training continues while they are serialized and written.
+
+    Each checkpoint is serialized once to a temporary file renamed into place, then hard-linked, or copied where links
+    are not supported, to any further paths, so readers never see a partially written file. One checkpoint is written
+    at a time: save() and wait() block until the previous write is done, and re-raise its errors.
+
+    Example:
+        ```python
+        writer = CheckpointWriter()
+        writer.save(ckpt, 'weights/last.pt', 'weights/best.pt')  # returns immediately
+        writer.wait()  # before reading 'weights/best.pt'
+        ```
+    """
+
+    def __init__(self):
+        """Initializes the CheckpointWriter with no write in progress."""
+        self.thread = None
+        self.error = None
+
+    def save(self, ckpt, f, *links):
+        """Starts writing checkpoint dict `ckpt` to `f` and `links`, the checkpoint must not be modified afterwards."""
+        self.wait()
+        self.thread = threading.Thread(target=self._write, args=(ckpt, Path(f), [Path(x) for x in links]))
+        self.thread.start()  # not a daemon, so a checkpoint saved before an exception is still written
+
+    def link(self, f, *links):
+        """Starts linking the checkpoint last saved to `f` to `links`, i.e. once it is known to be the best."""
+        self.save(None, f, *links)
+
+    def wait(self):
+        """Waits for the checkpoint being written, raising the error of a failed write."""
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if self.error:
+            e, self.error = self.error, None
+            raise e
+
+    def _write(self, ckpt, f, links):
+        """Writes `ckpt` to `f` unless None and links or copies `f` to `links`, renaming temporary files into place."""
+        try:
+            if ckpt is not None:
+                tmp = f.with_name(f"{f.name}.tmp")
+                torch.save(ckpt, tmp)
+                os.replace(tmp, f)
+            for x in links:
+                tmp = x.with_name(f"{x.name}.tmp")
+                tmp.unlink(missing_ok=True)
+                try:
+                    os.link(f, tmp)
+                except OSError:  # i.e. file systems without hard links
+                    shutil.copyfile(f, tmp)
+                os.replace(tmp, x)
+        except Exception as e:
+            self.error = e
+
+
 def strip_optimizer(f: Union[str, Path] = "best.pt", s: str = "") -> None:
     """
     Strip optimizer from 'f' to finalize training, optionally save as 's'.
@@ -501,7 +757,9 @@ def strip_optimizer(f: Union[str, Path] = "best.pt", s: str = "") -> None:
         p.requires_grad = False
     x["train_args"] = {k: v for k, v in args.items() if k in DEFAULT_CFG_KEYS}  # strip non-default keys
     # x['model'].args = x['train_args']
-    torch.save(x, s or f)
+    tmp = Path(f"{s or f}.tmp")
+    torch.save(x, tmp)
+    os.replace(tmp, s or f)  # atomic, and replaces rather than rewrites checkpoints hard-linked by CheckpointWriter
     mb = os.path.getsize(s or f) / 1e6  # file size
     LOGGER.info(f"Optimizer stripped from {f},{f' saved as {s},' if s else ''} {mb:.1f}MB")
 
@@ -536,8 +794,10 @@ def profile(input, ops, n=10, device=None):
             m = m.half() if hasattr(m, "half") and isinstance(x, torch.Tensor) and x.dtype is torch.float16 else m
             tf, tb, t = 0, 0, [0, 0, 0]  # dt forward, backward
             try:
-                flops = thop.profile(m, inputs=[x], verbose=False)[0] / 1e9 * 2 if thop else 0  # GFLOPs
-            except Exception:
+                import thop  # scope for faster startup
+
+                flops = thop.profile(m, inputs=[x], verbose=False)[0] / 1e9 * 2  # GFLOPs
+            except Exception:  # includes thop not installed
                 flops = 0
 
             try: